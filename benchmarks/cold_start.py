@@ -0,0 +1,126 @@
+"""
+Mide el arranque en frío de la API tal como lo vería Lambda.
+
+Cada corrida es un intérprete nuevo que importa `src.app` (lo que hace
+serverless-wsgi en el init de Lambda) y después atiende el primer request con
+el cliente de pruebas de Flask. Se reporta la mediana y el p90 de ambas fases,
+los módulos más caros según `python -X importtime` y si psycopg2/pytz quedaron
+cargados después del import.
+
+Uso:
+    python benchmarks/cold_start.py --runs 20 --output cold_start.json
+    python benchmarks/cold_start.py --baseline cold_start.json --max-regression 15
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import sys, time, json
+start = time.perf_counter()
+import src.app
+import_ms = (time.perf_counter() - start) * 1000
+heavy = {name: name in sys.modules for name in ("psycopg2", "pytz", "src.data_access.db_connector")}
+client = src.app.app.test_client()
+start = time.perf_counter()
+response = client.get(sys.argv[1])
+first_request_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"import_ms": import_ms, "first_request_ms": first_request_ms,
+                  "status": response.status_code, "loaded_at_import": heavy}))
+"""
+
+
+def run_probe(path, env):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, path],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def top_imports(env, limit):
+    """Módulos con mayor tiempo acumulado de import según -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.app"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({"module": name.strip(), "self_ms": int(self_us) / 1000,
+                     "cumulative_ms": int(cumulative_us) / 1000})
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+def summarize(values):
+    ordered = sorted(values)
+    return {
+        "median_ms": round(statistics.median(ordered), 2),
+        "p90_ms": round(ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))], 2),
+        "min_ms": round(ordered[0], 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+def compare(result, baseline, max_regression):
+    """Devuelve las fases cuya mediana empeoró más de `max_regression` por ciento."""
+    regressions = []
+    for phase in ("import", "first_request"):
+        before = baseline[phase]["median_ms"]
+        after = result[phase]["median_ms"]
+        if before and (after - before) / before * 100 > max_regression:
+            regressions.append(f"{phase}: {before} ms -> {after} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default="/", help="Ruta del primer request (default: /)")
+    parser.add_argument("--top", type=int, default=15, help="Módulos a listar de -X importtime")
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    parser.add_argument("--baseline", help="Resultado previo contra el cual comparar")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Porcentaje tolerado (default: 10)")
+    args = parser.parse_args()
+
+    env = dict(os.environ, LOGS=os.environ.get("LOGS", "prod"), PYTHONDONTWRITEBYTECODE="0")
+    # Una corrida previa deja los .pyc listos, como en el paquete desplegado
+    run_probe(args.path, env)
+    samples = [run_probe(args.path, env) for _ in range(args.runs)]
+
+    result = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "path": args.path,
+        "import": summarize([sample["import_ms"] for sample in samples]),
+        "first_request": summarize([sample["first_request_ms"] for sample in samples]),
+        "status": samples[-1]["status"],
+        "loaded_at_import": samples[-1]["loaded_at_import"],
+        "top_imports": top_imports(env, args.top),
+    }
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(result, json.load(baseline_file), args.max_regression)
+        for regression in regressions:
+            print(f"❌ Regresión: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
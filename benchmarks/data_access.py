@@ -0,0 +1,263 @@
+"""
+Benchmark de EquipmentDB/ProductDB contra un PostgreSQL desechable.
+
+Para cada escala (filas sembradas) se vacían las tablas, se siembran con la carga
+masiva, se corre ANALYZE y se mide latencia (p50/p95/p99) y throughput de cada
+operación: create, get_by_id, get_by_ids, list_first, list_next, list_filtered,
+search, update y delete. El resultado es JSON y se puede comparar con uno guardado.
+
+La caché de entidades se desactiva por defecto para medir la base (--cache la activa).
+
+Uso:
+    python benchmarks/data_access.py --scales 1000,100000 --output baseline.json
+    python benchmarks/data_access.py --scales 1000,100000 --compare baseline.json --max-regression 15
+    BENCH_DSN=postgresql://bench@localhost/bench python benchmarks/data_access.py --scales 1000000
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.pg_server import ThrowawayPostgres  # noqa: E402
+
+DEFAULT_SCALES = "1000,100000,1000000"
+SEED_CHUNK = 10_000
+PAGE_SIZE = 50
+LOOKUP_BATCH = 50
+# Valores de createdBy que se reparten entre las filas sembradas (para list_filtered)
+OWNERS = 10
+
+ENTITIES = {
+    "equipment": {
+        "class": "EquipmentDB",
+        "create": "create_equipment",
+        "bulk": "create_equipment_bulk",
+        "by_id": "get_equipment_by_id",
+        "by_ids": "get_equipment_by_ids",
+        "page": "get_equipment_page",
+        "search": "search_equipment",
+        "search_term": "Equipo {index}",
+        "update": "update_equipment",
+        "delete": "delete_equipment",
+        "table": "Equipment",
+    },
+    "products": {
+        "class": "ProductDB",
+        "create": "create_product",
+        "bulk": "create_products_bulk",
+        "by_id": "get_product_by_id",
+        "by_ids": "get_products_by_ids",
+        "page": "get_products_page",
+        "search": "search_products",
+        "search_term": "Producto {index}",
+        "update": "update_product",
+        "delete": "delete_product",
+        "table": "Product",
+    },
+}
+
+
+def make_item(entity, index):
+    owner = f"bench-{index % OWNERS}"
+    if entity == "equipment":
+        return {"name": f"Equipo {index}", "location": f"Planta {index % 7}",
+                "serial_number": f"SN-{index:08d}", "createdBy": owner}
+    return {"name": f"Producto {index}", "price": round(1 + (index % 1000) * 0.5, 2),
+            "category": f"Categoría {index % 12}", "createdBy": owner}
+
+
+def summarize(samples, wall_s):
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))], 3)
+
+    return {
+        "count": len(ordered),
+        "ops_per_sec": round(len(ordered) / wall_s, 1) if wall_s else 0.0,
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def measure(operation, calls):
+    """Ejecuta `operation(*args)` para cada args de `calls` y devuelve el resumen."""
+    samples = []
+    started = time.perf_counter()
+    for args in calls:
+        start = time.perf_counter()
+        operation(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def run_sql(statement, autocommit=False):
+    from src.data_access.db_connector import db_connector
+    with db_connector.connection() as connection:
+        connection.autocommit = autocommit
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(statement)
+            if not autocommit:
+                connection.commit()
+        finally:
+            connection.autocommit = False
+
+
+def seed(db, names, entity, count):
+    ids = []
+    bulk = getattr(db, names["bulk"])
+    for offset in range(0, count, SEED_CHUNK):
+        items = [make_item(entity, index) for index in range(offset, min(count, offset + SEED_CHUNK))]
+        ids.extend(str(entity_id) for entity_id in bulk(items)["created"])
+    return ids
+
+
+def bench_entity(entity, scale, ops, rng):
+    import src.data_access as data_access
+    names = ENTITIES[entity]
+    db = getattr(data_access, names["class"])()
+
+    run_sql(f'TRUNCATE public."{names["table"]}"')
+    started = time.perf_counter()
+    ids = seed(db, names, entity, scale)
+    seed_s = time.perf_counter() - started
+    run_sql(f'VACUUM ANALYZE public."{names["table"]}"', autocommit=True)
+
+    sample = rng.sample(ids, min(ops, len(ids)))
+    page = getattr(db, names["page"])
+    search = getattr(db, names["search"])
+
+    def next_page(state):
+        # Recorre las páginas con el token; al llegar al final vuelve a empezar
+        _, state["token"] = page(limit=PAGE_SIZE, after=state["token"])
+
+    cursor_state = {"token": None}
+    results = {
+        "create": measure(getattr(db, names["create"]),
+                          [(make_item(entity, scale + index),) for index in range(ops)]),
+        "get_by_id": measure(getattr(db, names["by_id"]), [(entity_id,) for entity_id in sample]),
+        "get_by_ids": measure(getattr(db, names["by_ids"]),
+                              [(rng.sample(ids, min(LOOKUP_BATCH, len(ids))),) for _ in range(max(1, ops // 10))]),
+        "list_first": measure(lambda: page(limit=PAGE_SIZE), [()] * ops),
+        "list_next": measure(next_page, [(cursor_state,)] * ops),
+        "list_filtered": measure(lambda owner: page(limit=PAGE_SIZE, filters={"createdBy": owner}),
+                                 [(f"bench-{index % OWNERS}",) for index in range(ops)]),
+        "search": measure(lambda term: search(term, limit=PAGE_SIZE),
+                          [(names["search_term"].format(index=rng.randrange(scale)),) for _ in range(ops)]),
+        "update": measure(getattr(db, names["update"]),
+                          [(entity_id, {"name": f"Actualizado {index}"}) for index, entity_id in enumerate(sample)]),
+        # Al final, porque deja registros marcados como eliminados
+        "delete": measure(getattr(db, names["delete"]), [(entity_id,) for entity_id in sample]),
+    }
+    return {"rows": scale, "seed_s": round(seed_s, 2), "seed_rows_per_sec": round(scale / seed_s, 1), "ops": results}
+
+
+def server_version():
+    from src.data_access.db_connector import db_connector
+    with db_connector.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW server_version")
+            version = cursor.fetchone()[0]
+        connection.rollback()
+    return version
+
+
+def compare(result, baseline, max_regression):
+    """Lista las operaciones cuyo p95 subió o cuyo throughput bajó más de `max_regression` por ciento."""
+    regressions = []
+    for entity, scales in baseline["results"].items():
+        for scale, before_scale in scales.items():
+            after_scale = result["results"].get(entity, {}).get(scale)
+            if after_scale is None:
+                continue
+            for op, before in before_scale["ops"].items():
+                after = after_scale["ops"].get(op)
+                if after is None:
+                    continue
+                p95_change = (after["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+                tps_change = (before["ops_per_sec"] - after["ops_per_sec"]) / before["ops_per_sec"] * 100 if before["ops_per_sec"] else 0.0
+                line = (f"{entity:<10} {scale:>8} {op:<14} p95 {before['p95_ms']:>9.3f} -> {after['p95_ms']:>9.3f} ms "
+                        f"({p95_change:+6.1f}%)  {before['ops_per_sec']:>9.1f} -> {after['ops_per_sec']:>9.1f} ops/s")
+                print(line, file=sys.stderr)
+                if p95_change > max_regression or tps_change > max_regression:
+                    regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help=f"Filas sembradas por corrida (default: {DEFAULT_SCALES})")
+    parser.add_argument("--entities", default="equipment,products")
+    parser.add_argument("--ops", type=int, default=500, help="Operaciones medidas por tipo (default: 500)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del generador aleatorio")
+    parser.add_argument("--cache", action="store_true", help="Dejar activa la caché de entidades")
+    parser.add_argument("--durable", action="store_true", help="No desactivar fsync en el cluster temporal")
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    parser.add_argument("--compare", help="Resultado previo contra el cual comparar")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Porcentaje tolerado (default: 10)")
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+    entities = [entity for entity in args.entities.split(",") if entity]
+    unknown = [entity for entity in entities if entity not in ENTITIES]
+    if unknown:
+        parser.error(f"Entidades desconocidas: {', '.join(unknown)}")
+
+    # Antes de importar src: el logger, la caché y el pool leen su configuración al importarse
+    os.environ.setdefault("LOGS", "prod")
+    os.environ.setdefault("SLOW_QUERY_MS", "1000000")
+    if not args.cache:
+        os.environ["ENTITY_CACHE_SIZE"] = "0"
+        os.environ["EQUIPMENT_CACHE_SIZE"] = "0"
+        os.environ["PRODUCT_CACHE_SIZE"] = "0"
+
+    with ThrowawayPostgres(durable=args.durable):
+        from src.data_access.migrator import Migrator
+        Migrator().migrate()
+
+        rng = random.Random(args.seed)
+        result = {
+            "meta": {
+                "python": platform.python_version(),
+                "postgres": server_version(),
+                "ops": args.ops,
+                "seed": args.seed,
+                "cache": args.cache,
+                "durable": args.durable,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+            "results": {},
+        }
+        for entity in entities:
+            for scale in scales:
+                print(f"▶ {entity} con {scale} filas...", file=sys.stderr)
+                result["results"].setdefault(entity, {})[str(scale)] = bench_entity(entity, scale, args.ops, rng)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            regressions = compare(result, json.load(baseline_file), args.max_regression)
+        for regression in regressions:
+            print(f"❌ Regresión: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Compara llaves primarias UUIDv7 (src.utils.id_generator) contra UUIDv4 aleatorios.
+
+Para cada tipo de ID se crea una tabla con la misma forma que Equipment/Product
+(id UUID PRIMARY KEY, data JSONB), se insertan las filas en lotes con commit por lote
+y se reporta el throughput, el tamaño final del índice de la llave primaria y, si está
+la extensión pgstattuple, la densidad de sus hojas. Con v4 cada INSERT cae en una hoja
+al azar (splits a la mitad, más páginas sucias por commit); con v7 todos van al borde
+derecho del índice.
+
+Uso:
+    python benchmarks/id_keys.py --rows 1000000 --output ids.json
+    BENCH_DSN=postgresql://bench@localhost/bench python benchmarks/id_keys.py --rows 5000000 --batch 500
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.pg_server import ThrowawayPostgres  # noqa: E402
+
+KINDS = ("uuid4", "uuid7")
+DOCUMENT = '{"name": "Equipo", "location": "Planta 1", "deleted": false}'
+
+
+def run_sql(cursor, statement, params=None):
+    cursor.execute(statement, params)
+    return cursor.fetchone() if cursor.description else None
+
+
+def bench_kind(kind, rows, batch):
+    import psycopg2.extras
+    from src.data_access.db_connector import db_connector
+    from src.utils.id_generator import IdGenerator
+
+    generator = IdGenerator(kind)
+    table = f"bench_ids_{kind}"
+    with db_connector.connection() as connection:
+        with connection.cursor() as cursor:
+            run_sql(cursor, f"DROP TABLE IF EXISTS public.{table}")
+            run_sql(cursor, f"CREATE TABLE public.{table} (id UUID PRIMARY KEY, data JSONB NOT NULL)")
+        connection.commit()
+
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            for offset in range(0, rows, batch):
+                values = [(generator.make_id(), DOCUMENT) for _ in range(min(batch, rows - offset))]
+                psycopg2.extras.execute_values(
+                    cursor, f"INSERT INTO public.{table} (id, data) VALUES %s", values, page_size=len(values)
+                )
+                connection.commit()
+        elapsed = time.perf_counter() - started
+
+        with connection.cursor() as cursor:
+            index_bytes = run_sql(cursor, "SELECT pg_relation_size(%s::regclass)", (f"public.{table}_pkey",))[0]
+            table_bytes = run_sql(cursor, "SELECT pg_relation_size(%s::regclass)", (f"public.{table}",))[0]
+            leaf_density = None
+            try:
+                run_sql(cursor, "CREATE EXTENSION IF NOT EXISTS pgstattuple")
+                leaf_density = float(run_sql(cursor, "SELECT avg_leaf_density FROM pgstatindex(%s)",
+                                             (f"public.{table}_pkey",))[0])
+            except Exception:
+                connection.rollback()
+            run_sql(cursor, f"DROP TABLE public.{table}")
+        connection.commit()
+
+    return {
+        "rows": rows,
+        "rows_per_sec": round(rows / elapsed, 1),
+        "seconds": round(elapsed, 2),
+        "pkey_index_mb": round(index_bytes / 1024 / 1024, 2),
+        "table_mb": round(table_bytes / 1024 / 1024, 2),
+        "avg_leaf_density": leaf_density,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Filas insertadas por tipo (default: 1000000)")
+    parser.add_argument("--batch", type=int, default=1000, help="Filas por INSERT + commit (default: 1000)")
+    parser.add_argument("--durable", action="store_true", help="No desactivar fsync en el cluster temporal")
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOGS", "prod")
+    os.environ.setdefault("SLOW_QUERY_MS", "1000000")
+
+    with ThrowawayPostgres(durable=args.durable):
+        result = {
+            "meta": {
+                "python": platform.python_version(),
+                "rows": args.rows,
+                "batch": args.batch,
+                "durable": args.durable,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+            "results": {},
+        }
+        for kind in KINDS:
+            print(f"▶ {kind}: {args.rows} filas...", file=sys.stderr)
+            result["results"][kind] = bench_kind(kind, args.rows, args.batch)
+
+    v4, v7 = result["results"]["uuid4"], result["results"]["uuid7"]
+    print(f"uuid7 vs uuid4: {v7['rows_per_sec'] / v4['rows_per_sec']:.2f}x filas/s, "
+          f"índice {v7['pkey_index_mb']} MB vs {v4['pkey_index_mb']} MB", file=sys.stderr)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,15 @@
--- Elimina las tablas viejas si existen, para empezar de cero
-DROP TABLE IF EXISTS equipment;
-DROP TABLE IF EXISTS products;
-
--- Crear la tabla para Equipos (Equipment)
-CREATE TABLE equipment (
+-- El esquema se administra con migraciones versionadas:
+--
+--     python -m src.data_access.migrator migrate
+--
+-- Este script solo crea las tablas vacías (sin índices) para pruebas rápidas.
+-- Los nombres coinciden con los que usan las clases de acceso a datos.
+CREATE TABLE IF NOT EXISTS public."Equipment" (
     id UUID PRIMARY KEY,
-    data JSONB
+    data JSONB NOT NULL
 );
 
--- Crear la tabla para Productos (Products)
-CREATE TABLE products (
+CREATE TABLE IF NOT EXISTS public."Product" (
     id UUID PRIMARY KEY,
-    data JSONB
-);
\ No newline at end of file
+    data JSONB NOT NULL
+);
@@ -0,0 +1,425 @@
+"""
+Generador de carga concurrente para la API.
+
+A diferencia de test_api.py (un request a la vez), lanza `--concurrency` hilos que
+envían una mezcla configurable de requests durante `--duration` segundos, opcionalmente
+a una tasa fija (`--rate`), y reporta por ruta: throughput, tasa de errores y un
+histograma de latencia estilo HDR (p50/p90/p99/p99.9/max).
+
+Destinos:
+    --mode http     Servidor en marcha (flask run / python -m src.app), BASE_URL o --url
+    --mode wsgi     La app Flask en el mismo proceso, sin red (app.test_client())
+    --mode lambda   El handler de serverless-wsgi con eventos de API Gateway HTTP API
+
+Uso:
+    python load_test.py --mode http --concurrency 20 --duration 30
+    python load_test.py --mode wsgi --rate 200 --mix list_equipment=5,get_equipment=3,create_equipment=1
+    python load_test.py --mode lambda --duration 10 --output load.json --histogram
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+BASE_URL = "http://127.0.0.1:5000"
+
+DEFAULT_MIX = (
+    "list_equipment=20,get_equipment=20,lookup_equipment=5,create_equipment=5,update_equipment=5,"
+    "list_products=20,get_products=15,lookup_products=5,create_products=3,update_products=2"
+)
+
+
+# ----------------------------------------------------------------------
+# Histograma de latencia
+# ----------------------------------------------------------------------
+
+class LatencyHistogram:
+    """
+    Histograma log-lineal en microsegundos, al estilo de HdrHistogram.
+
+    Los valores menores a 2**SUB_BUCKET_BITS se guardan exactos; los mayores se
+    agrupan en cubetas cuyo ancho crece con la magnitud, con un error relativo
+    menor a 1/2**(SUB_BUCKET_BITS - 1) (~1.6%). La memoria no depende del número
+    de muestras y dos histogramas se suman con merge().
+    """
+
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+        self.max_us = 0
+
+    def record(self, duration_ms):
+        value = max(0, int(duration_ms * 1000))
+        shift = max(0, value.bit_length() - self.SUB_BUCKET_BITS)
+        # Se guarda el límite inferior de la cubeta
+        self.counts[(value >> shift) << shift] += 1
+        self.total += 1
+        if value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, p):
+        if not self.total:
+            return 0.0
+        wanted = max(1, int(round(p / 100 * self.total)))
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= wanted:
+                return value / 1000
+        return self.max_us / 1000
+
+    def summary(self):
+        return {
+            "p50_ms": round(self.percentile(50), 3),
+            "p90_ms": round(self.percentile(90), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "p99_9_ms": round(self.percentile(99.9), 3),
+            "max_ms": round(self.max_us / 1000, 3),
+        }
+
+    def distribution(self):
+        """Filas (valor en ms, percentil acumulado, conteo acumulado) como las imprime HdrHistogram."""
+        rows = []
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            rows.append((value / 1000, seen / self.total, seen))
+        return rows
+
+
+class RouteStats:
+    __slots__ = ('histogram', 'requests', 'errors', 'statuses')
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.statuses = Counter()
+
+    def add(self, duration_ms, status):
+        self.histogram.record(duration_ms)
+        self.requests += 1
+        self.statuses[str(status)] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors += 1
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.requests += other.requests
+        self.errors += other.errors
+        self.statuses.update(other.statuses)
+
+
+# ----------------------------------------------------------------------
+# Clientes: cada hilo tiene el suyo
+# ----------------------------------------------------------------------
+
+class HttpClient:
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+
+    def send(self, method, path, body=None):
+        response = self.session.request(method, self.base_url + path, json=body, timeout=30)
+        return response.status_code, _json_or_none(response.content)
+
+
+class WsgiClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def send(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, _json_or_none(response.get_data())
+
+
+class LambdaClient:
+    """Invoca el mismo handler que despliega serverless-wsgi (payload 2.0 de HTTP API)."""
+
+    def __init__(self, app):
+        import serverless_wsgi
+        self.app = app
+        self.handle_request = serverless_wsgi.handle_request
+
+    def send(self, method, path, body=None):
+        parts = urlsplit(path)
+        event = {
+            "version": "2.0",
+            "routeKey": "$default",
+            "rawPath": parts.path,
+            "rawQueryString": parts.query,
+            "headers": {"host": "localhost", "content-type": "application/json"},
+            "requestContext": {
+                "http": {"method": method, "path": parts.path, "protocol": "HTTP/1.1", "sourceIp": "127.0.0.1"},
+                "stage": "$default",
+            },
+            "body": json.dumps(body) if body is not None else None,
+            "isBase64Encoded": False,
+        }
+        response = self.handle_request(self.app, event, None)
+        return response["statusCode"], _json_or_none(response.get("body"))
+
+
+def _json_or_none(content):
+    try:
+        return json.loads(content) if content else None
+    except ValueError:
+        return None
+
+
+# ----------------------------------------------------------------------
+# Escenarios
+# ----------------------------------------------------------------------
+
+class KnownIds:
+    """IDs que se pueden leer o actualizar; crecen con cada create exitoso."""
+
+    def __init__(self):
+        self.ids = {"equipment": [], "products": []}
+        self._lock = threading.Lock()
+
+    def add(self, resource, ids):
+        with self._lock:
+            self.ids[resource].extend(ids)
+
+    def pick(self, resource, count=1):
+        with self._lock:
+            pool = self.ids[resource]
+            if not pool:
+                return []
+            return [random.choice(pool) for _ in range(count)]
+
+
+def new_item(resource, index):
+    if resource == "equipment":
+        return {"name": f"Carga {index}", "location": f"Planta {index % 5}",
+                "serial_number": f"LT-{index:08d}", "createdBy": "load_test"}
+    return {"name": f"Carga {index}", "price": round(1 + index % 500 * 0.25, 2),
+            "category": f"Categoría {index % 8}", "createdBy": "load_test"}
+
+
+def build_request(action, resource, known, counter):
+    """Devuelve (método, ruta, cuerpo, ruta para el reporte) o None si no hay IDs todavía."""
+    if action == "list":
+        return "GET", f"/{resource}?limit=50", None, f"GET /{resource}"
+    if action == "create":
+        return "POST", f"/{resource}", new_item(resource, next(counter)), f"POST /{resource}"
+    if action == "lookup":
+        ids = known.pick(resource, 20)
+        if not ids:
+            return None
+        return "GET", f"/{resource}?ids={','.join(ids)}", None, f"GET /{resource}?ids"
+    ids = known.pick(resource)
+    if not ids:
+        return None
+    if action == "get":
+        return "GET", f"/{resource}/{ids[0]}", None, f"GET /{resource}/<id>"
+    if action == "update":
+        return "PUT", f"/{resource}/{ids[0]}", {"name": f"Carga {next(counter)}"}, f"PUT /{resource}/<id>"
+    raise ValueError(f"Acción desconocida: {action}")
+
+
+def parse_mix(text):
+    """'list_equipment=20,get_products=5' -> [(('list', 'equipment'), 20), ...]"""
+    mix = []
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        action, _, resource = name.strip().partition('_')
+        if action not in ("list", "get", "lookup", "create", "update") or resource not in ("equipment", "products"):
+            raise ValueError(f"Elemento de mezcla inválido: {name}")
+        if float(weight or 1) > 0:
+            mix.append(((action, resource), float(weight or 1)))
+    if not mix:
+        raise ValueError("La mezcla no tiene elementos con peso mayor a 0.")
+    return mix
+
+
+class Pacer:
+    """
+    Reparte turnos de envío a `rate` requests por segundo entre todos los hilos.
+
+    La latencia se mide desde el turno asignado y no desde el envío real, para no
+    ocultar la espera de los requests que se atrasan cuando el servidor se satura
+    (coordinated omission).
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            slot = self.next_slot
+            self.next_slot = slot + self.interval
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        return slot
+
+
+def worker(client, mix, known, counter, deadline, warmup_until, pacer, results):
+    actions = [item for item, _ in mix]
+    weights = [weight for _, weight in mix]
+    stats = {}
+    while True:
+        start = pacer.wait() if pacer else time.perf_counter()
+        if start >= deadline:
+            break
+        action, resource = random.choices(actions, weights)[0]
+        request = build_request(action, resource, known, counter)
+        if request is None:
+            request = build_request("list", resource, known, counter)
+        method, path, body, route = request
+        try:
+            status, payload = client.send(method, path, body)
+        except Exception as e:
+            status, payload = type(e).__name__, None
+        duration_ms = (time.perf_counter() - start) * 1000
+        if action == "create" and status == 201 and payload:
+            known.add(resource, [payload["id"]])
+        if start >= warmup_until:
+            stats.setdefault(route, RouteStats()).add(duration_ms, status)
+    results.append(stats)
+
+
+def prefill(client, known, count, counter):
+    """Crea `count` registros de cada tipo con los endpoints batch para tener IDs que leer."""
+    for resource in ("equipment", "products"):
+        if count <= 0:
+            break
+        items = [new_item(resource, next(counter)) for _ in range(count)]
+        status, payload = client.send("POST", f"/{resource}/batch", items)
+        if status not in (201, 207) or not payload:
+            raise RuntimeError(f"No se pudieron precargar {resource}: {status} {payload}")
+        known.add(resource, payload["created"])
+    # También se toman los que ya existían
+    for resource in ("equipment", "products"):
+        status, payload = client.send("GET", f"/{resource}?limit=200")
+        if status == 200 and payload:
+            known.add(resource, [item["id"] for item in payload["items"]])
+
+
+def make_client_factory(args):
+    if args.mode == "http":
+        return lambda: HttpClient(args.url)
+    from src.app import app
+    if args.mode == "wsgi":
+        return lambda: WsgiClient(app)
+    return lambda: LambdaClient(app)
+
+
+def report(per_route, elapsed_s, show_histogram):
+    total = RouteStats()
+    print(f"\n{'Ruta':<28}{'Req':>8}{'Req/s':>9}{'Err%':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'p99.9':>9}{'max':>9}  (ms)")
+    for route in sorted(per_route):
+        stats = per_route[route]
+        total.merge(stats)
+        _print_row(route, stats, elapsed_s)
+    _print_row("TOTAL", total, elapsed_s)
+    if show_histogram and total.requests:
+        print(f"\n{'Valor (ms)':>12}{'Percentil':>12}{'Total':>10}")
+        for value, percentile, count in total.histogram.distribution():
+            print(f"{value:>12.3f}{percentile:>12.6f}{count:>10}")
+    return total
+
+
+def _print_row(route, stats, elapsed_s):
+    summary = stats.histogram.summary()
+    error_rate = stats.errors / stats.requests * 100 if stats.requests else 0.0
+    print(f"{route:<28}{stats.requests:>8}{stats.requests / elapsed_s:>9.1f}{error_rate:>7.1f}"
+          f"{summary['p50_ms']:>9.2f}{summary['p90_ms']:>9.2f}{summary['p99_ms']:>9.2f}"
+          f"{summary['p99_9_ms']:>9.2f}{summary['max_ms']:>9.2f}")
+
+
+def stats_to_json(stats, elapsed_s):
+    return {
+        "requests": stats.requests,
+        "throughput_rps": round(stats.requests / elapsed_s, 2),
+        "errors": stats.errors,
+        "error_rate": round(stats.errors / stats.requests, 4) if stats.requests else 0.0,
+        "statuses": dict(stats.statuses),
+        "latency": stats.histogram.summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("http", "wsgi", "lambda"), default="http")
+    parser.add_argument("--url", default=BASE_URL, help=f"Base del modo http (default: {BASE_URL})")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Pesos por acción_recurso (list, get, lookup, create, update)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Hilos enviando requests (default: 10)")
+    parser.add_argument("--rate", type=float, help="Requests por segundo en total (default: sin límite)")
+    parser.add_argument("--duration", type=float, default=30, help="Segundos de medición (default: 30)")
+    parser.add_argument("--warmup", type=float, default=2, help="Segundos iniciales que no se miden (default: 2)")
+    parser.add_argument("--prefill", type=int, default=100, help="Registros a crear antes de empezar (default: 100)")
+    parser.add_argument("--histogram", action="store_true", help="Imprimir la distribución completa")
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    parser.add_argument("--max-error-rate", type=float, default=1.0,
+                        help="Porcentaje de errores a partir del cual sale con código 1 (default: 1)")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    new_client = make_client_factory(args)
+    known = KnownIds()
+    counter = itertools.count()
+    prefill(new_client(), known, args.prefill, counter)
+
+    print(f"🚀 {args.mode}: {args.concurrency} hilos, {args.duration:g}s"
+          + (f", {args.rate:g} req/s" if args.rate else ", sin límite de tasa"))
+    pacer = Pacer(args.rate) if args.rate else None
+    started = time.perf_counter()
+    warmup_until = started + args.warmup
+    deadline = warmup_until + args.duration
+    results = []
+    threads = [
+        threading.Thread(target=worker, args=(new_client(), mix, known, counter, deadline, warmup_until, pacer, results))
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed_s = max(time.perf_counter() - warmup_until, 1e-9)
+
+    per_route = {}
+    for stats in results:
+        for route, route_stats in stats.items():
+            per_route.setdefault(route, RouteStats()).merge(route_stats)
+    total = report(per_route, elapsed_s, args.histogram)
+
+    if args.output:
+        document = {
+            "mode": args.mode,
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "duration_s": round(elapsed_s, 2),
+            "mix": dict((f"{action}_{resource}", weight) for (action, resource), weight in mix),
+            "routes": {route: stats_to_json(stats, elapsed_s) for route, stats in per_route.items()},
+            "total": stats_to_json(total, elapsed_s),
+        }
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(document, output_file, indent=2, ensure_ascii=False)
+    error_rate = total.errors / total.requests * 100 if total.requests else 0.0
+    return 1 if error_rate > args.max_error_rate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
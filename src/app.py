@@ -1,30 +1,759 @@
 import os
-from flask import Flask, jsonify, request
-#from src.entities import Equipment, Product
-#from src.data_access import EquipmentDB, ProductDB
-from src.utils import logger
+import uuid
+from functools import lru_cache
+from urllib.parse import urlencode
+from flask import Blueprint, Flask, Response, current_app, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from src.data_access.errors import NotFoundError, PreconditionFailedError, QueueFullError
+from src.utils import compression, etags, logger, metrics, serializer
 
 # Configura el logger para la aplicación
-logger.environment = os.environ.get('LOGS', 'local')
+logger.configure(environment=os.environ.get('LOGS', 'local'))
 log = logger('Flask_App')
 
-app = Flask(__name__)
+api = Blueprint('api', __name__)
 
-log.debug("Corriendo app flask")
+# El endpoint /metrics solo se expone donde se pide (por default, solo en local)
+METRICS_ENDPOINT = os.environ.get('METRICS_ENDPOINT', '1' if logger.environment == 'local' else '0') == '1'
 
-log.info("Corriendo app flask")
+# Límite de elementos por POST batch (el payload de API Gateway/Lambda es de 6 MB)
+MAX_BATCH_ITEMS = int(os.environ.get('MAX_BATCH_ITEMS', 5000))
+# Límite de IDs por GET ?ids=... (la URL también tiene un tamaño máximo)
+MAX_LOOKUP_IDS = int(os.environ.get('MAX_LOOKUP_IDS', 200))
+# Cuerpo de los 500: el detalle (que puede incluir el SQL) queda solo en el log
+INTERNAL_ERROR = {"error": "Error interno del servidor."}
 
-log.error("Corriendo app flask")
+# Listados armados con el JSONB en texto tal como sale de PostgreSQL, sin hidratar entidades
+JSON_PASSTHROUGH = os.environ.get('JSON_PASSTHROUGH', '0') == '1'
+# Compresión br/gzip de las respuestas según Accept-Encoding
+COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', '1') == '1'
+# Invalidación de las cachés de entidades con LISTEN/NOTIFY: off, thread (servidor de
+# larga vida) o poll (Lambda: se leen los avisos pendientes al inicio de cada request)
+CACHE_LISTENER = os.environ.get('CACHE_LISTENER', 'off')
 
-# Instancias de los data access
-#equipment_db = EquipmentDB()
-#product_db = ProductDB()
 
-@app.route('/')
+# Instancias de los data access. Se crean en el primer request que las usa: así
+# psycopg2 y el pool no se cargan durante el arranque en frío de Lambda.
+@lru_cache(maxsize=None)
+def get_equipment_db():
+    from src.data_access import EquipmentDB
+    return EquipmentDB()
+
+
+@lru_cache(maxsize=None)
+def get_product_db():
+    from src.data_access import ProductDB
+    return ProductDB()
+
+
+@lru_cache(maxsize=None)
+def get_aggregates():
+    from src.data_access import CatalogAggregates
+    return CatalogAggregates()
+
+
+@lru_cache(maxsize=None)
+def get_catalog_io(entity):
+    from src.data_access import CatalogIO
+    return CatalogIO(entity)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify con src.utils.serializer: escribe bytes directo (orjson si está instalado)."""
+
+    def dumps(self, obj, **kwargs):
+        return serializer.dumps(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        with metrics.span('serialize'):
+            body = serializer.dumps(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def create_app():
+    """Construye la aplicación Flask con sus rutas y middleware."""
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.register_blueprint(api)
+    app.before_request(start_timing)
+    if CACHE_LISTENER in ('thread', 'poll'):
+        app.before_request(sync_caches)
+    # Flask corre los after_request en orden inverso: primero se comprime y
+    # después se mide, así Server-Timing incluye el tiempo de compresión
+    app.after_request(add_server_timing)
+    app.after_request(compress_response)
+    app.teardown_request(flush_logs)
+    return app
+
+
+def serialize(entity):
+    """Convierte una entidad en el dict que se devuelve como JSON."""
+    return {"id": str(entity.get_id()), **entity.get_data()}
+
+
+def serialize_page(items, next_token):
+    with metrics.span('serialize'):
+        return {"items": [serialize(item) for item in items], "next": next_token}
+
+
+def serialize_list(items):
+    with metrics.span('serialize'):
+        return [serialize(item) for item in items]
+
+
+def next_page_link(path, args, next_token):
+    """Link (rel="next") a la misma consulta con `after` en el token de la siguiente página."""
+    query = args.to_dict(flat=False)
+    query['after'] = [next_token]
+    return f'<{path}?{urlencode(query, doseq=True)}>; rel="next"'
+
+
+def with_next_page(response, next_token):
+    # Los listados devuelven una lista JSON: el token de la siguiente página va en headers
+    if next_token is not None:
+        response.headers['X-Next-Page'] = next_token
+        response.headers['Link'] = next_page_link(request.path, request.args, next_token)
+    return response
+
+
+def entity_etag(entity):
+    return etags.entity_etag(str(entity.get_id()), entity.modifiedAt)
+
+
+def page_etag(items, next_token):
+    """ETag de una página; coincide con el que sale de get_*_page_versions para la misma página."""
+    return etags.collection_etag([(str(item.get_id()), item.modifiedAt) for item in items], next_token is not None)
+
+
+def with_etag(response, etag):
+    # no-cache: el cliente puede guardar la respuesta, pero debe revalidarla con If-None-Match
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def not_modified(etag):
+    return with_etag(current_app.response_class(status=304), etag)
+
+
+def json_response(payload):
+    # Acepta un cuerpo ya serializado (bytes) o cualquier objeto para jsonify
+    if isinstance(payload, bytes):
+        return current_app.response_class(payload, mimetype='application/json')
+    return jsonify(payload)
+
+
+def conditional(payload, etag):
+    """200 con el cuerpo y su ETag, o 304 sin cuerpo si el cliente ya tiene esa versión."""
+    if etags.none_match(request.headers.get('If-None-Match'), etag):
+        return not_modified(etag)
+    return with_etag(json_response(payload), etag)
+
+
+def raw_page_response(rows, next_token):
+    """Respuesta de una página a partir de filas de get_*_page_raw (id, modifiedAt, documento)."""
+    etag = etags.collection_etag([(entity_id, modified_at) for entity_id, modified_at, _ in rows], next_token is not None)
+    with metrics.span('serialize'):
+        body = serializer.raw_page([(entity_id, document) for entity_id, _, document in rows])
+    return with_next_page(conditional(body, etag), next_token)
+
+
+def start_timing():
+    metrics.start_request()
+    logger.start_request()
+
+
+def sync_caches():
+    # El hilo se arranca en el primer request (y no al importar) para que cada worker
+    # tenga el suyo después del fork
+    from src.data_access.cache_listener import cache_listener
+    if CACHE_LISTENER == 'thread':
+        cache_listener.start()
+    else:
+        with metrics.span('cache_sync'):
+            cache_listener.poll()
+
+
+def add_server_timing(response):
+    timings = metrics.end_request()
+    if timings is None:
+        return response
+    elapsed_ms = timings.elapsed_ms()
+    endpoint = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+    metrics.registry.observe('endpoint', endpoint, elapsed_ms)
+    response.headers['Server-Timing'] = timings.server_timing()
+    if elapsed_ms >= metrics.SLOW_REQUEST_MS:
+        log.warning("🐢 Request lento", endpoint=endpoint, status=response.status_code,
+                    duration_ms=round(elapsed_ms, 2), queries=timings.queries, **timings.spans)
+    return response
+
+
+def compress_response(response):
+    """Comprime con br o gzip (según Accept-Encoding) los cuerpos JSON/texto que superan COMPRESS_MIN_BYTES."""
+    if (not COMPRESS_RESPONSES or response.direct_passthrough or response.is_streamed
+            or response.status_code in (204, 304) or 'Content-Encoding' in response.headers):
+        return response
+    body = response.get_data()
+    if not compression.should_compress(response.mimetype, len(body)):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = compression.choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    with metrics.span('compress'):
+        response.set_data(compression.compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def flush_logs(exception=None):
+    # Los logs del request se escriben de una sola vez al terminarlo
+    logger.flush()
+
+
+@api.route('/metrics', methods=['GET'])
+def get_metrics():
+    """p50/p95/p99 por endpoint y por consulta, más el estado del pool y las cachés (solo si METRICS_ENDPOINT=1)."""
+    if not METRICS_ENDPOINT:
+        return jsonify({"error": "No encontrado"}), 404
+    # Las instancias se toman de sus submódulos: `src.data_access.db_connector` es también
+    # el nombre del módulo, y una vez importado `from src.data_access import ...` devuelve el módulo
+    from src.data_access import write_batcher
+    from src.data_access.cache_listener import cache_listener
+    from src.data_access.db_connector import db_connector
+    from src.data_access.entity_cache import equipment_cache, product_cache
+    return jsonify({
+        **metrics.registry.snapshot(),
+        "pool": db_connector.stats(),
+        "cache": [equipment_cache.stats(), product_cache.stats()],
+        "cache_listener": cache_listener.stats() if CACHE_LISTENER != 'off' else None,
+        "write_batching": [write_batcher.equipment_batcher.stats(), write_batcher.product_batcher.stats()]
+        if write_batcher.ENABLED else None,
+    }), 200
+
+
+@api.route('/')
 def index():
     log.info("Ruta raíz '/' fue accedida.")
     return "API de Equipos y Productos lista."
 
+def read_batch_items():
+    """Lee el cuerpo de un POST batch: una lista JSON o {"items": [...]}."""
+    return parse_batch_items(request.get_json(silent=True))
+
+
+def parse_batch_items(data):
+    """Valida el cuerpo ya decodificado de un POST batch (compartido con src/asgi.py)."""
+    if isinstance(data, dict):
+        data = data.get('items')
+    if not isinstance(data, list) or not data:
+        raise ValueError("Se esperaba una lista de elementos no vacía.")
+    if len(data) > MAX_BATCH_ITEMS:
+        raise ValueError(f"Se permiten como máximo {MAX_BATCH_ITEMS} elementos por solicitud.")
+    return data
+
+
+def read_filters(fields):
+    """Toma de la query string los filtros de igualdad permitidos para un listado."""
+    return {field: request.args[field] for field in fields if field in request.args}
+
+
+def read_lookup_ids():
+    """Lee el parámetro `ids` (separado por comas) de un GET de búsqueda por IDs."""
+    return parse_lookup_ids(request.args.get('ids', ''))
+
+
+def parse_entity_id(raw):
+    """ID de la ruta en forma canónica, o None si no es un UUID (se responde 404, igual que a un ID inexistente)."""
+    try:
+        return str(uuid.UUID(raw))
+    except ValueError:
+        return None
+
+
+def parse_lookup_ids(raw):
+    """Separa y valida el valor del parámetro `ids` (compartido con src/asgi.py)."""
+    ids = [entity_id for entity_id in raw.split(',') if entity_id.strip()]
+    if not ids:
+        raise ValueError("El parámetro 'ids' no puede estar vacío.")
+    if len(ids) > MAX_LOOKUP_IDS:
+        raise ValueError(f"Se permiten como máximo {MAX_LOOKUP_IDS} IDs por solicitud.")
+    return ids
+
+
+def import_catalog(entity):
+    """
+    Importa el cuerpo del request (NDJSON o CSV) leyéndolo línea a línea, sin cargarlo
+    entero en memoria. Parámetros: format (ndjson|csv) y on_conflict (error|skip|update).
+    """
+    from src.data_access import catalog_io
+    fmt = catalog_io.detect_format('', request.args.get('format', 'ndjson'))
+    records = catalog_io.read_csv(request.stream) if fmt == 'csv' else catalog_io.read_ndjson(request.stream)
+    result = get_catalog_io(entity).import_records(records, on_conflict=request.args.get('on_conflict', 'error'))
+    status = 400 if result["failed_count"] and not result["imported"] else 200
+    return jsonify(result), status
+
+
+def export_catalog(entity):
+    """
+    Respuesta en streaming con todo el catálogo de `entity`. Parámetros: format
+    (ndjson|csv) e include_deleted.
+    """
+    from src.data_access import catalog_io
+    fmt = catalog_io.detect_format('', request.args.get('format', 'ndjson'))
+    include_deleted = request.args.get('include_deleted', 'false').lower() in catalog_io.TRUE_VALUES
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(
+        get_catalog_io(entity).export_rows(fmt, include_deleted=include_deleted),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{fmt}"'}
+    )
+
+
+def batch_status(result):
+    """201 si todo se creó, 207 si hubo errores parciales, 400 si nada se pudo crear."""
+    if not result["failed"]:
+        return 201
+    return 207 if result["created"] else 400
+
+
+@api.route('/equipment', methods=['POST'])
+def create_equipment():
+    """Crea un nuevo equipo."""
+    log.info("Recibida solicitud para crear equipo.")
+    try:
+        equipment_id = get_equipment_db().create_equipment(request.get_json() or {})
+        return jsonify({"id": str(equipment_id)}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    except Exception as e:
+        log.error("Error al crear equipo:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/batch', methods=['POST'])
+def create_equipment_batch():
+    """Crea varios equipos en una sola transacción."""
+    log.info("Recibida solicitud para crear equipos en lote.")
+    try:
+        result = get_equipment_db().create_equipment_bulk(read_batch_items())
+        return jsonify(result), batch_status(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al crear equipos en lote:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products', methods=['POST'])
+def create_product():
+    """Crea un nuevo producto."""
+    log.info("Recibida solicitud para crear producto.")
+    try:
+        product_id = get_product_db().create_product(request.get_json() or {})
+        return jsonify({"id": str(product_id)}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    except Exception as e:
+        log.error("Error al crear producto:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/batch', methods=['POST'])
+def create_products_batch():
+    """Crea varios productos en una sola transacción."""
+    log.info("Recibida solicitud para crear productos en lote.")
+    try:
+        result = get_product_db().create_products_bulk(read_batch_items())
+        return jsonify(result), batch_status(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al crear productos en lote:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment', methods=['GET'])
+def get_all_equipment():
+    """
+    Obtiene una página de equipos como lista JSON. Parámetros: limit, after (token de la
+    página anterior) y filtros exactos por location, serial_number o createdBy. Si hay más páginas, el token de la
+    siguiente llega en el header X-Next-Page (y como Link rel="next").
+    Con `ids=a,b,c` resuelve esos IDs en una sola consulta. Responde 304 si el
+    ETag enviado en If-None-Match sigue vigente.
+    """
+    log.info("Recibida solicitud para obtener equipos.")
+    try:
+        if 'ids' in request.args:
+            found, missing = get_equipment_db().get_equipment_by_ids(read_lookup_ids())
+            payload = {"items": [serialize(item) for item in found.values()], "missing": missing}
+            return conditional(payload, page_etag(found.values(), None))
+        page_args = dict(
+            limit=request.args.get('limit'),
+            after=request.args.get('after'),
+            filters=read_filters(get_equipment_db().FILTERABLE_FIELDS)
+        )
+        if 'If-None-Match' in request.headers:
+            # Consulta de versiones: mismo índice, sin traer documentos ni hidratar
+            versions, has_more = get_equipment_db().get_equipment_page_versions(**page_args)
+            etag = etags.collection_etag(versions, has_more)
+            if etags.none_match(request.headers['If-None-Match'], etag):
+                return not_modified(etag)
+        if JSON_PASSTHROUGH:
+            return raw_page_response(*get_equipment_db().get_equipment_page_raw(**page_args))
+        items, next_token = get_equipment_db().get_equipment_page(**page_args)
+        return with_next_page(conditional(serialize_list(items), page_etag(items, next_token)), next_token)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al obtener equipos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products', methods=['GET'])
+def get_all_products():
+    """
+    Obtiene una página de productos como lista JSON. Parámetros: limit, after (token de la
+    página anterior) y filtros exactos por category o createdBy. Si hay más páginas, el token de la
+    siguiente llega en el header X-Next-Page (y como Link rel="next").
+    Con `ids=a,b,c` resuelve esos IDs en una sola consulta. Responde 304 si el
+    ETag enviado en If-None-Match sigue vigente.
+    """
+    log.info("Recibida solicitud para obtener productos.")
+    try:
+        if 'ids' in request.args:
+            found, missing = get_product_db().get_products_by_ids(read_lookup_ids())
+            payload = {"items": [serialize(item) for item in found.values()], "missing": missing}
+            return conditional(payload, page_etag(found.values(), None))
+        page_args = dict(
+            limit=request.args.get('limit'),
+            after=request.args.get('after'),
+            filters=read_filters(get_product_db().FILTERABLE_FIELDS)
+        )
+        if 'If-None-Match' in request.headers:
+            # Consulta de versiones: mismo índice, sin traer documentos ni hidratar
+            versions, has_more = get_product_db().get_products_page_versions(**page_args)
+            etag = etags.collection_etag(versions, has_more)
+            if etags.none_match(request.headers['If-None-Match'], etag):
+                return not_modified(etag)
+        if JSON_PASSTHROUGH:
+            return raw_page_response(*get_product_db().get_products_page_raw(**page_args))
+        items, next_token = get_product_db().get_products_page(**page_args)
+        return with_next_page(conditional(serialize_list(items), page_etag(items, next_token)), next_token)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al obtener productos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/stats', methods=['GET'])
+def get_equipment_stats():
+    """
+    Cantidad de equipos activos por ubicación. Sale de un resumen que mantienen
+    triggers en la base, así que no recorre la tabla de equipos.
+    """
+    log.info("Recibida solicitud para obtener estadísticas de equipos.")
+    try:
+        return jsonify({"items": get_aggregates().get_equipment_location_stats()}), 200
+    except Exception as e:
+        log.error("Error al obtener estadísticas de equipos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/stats', methods=['GET'])
+def get_product_stats():
+    """
+    Cantidad de productos activos y precio mínimo/promedio/máximo por categoría.
+    Sale de un resumen que mantienen triggers en la base, así que no recorre la
+    tabla de productos.
+    """
+    log.info("Recibida solicitud para obtener estadísticas de productos.")
+    try:
+        return jsonify({"items": get_aggregates().get_product_category_stats()}), 200
+    except Exception as e:
+        log.error("Error al obtener estadísticas de productos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/changes', methods=['GET'])
+def get_equipment_changes():
+    """
+    Feed de cambios: equipos creados, modificados o eliminados después de `cursor`
+    (incluye los eliminados, con `deleted: true`). Sin `cursor` devuelve solo la
+    posición actual, que el cliente guarda antes de su descarga inicial. Mientras
+    `more` sea true hay que volver a llamar con el `cursor` recibido (si además viene
+    Retry-After, después de esos segundos).
+    """
+    log.info("Recibida solicitud para obtener cambios de equipos.")
+    try:
+        items, cursor, more = get_equipment_db().changes_since(
+            request.args.get('cursor'),
+            limit=request.args.get('limit')
+        )
+        body = jsonify({"items": [serialize(item) for item in items], "cursor": cursor, "more": more})
+        # Sin items y con more: hay escrituras largas en curso, reintentar con el mismo cursor
+        return body, 200, ({"Retry-After": "1"} if more and not items else {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al obtener cambios de equipos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/changes', methods=['GET'])
+def get_product_changes():
+    """
+    Feed de cambios: productos creados, modificados o eliminados después de `cursor`
+    (incluye los eliminados, con `deleted: true`). Sin `cursor` devuelve solo la
+    posición actual, que el cliente guarda antes de su descarga inicial. Mientras
+    `more` sea true hay que volver a llamar con el `cursor` recibido (si además viene
+    Retry-After, después de esos segundos).
+    """
+    log.info("Recibida solicitud para obtener cambios de productos.")
+    try:
+        items, cursor, more = get_product_db().changes_since(
+            request.args.get('cursor'),
+            limit=request.args.get('limit')
+        )
+        body = jsonify({"items": [serialize(item) for item in items], "cursor": cursor, "more": more})
+        # Sin items y con more: hay escrituras largas en curso, reintentar con el mismo cursor
+        return body, 200, ({"Retry-After": "1"} if more and not items else {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al obtener cambios de productos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/import', methods=['POST'])
+def import_equipment():
+    """Carga masiva de equipos desde NDJSON o CSV (ver import_catalog)."""
+    log.info("Recibida solicitud para importar equipos.")
+    try:
+        return import_catalog("equipment")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al importar equipos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/import', methods=['POST'])
+def import_products():
+    """Carga masiva de productos desde NDJSON o CSV (ver import_catalog)."""
+    log.info("Recibida solicitud para importar productos.")
+    try:
+        return import_catalog("products")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al importar productos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/export', methods=['GET'])
+def export_equipment():
+    """Exporta todos los equipos en NDJSON o CSV, en streaming (ver export_catalog)."""
+    log.info("Recibida solicitud para exportar equipos.")
+    try:
+        return export_catalog("equipment")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al exportar equipos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/export', methods=['GET'])
+def export_products():
+    """Exporta todos los productos en NDJSON o CSV, en streaming (ver export_catalog)."""
+    log.info("Recibida solicitud para exportar productos.")
+    try:
+        return export_catalog("products")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al exportar productos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/search', methods=['GET'])
+def search_equipment():
+    """
+    Busca equipos por nombre, ubicación o número de serie. Parámetros: q (texto a
+    buscar), limit y after (token de la página anterior de la misma búsqueda).
+    Los resultados vienen ordenados por relevancia.
+    """
+    log.info("Recibida solicitud para buscar equipos.")
+    try:
+        items, next_token = get_equipment_db().search_equipment(
+            request.args.get('q'),
+            limit=request.args.get('limit'),
+            after=request.args.get('after')
+        )
+        return conditional(serialize_page(items, next_token), page_etag(items, next_token))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al buscar equipos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/search', methods=['GET'])
+def search_products():
+    """
+    Busca productos por nombre, descripción o categoría. Parámetros: q (texto a
+    buscar), limit y after (token de la página anterior de la misma búsqueda).
+    Los resultados vienen ordenados por relevancia.
+    """
+    log.info("Recibida solicitud para buscar productos.")
+    try:
+        items, next_token = get_product_db().search_products(
+            request.args.get('q'),
+            limit=request.args.get('limit'),
+            after=request.args.get('after')
+        )
+        return conditional(serialize_page(items, next_token), page_etag(items, next_token))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al buscar productos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/<equipment_id>', methods=['GET'])
+def get_equipment(equipment_id):
+    """Obtiene un equipo por ID. Con If-None-Match responde 304 si el ETag no cambió."""
+    log.info(f"Recibida solicitud para obtener el equipo {equipment_id}.")
+    if parse_entity_id(equipment_id) is None:
+        return jsonify({"error": f"Equipo con ID {equipment_id} no encontrado"}), 404
+    try:
+        if 'If-None-Match' in request.headers:
+            version = get_equipment_db().get_equipment_version(equipment_id)
+            if version is not None:
+                etag = etags.entity_etag(*version)
+                if etags.none_match(request.headers['If-None-Match'], etag):
+                    return not_modified(etag)
+        equipment = get_equipment_db().get_equipment_by_id(equipment_id)
+        if not equipment:
+            return jsonify({"error": f"Equipo con ID {equipment_id} no encontrado"}), 404
+        return conditional(serialize(equipment), entity_etag(equipment))
+    except Exception as e:
+        log.error("Error al obtener equipo:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/<equipment_id>', methods=['PUT'])
+def update_equipment(equipment_id):
+    """Actualiza los campos enviados de un equipo. Con If-Match responde 412 si el ETag ya no coincide."""
+    log.info(f"Recibida solicitud para actualizar el equipo {equipment_id}.")
+    if parse_entity_id(equipment_id) is None:
+        return jsonify({"error": f"Equipo con ID {equipment_id} no encontrado"}), 404
+    try:
+        equipment = get_equipment_db().update_equipment(equipment_id, request.get_json() or {}, if_match=request.headers.get('If-Match'))
+        return with_etag(jsonify(serialize(equipment)), entity_etag(equipment)), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except PreconditionFailedError as e:
+        return jsonify({"error": str(e)}), 412
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al actualizar equipo:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/<equipment_id>', methods=['DELETE'])
+def delete_equipment(equipment_id):
+    """Elimina un equipo (soft delete)."""
+    log.info(f"Recibida solicitud para eliminar el equipo {equipment_id}.")
+    if parse_entity_id(equipment_id) is None:
+        return jsonify({"error": f"Equipo con ID {equipment_id} no encontrado"}), 404
+    try:
+        get_equipment_db().delete_equipment(equipment_id)
+        return jsonify({"id": equipment_id, "deleted": True}), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        log.error("Error al eliminar equipo:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/<equipment_id>/restore', methods=['POST'])
+def restore_equipment(equipment_id):
+    """Vuelve a activar un equipo eliminado, aunque ya se haya movido al archivo."""
+    log.info(f"Recibida solicitud para restaurar el equipo {equipment_id}.")
+    if parse_entity_id(equipment_id) is None:
+        return jsonify({"error": f"Equipo con ID {equipment_id} no encontrado"}), 404
+    try:
+        equipment = get_equipment_db().restore_equipment(equipment_id)
+        return with_etag(jsonify(serialize(equipment)), entity_etag(equipment)), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        log.error("Error al restaurar equipo:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/<product_id>', methods=['GET'])
+def get_product(product_id):
+    """Obtiene un producto por ID. Con If-None-Match responde 304 si el ETag no cambió."""
+    log.info(f"Recibida solicitud para obtener el producto {product_id}.")
+    if parse_entity_id(product_id) is None:
+        return jsonify({"error": f"Producto con ID {product_id} no encontrado"}), 404
+    try:
+        if 'If-None-Match' in request.headers:
+            version = get_product_db().get_product_version(product_id)
+            if version is not None:
+                etag = etags.entity_etag(*version)
+                if etags.none_match(request.headers['If-None-Match'], etag):
+                    return not_modified(etag)
+        product = get_product_db().get_product_by_id(product_id)
+        if not product:
+            return jsonify({"error": f"Producto con ID {product_id} no encontrado"}), 404
+        return conditional(serialize(product), entity_etag(product))
+    except Exception as e:
+        log.error("Error al obtener producto:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/<product_id>', methods=['PUT'])
+def update_product(product_id):
+    """Actualiza los campos enviados de un producto. Con If-Match responde 412 si el ETag ya no coincide."""
+    log.info(f"Recibida solicitud para actualizar el producto {product_id}.")
+    if parse_entity_id(product_id) is None:
+        return jsonify({"error": f"Producto con ID {product_id} no encontrado"}), 404
+    try:
+        product = get_product_db().update_product(product_id, request.get_json() or {}, if_match=request.headers.get('If-Match'))
+        return with_etag(jsonify(serialize(product)), entity_etag(product)), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except PreconditionFailedError as e:
+        return jsonify({"error": str(e)}), 412
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al actualizar producto:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/<product_id>', methods=['DELETE'])
+def delete_product(product_id):
+    """Elimina un producto (soft delete)."""
+    log.info(f"Recibida solicitud para eliminar el producto {product_id}.")
+    if parse_entity_id(product_id) is None:
+        return jsonify({"error": f"Producto con ID {product_id} no encontrado"}), 404
+    try:
+        get_product_db().delete_product(product_id)
+        return jsonify({"id": product_id, "deleted": True}), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        log.error("Error al eliminar producto:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/<product_id>/restore', methods=['POST'])
+def restore_product(product_id):
+    """Vuelve a activar un producto eliminado, aunque ya se haya movido al archivo."""
+    log.info(f"Recibida solicitud para restaurar el producto {product_id}.")
+    if parse_entity_id(product_id) is None:
+        return jsonify({"error": f"Producto con ID {product_id} no encontrado"}), 404
+    try:
+        product = get_product_db().restore_product(product_id)
+        return with_etag(jsonify(serialize(product)), entity_etag(product)), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        log.error("Error al restaurar producto:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+
+# serverless-wsgi usa `src/app.app`
+app = create_app()
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
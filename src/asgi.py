@@ -0,0 +1,514 @@
+"""
+Modo ASGI de la API (Quart + asyncpg).
+
+Expone las mismas rutas que `src/app.py`, pero cada handler es una corrutina y
+usa AsyncEquipmentDB/AsyncProductDB: mientras una consulta espera a PostgreSQL el
+event loop atiende otros requests, y los endpoints que combinan varias consultas
+(como /dashboard) las lanzan en paralelo con asyncio.gather.
+
+    uvicorn src.asgi:app --host 0.0.0.0 --port 8000
+
+Lambda sigue usando `src/app.app` (serverless-wsgi); este módulo es para correr
+en un servidor ASGI de larga vida (contenedor, ECS, VM).
+"""
+import asyncio
+from functools import lru_cache
+from quart import Blueprint, Quart, Response, jsonify, request
+from src.app import (
+    CACHE_LISTENER, INTERNAL_ERROR, METRICS_ENDPOINT, batch_status, entity_etag, next_page_link, page_etag,
+    parse_batch_items, parse_entity_id, parse_lookup_ids, serialize, serialize_list, serialize_page, with_etag
+)
+from src.data_access.errors import NotFoundError, PreconditionFailedError
+from src.utils import etags, logger, metrics
+
+log = logger('Quart_App')
+
+api = Blueprint('api', __name__)
+
+# Tamaño de cada listado del dashboard si no se manda `limit`
+DASHBOARD_PAGE_SIZE = 10
+
+
+@lru_cache(maxsize=None)
+def get_equipment_db():
+    from src.data_access import AsyncEquipmentDB
+    return AsyncEquipmentDB()
+
+
+@lru_cache(maxsize=None)
+def get_product_db():
+    from src.data_access import AsyncProductDB
+    return AsyncProductDB()
+
+
+@lru_cache(maxsize=None)
+def get_aggregates():
+    from src.data_access import AsyncCatalogAggregates
+    return AsyncCatalogAggregates()
+
+
+def create_app():
+    """Construye la aplicación Quart con sus rutas, middleware y ciclo de vida del pool."""
+    app = Quart(__name__)
+    app.register_blueprint(api)
+    # Los hooks son corrutinas: Quart corre los síncronos en un hilo aparte y el
+    # ContextVar de métricas no llegaría al handler
+    app.before_request(start_timing)
+    app.after_request(add_server_timing)
+    app.teardown_request(flush_logs)
+    app.before_serving(open_pool)
+    app.after_serving(close_pool)
+    return app
+
+
+async def open_pool():
+    from src.data_access.async_db_connector import async_db_connector
+    await async_db_connector.open()
+    if CACHE_LISTENER != 'off':
+        # En un servidor ASGI el proceso no se congela: siempre con hilo (poll es para Lambda)
+        from src.data_access.cache_listener import cache_listener
+        cache_listener.start()
+
+
+async def close_pool():
+    from src.data_access.async_db_connector import async_db_connector
+    await async_db_connector.close()
+    if CACHE_LISTENER != 'off':
+        from src.data_access.cache_listener import cache_listener
+        await asyncio.to_thread(cache_listener.stop)
+
+
+async def start_timing():
+    metrics.start_request()
+    logger.start_request()
+
+
+async def add_server_timing(response):
+    timings = metrics.end_request()
+    if timings is None:
+        return response
+    elapsed_ms = timings.elapsed_ms()
+    endpoint = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+    metrics.registry.observe('endpoint', endpoint, elapsed_ms)
+    response.headers['Server-Timing'] = timings.server_timing()
+    if elapsed_ms >= metrics.SLOW_REQUEST_MS:
+        log.warning("🐢 Request lento", endpoint=endpoint, status=response.status_code,
+                    duration_ms=round(elapsed_ms, 2), queries=timings.queries, **timings.spans)
+    return response
+
+
+async def flush_logs(exception=None):
+    logger.flush()
+
+
+def read_filters(fields):
+    return {field: request.args[field] for field in fields if field in request.args}
+
+
+def not_modified(etag):
+    return with_etag(Response('', status=304), etag)
+
+
+def conditional(payload, etag):
+    if etags.none_match(request.headers.get('If-None-Match'), etag):
+        return not_modified(etag)
+    return with_etag(jsonify(payload), etag)
+
+
+def with_next_page(response, next_token):
+    if next_token is not None:
+        response.headers['X-Next-Page'] = next_token
+        response.headers['Link'] = next_page_link(request.path, request.args, next_token)
+    return response
+
+
+@api.route('/metrics', methods=['GET'])
+async def get_metrics():
+    if not METRICS_ENDPOINT:
+        return jsonify({"error": "No encontrado"}), 404
+    from src.data_access.async_db_connector import async_db_connector
+    from src.data_access.cache_listener import cache_listener
+    from src.data_access.entity_cache import equipment_cache, product_cache
+    return jsonify({
+        **metrics.registry.snapshot(),
+        "pool": async_db_connector.stats(),
+        "cache": [equipment_cache.stats(), product_cache.stats()],
+        "cache_listener": cache_listener.stats() if CACHE_LISTENER != 'off' else None,
+    }), 200
+
+
+@api.route('/')
+async def index():
+    log.info("Ruta raíz '/' fue accedida.")
+    return "API de Equipos y Productos lista."
+
+
+@api.route('/dashboard', methods=['GET'])
+async def get_dashboard():
+    """
+    Primera página de equipos y de productos en una sola respuesta.
+
+    Las dos consultas corren a la vez en conexiones distintas del pool, así que
+    el tiempo total es el de la más lenta y no la suma de ambas.
+    """
+    log.info("Recibida solicitud para el dashboard.")
+    limit = request.args.get('limit', DASHBOARD_PAGE_SIZE)
+    try:
+        (equipment, equipment_next), (products, products_next) = await asyncio.gather(
+            get_equipment_db().get_equipment_page(limit=limit),
+            get_product_db().get_products_page(limit=limit)
+        )
+        return jsonify({
+            "equipment": serialize_page(equipment, equipment_next),
+            "products": serialize_page(products, products_next),
+        }), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al obtener el dashboard:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+
+@api.route('/equipment', methods=['POST'])
+async def create_equipment():
+    """Crea un nuevo equipo."""
+    log.info("Recibida solicitud para crear equipo.")
+    try:
+        equipment_id = await get_equipment_db().create_equipment(await request.get_json() or {})
+        return jsonify({"id": str(equipment_id)}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al crear equipo:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/batch', methods=['POST'])
+async def create_equipment_batch():
+    """Crea varios equipos en una sola transacción."""
+    log.info("Recibida solicitud para crear equipos en lote.")
+    try:
+        items = parse_batch_items(await request.get_json(silent=True))
+        result = await get_equipment_db().create_equipment_bulk(items)
+        return jsonify(result), batch_status(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al crear equipos en lote:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products', methods=['POST'])
+async def create_product():
+    """Crea un nuevo producto."""
+    log.info("Recibida solicitud para crear producto.")
+    try:
+        product_id = await get_product_db().create_product(await request.get_json() or {})
+        return jsonify({"id": str(product_id)}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al crear producto:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/batch', methods=['POST'])
+async def create_products_batch():
+    """Crea varios productos en una sola transacción."""
+    log.info("Recibida solicitud para crear productos en lote.")
+    try:
+        items = parse_batch_items(await request.get_json(silent=True))
+        result = await get_product_db().create_products_bulk(items)
+        return jsonify(result), batch_status(result)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al crear productos en lote:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment', methods=['GET'])
+async def get_all_equipment():
+    """Página de equipos (limit, after, filtros; token siguiente en X-Next-Page) o búsqueda por `ids=a,b,c`."""
+    log.info("Recibida solicitud para obtener equipos.")
+    try:
+        if 'ids' in request.args:
+            found, missing = await get_equipment_db().get_equipment_by_ids(parse_lookup_ids(request.args['ids']))
+            payload = {"items": [serialize(item) for item in found.values()], "missing": missing}
+            return conditional(payload, page_etag(found.values(), None))
+        page_args = dict(
+            limit=request.args.get('limit'),
+            after=request.args.get('after'),
+            filters=read_filters(get_equipment_db().FILTERABLE_FIELDS)
+        )
+        if 'If-None-Match' in request.headers:
+            versions, has_more = await get_equipment_db().get_equipment_page_versions(**page_args)
+            etag = etags.collection_etag(versions, has_more)
+            if etags.none_match(request.headers['If-None-Match'], etag):
+                return not_modified(etag)
+        items, next_token = await get_equipment_db().get_equipment_page(**page_args)
+        return with_next_page(conditional(serialize_list(items), page_etag(items, next_token)), next_token)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al obtener equipos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products', methods=['GET'])
+async def get_all_products():
+    """Página de productos (limit, after, filtros; token siguiente en X-Next-Page) o búsqueda por `ids=a,b,c`."""
+    log.info("Recibida solicitud para obtener productos.")
+    try:
+        if 'ids' in request.args:
+            found, missing = await get_product_db().get_products_by_ids(parse_lookup_ids(request.args['ids']))
+            payload = {"items": [serialize(item) for item in found.values()], "missing": missing}
+            return conditional(payload, page_etag(found.values(), None))
+        page_args = dict(
+            limit=request.args.get('limit'),
+            after=request.args.get('after'),
+            filters=read_filters(get_product_db().FILTERABLE_FIELDS)
+        )
+        if 'If-None-Match' in request.headers:
+            versions, has_more = await get_product_db().get_products_page_versions(**page_args)
+            etag = etags.collection_etag(versions, has_more)
+            if etags.none_match(request.headers['If-None-Match'], etag):
+                return not_modified(etag)
+        items, next_token = await get_product_db().get_products_page(**page_args)
+        return with_next_page(conditional(serialize_list(items), page_etag(items, next_token)), next_token)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al obtener productos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/stats', methods=['GET'])
+async def get_equipment_stats():
+    """Cantidad de equipos activos por ubicación."""
+    log.info("Recibida solicitud para obtener estadísticas de equipos.")
+    try:
+        return jsonify({"items": await get_aggregates().get_equipment_location_stats()}), 200
+    except Exception as e:
+        log.error("Error al obtener estadísticas de equipos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/stats', methods=['GET'])
+async def get_product_stats():
+    """Cantidad de productos activos y precio mínimo/promedio/máximo por categoría."""
+    log.info("Recibida solicitud para obtener estadísticas de productos.")
+    try:
+        return jsonify({"items": await get_aggregates().get_product_category_stats()}), 200
+    except Exception as e:
+        log.error("Error al obtener estadísticas de productos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/changes', methods=['GET'])
+async def get_equipment_changes():
+    """Cambios de equipos después de `cursor` (cursor, limit)."""
+    log.info("Recibida solicitud para obtener cambios de equipos.")
+    try:
+        items, cursor, more = await get_equipment_db().changes_since(
+            request.args.get('cursor'),
+            limit=request.args.get('limit')
+        )
+        body = jsonify({"items": [serialize(item) for item in items], "cursor": cursor, "more": more})
+        # Sin items y con more: hay escrituras largas en curso, reintentar con el mismo cursor
+        return body, 200, ({"Retry-After": "1"} if more and not items else {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al obtener cambios de equipos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/changes', methods=['GET'])
+async def get_product_changes():
+    """Cambios de productos después de `cursor` (cursor, limit)."""
+    log.info("Recibida solicitud para obtener cambios de productos.")
+    try:
+        items, cursor, more = await get_product_db().changes_since(
+            request.args.get('cursor'),
+            limit=request.args.get('limit')
+        )
+        body = jsonify({"items": [serialize(item) for item in items], "cursor": cursor, "more": more})
+        # Sin items y con more: hay escrituras largas en curso, reintentar con el mismo cursor
+        return body, 200, ({"Retry-After": "1"} if more and not items else {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al obtener cambios de productos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/search', methods=['GET'])
+async def search_equipment():
+    """Búsqueda de equipos por relevancia (q, limit, after)."""
+    log.info("Recibida solicitud para buscar equipos.")
+    try:
+        items, next_token = await get_equipment_db().search_equipment(
+            request.args.get('q'),
+            limit=request.args.get('limit'),
+            after=request.args.get('after')
+        )
+        return conditional(serialize_page(items, next_token), page_etag(items, next_token))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al buscar equipos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/search', methods=['GET'])
+async def search_products():
+    """Búsqueda de productos por relevancia (q, limit, after)."""
+    log.info("Recibida solicitud para buscar productos.")
+    try:
+        items, next_token = await get_product_db().search_products(
+            request.args.get('q'),
+            limit=request.args.get('limit'),
+            after=request.args.get('after')
+        )
+        return conditional(serialize_page(items, next_token), page_etag(items, next_token))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al buscar productos:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/<equipment_id>', methods=['GET'])
+async def get_equipment(equipment_id):
+    """Obtiene un equipo por ID."""
+    log.info(f"Recibida solicitud para obtener el equipo {equipment_id}.")
+    if parse_entity_id(equipment_id) is None:
+        return jsonify({"error": f"Equipo con ID {equipment_id} no encontrado"}), 404
+    try:
+        if 'If-None-Match' in request.headers:
+            version = await get_equipment_db().get_equipment_version(equipment_id)
+            if version is not None:
+                etag = etags.entity_etag(*version)
+                if etags.none_match(request.headers['If-None-Match'], etag):
+                    return not_modified(etag)
+        equipment = await get_equipment_db().get_equipment_by_id(equipment_id)
+        if not equipment:
+            return jsonify({"error": f"Equipo con ID {equipment_id} no encontrado"}), 404
+        return conditional(serialize(equipment), entity_etag(equipment))
+    except Exception as e:
+        log.error("Error al obtener equipo:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/<equipment_id>', methods=['PUT'])
+async def update_equipment(equipment_id):
+    """Actualiza los campos enviados de un equipo."""
+    log.info(f"Recibida solicitud para actualizar el equipo {equipment_id}.")
+    if parse_entity_id(equipment_id) is None:
+        return jsonify({"error": f"Equipo con ID {equipment_id} no encontrado"}), 404
+    try:
+        equipment = await get_equipment_db().update_equipment(equipment_id, await request.get_json() or {}, if_match=request.headers.get('If-Match'))
+        return with_etag(jsonify(serialize(equipment)), entity_etag(equipment)), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except PreconditionFailedError as e:
+        return jsonify({"error": str(e)}), 412
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al actualizar equipo:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/<equipment_id>', methods=['DELETE'])
+async def delete_equipment(equipment_id):
+    """Elimina un equipo (soft delete)."""
+    log.info(f"Recibida solicitud para eliminar el equipo {equipment_id}.")
+    if parse_entity_id(equipment_id) is None:
+        return jsonify({"error": f"Equipo con ID {equipment_id} no encontrado"}), 404
+    try:
+        await get_equipment_db().delete_equipment(equipment_id)
+        return jsonify({"id": equipment_id, "deleted": True}), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        log.error("Error al eliminar equipo:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/equipment/<equipment_id>/restore', methods=['POST'])
+async def restore_equipment(equipment_id):
+    """Vuelve a activar un equipo eliminado, aunque ya se haya movido al archivo."""
+    log.info(f"Recibida solicitud para restaurar el equipo {equipment_id}.")
+    if parse_entity_id(equipment_id) is None:
+        return jsonify({"error": f"Equipo con ID {equipment_id} no encontrado"}), 404
+    try:
+        equipment = await get_equipment_db().restore_equipment(equipment_id)
+        return with_etag(jsonify(serialize(equipment)), entity_etag(equipment)), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        log.error("Error al restaurar equipo:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/<product_id>', methods=['GET'])
+async def get_product(product_id):
+    """Obtiene un producto por ID."""
+    log.info(f"Recibida solicitud para obtener el producto {product_id}.")
+    if parse_entity_id(product_id) is None:
+        return jsonify({"error": f"Producto con ID {product_id} no encontrado"}), 404
+    try:
+        if 'If-None-Match' in request.headers:
+            version = await get_product_db().get_product_version(product_id)
+            if version is not None:
+                etag = etags.entity_etag(*version)
+                if etags.none_match(request.headers['If-None-Match'], etag):
+                    return not_modified(etag)
+        product = await get_product_db().get_product_by_id(product_id)
+        if not product:
+            return jsonify({"error": f"Producto con ID {product_id} no encontrado"}), 404
+        return conditional(serialize(product), entity_etag(product))
+    except Exception as e:
+        log.error("Error al obtener producto:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/<product_id>', methods=['PUT'])
+async def update_product(product_id):
+    """Actualiza los campos enviados de un producto."""
+    log.info(f"Recibida solicitud para actualizar el producto {product_id}.")
+    if parse_entity_id(product_id) is None:
+        return jsonify({"error": f"Producto con ID {product_id} no encontrado"}), 404
+    try:
+        product = await get_product_db().update_product(product_id, await request.get_json() or {}, if_match=request.headers.get('If-Match'))
+        return with_etag(jsonify(serialize(product)), entity_etag(product)), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except PreconditionFailedError as e:
+        return jsonify({"error": str(e)}), 412
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        log.error("Error al actualizar producto:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/<product_id>', methods=['DELETE'])
+async def delete_product(product_id):
+    """Elimina un producto (soft delete)."""
+    log.info(f"Recibida solicitud para eliminar el producto {product_id}.")
+    if parse_entity_id(product_id) is None:
+        return jsonify({"error": f"Producto con ID {product_id} no encontrado"}), 404
+    try:
+        await get_product_db().delete_product(product_id)
+        return jsonify({"id": product_id, "deleted": True}), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        log.error("Error al eliminar producto:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+@api.route('/products/<product_id>/restore', methods=['POST'])
+async def restore_product(product_id):
+    """Vuelve a activar un producto eliminado, aunque ya se haya movido al archivo."""
+    log.info(f"Recibida solicitud para restaurar el producto {product_id}.")
+    if parse_entity_id(product_id) is None:
+        return jsonify({"error": f"Producto con ID {product_id} no encontrado"}), 404
+    try:
+        product = await get_product_db().restore_product(product_id)
+        return with_etag(jsonify(serialize(product)), entity_etag(product)), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        log.error("Error al restaurar producto:", e)
+        return jsonify(INTERNAL_ERROR), 500
+
+
+app = create_app()
+
+if __name__ == '__main__':
+    app.run(debug=True)
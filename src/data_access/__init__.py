@@ -1,5 +1,31 @@
-from .db_connector import db_connector
-from .equipment_db import EquipmentDB
-from .product_db import ProductDB
+import importlib
 
-__all__ = ['db_connector', 'EquipmentDB', 'ProductDB']
\ No newline at end of file
+# Los módulos se importan hasta que se usa el nombre (PEP 562), para que importar
+# src.data_access.errors o src.app no cargue psycopg2 durante el arranque en frío.
+# Las instancias que se llaman igual que su submódulo (db_connector, async_db_connector,
+# cache_listener) no se exportan: una vez importado el submódulo, el paquete devuelve el
+# módulo. Se importan de su submódulo (from src.data_access.db_connector import db_connector).
+_EXPORTS = {
+    'EquipmentDB': '.equipment_db',
+    'ProductDB': '.product_db',
+    'AsyncEquipmentDB': '.async_equipment_db',
+    'AsyncProductDB': '.async_product_db',
+    'CatalogAggregates': '.aggregates',
+    'AsyncCatalogAggregates': '.async_aggregates',
+    'CatalogIO': '.catalog_io',
+    'NotFoundError': '.errors',
+    'EntityCache': '.entity_cache',
+    'equipment_cache': '.entity_cache',
+    'product_cache': '.entity_cache',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
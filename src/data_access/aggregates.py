@@ -0,0 +1,183 @@
+"""
+Resúmenes del catálogo: productos por categoría (cantidad y precio mínimo/promedio/máximo)
+y equipos por ubicación.
+
+Los mantienen los triggers de `migrations/0004_catalog_aggregates.sql` en la misma
+transacción que cada escritura, así que leerlos cuesta O(grupos) y no depende del tamaño
+de las tablas. `rebuild` los recalcula desde cero por si alguna vez se desalinean.
+
+Uso:
+    python -m src.data_access.aggregates show
+    python -m src.data_access.aggregates check     # compara con un recálculo; falla si difieren
+    python -m src.data_access.aggregates rebuild
+"""
+import sys
+from decimal import Decimal
+from src.data_access.db_connector import db_connector
+from src.data_access.queries import LIVE_FILTER, TYPED_COLUMNS
+from src.utils import logger
+
+log = logger('Aggregates')
+
+# min/max salen de la llave primaria (category, price) de product_category_prices
+PRODUCT_STATS_QUERY = """
+    SELECT s.category, s.product_count, s.price_sum / s.product_count,
+           (SELECT min(p.price) FROM public.product_category_prices p WHERE p.category = s.category),
+           (SELECT max(p.price) FROM public.product_category_prices p WHERE p.category = s.category)
+    FROM public.product_category_stats s
+    ORDER BY s.category
+"""
+EQUIPMENT_STATS_QUERY = """
+    SELECT location, equipment_count FROM public.equipment_location_stats ORDER BY location
+"""
+# Las mismas cifras calculadas desde las tablas base (para `check`; recorre la tabla completa)
+PRICE = "price" if TYPED_COLUMNS else "(data->>'price')::numeric"
+CATEGORY = "category" if TYPED_COLUMNS else "(data->>'category')"
+PRODUCT_STATS_LIVE_QUERY = f"""
+    SELECT coalesce({CATEGORY}, 'General'), count(*),
+           avg(coalesce({PRICE}, 0)),
+           min(coalesce({PRICE}, 0)),
+           max(coalesce({PRICE}, 0))
+    FROM public."Product"
+    WHERE {LIVE_FILTER}
+    GROUP BY 1
+    ORDER BY 1
+"""
+EQUIPMENT_STATS_LIVE_QUERY = f"""
+    SELECT coalesce(data->>'location', ''), count(*)
+    FROM public."Equipment"
+    WHERE {LIVE_FILTER}
+    GROUP BY 1
+    ORDER BY 1
+"""
+REBUILD_QUERY = "SELECT public.rebuild_catalog_stats()"
+
+
+def _number(value):
+    # numeric llega como Decimal; la API devuelve floats como el resto de los precios
+    if isinstance(value, Decimal):
+        return round(float(value), 2)
+    return value
+
+
+def product_stats_row(row):
+    category, count, avg_price, min_price, max_price = row
+    return {
+        "category": category,
+        "count": int(count),
+        "minPrice": _number(min_price),
+        "avgPrice": _number(avg_price),
+        "maxPrice": _number(max_price),
+    }
+
+
+def equipment_stats_row(row):
+    location, count = row
+    return {"location": location, "count": int(count)}
+
+
+class CatalogAggregates:
+    def __init__(self):
+        self.db = db_connector
+
+    def _fetch(self, query):
+        with self.db.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                return cursor.fetchall()
+
+    def get_product_category_stats(self):
+        """
+        Cantidad de productos activos y precio mínimo/promedio/máximo por categoría.
+
+        Returns:
+            list: dicts {category, count, minPrice, avgPrice, maxPrice} ordenados por categoría
+        """
+        try:
+            rows = self._fetch(PRODUCT_STATS_QUERY)
+        except Exception as e:
+            log.error("❌ Error al obtener estadísticas de productos: ", e)
+            raise
+        return [product_stats_row(row) for row in rows]
+
+    def get_equipment_location_stats(self):
+        """
+        Cantidad de equipos activos por ubicación.
+
+        Returns:
+            list: dicts {location, count} ordenados por ubicación
+        """
+        try:
+            rows = self._fetch(EQUIPMENT_STATS_QUERY)
+        except Exception as e:
+            log.error("❌ Error al obtener estadísticas de equipos: ", e)
+            raise
+        return [equipment_stats_row(row) for row in rows]
+
+    def rebuild(self):
+        """Recalcula todos los resúmenes desde las tablas base (bloquea escrituras mientras corre)."""
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(REBUILD_QUERY)
+                connection.commit()
+        except Exception as e:
+            log.error("❌ Error al recalcular los resúmenes del catálogo: ", e)
+            raise
+        log.info("✅ Resúmenes del catálogo recalculados")
+
+    def check(self):
+        """
+        Compara los resúmenes con un recálculo desde las tablas base.
+
+        Returns:
+            list: Grupos que difieren, como (tabla, resumen guardado, recalculado)
+        """
+        differences = []
+        for name, stored_query, live_query, to_dict in (
+            ("products", PRODUCT_STATS_QUERY, PRODUCT_STATS_LIVE_QUERY, product_stats_row),
+            ("equipment", EQUIPMENT_STATS_QUERY, EQUIPMENT_STATS_LIVE_QUERY, equipment_stats_row),
+        ):
+            # Ambas lecturas en la misma transacción REPEATABLE READ para comparar la misma foto
+            with self.db.connection() as connection:
+                connection.set_session(isolation_level='REPEATABLE READ')
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute(stored_query)
+                        stored = {row[0]: to_dict(row) for row in cursor.fetchall()}
+                        cursor.execute(live_query)
+                        live = {row[0]: to_dict(row) for row in cursor.fetchall()}
+                    connection.rollback()
+                finally:
+                    connection.set_session(isolation_level='DEFAULT')
+            for key in sorted(set(stored) | set(live)):
+                if stored.get(key) != live.get(key):
+                    differences.append((name, stored.get(key), live.get(key)))
+        return differences
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'show'
+    aggregates = CatalogAggregates()
+    if command == 'show':
+        for row in aggregates.get_product_category_stats():
+            print(f"{row['category']}: {row['count']} productos, precio {row['minPrice']} / {row['avgPrice']} / {row['maxPrice']}")
+        for row in aggregates.get_equipment_location_stats():
+            print(f"{row['location']}: {row['count']} equipos")
+    elif command == 'check':
+        differences = aggregates.check()
+        for name, stored, live in differences:
+            log.error(f"❌ {name}: guardado {stored}, recalculado {live}")
+        if not differences:
+            log.info("✅ Los resúmenes coinciden con las tablas")
+        return 1 if differences else 0
+    elif command == 'rebuild':
+        aggregates.rebuild()
+    else:
+        print("Uso: python -m src.data_access.aggregates [show | check | rebuild]")
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,169 @@
+"""
+Archivado y purgado de registros eliminados.
+
+`delete_equipment`/`delete_product` solo marcan `deleted: true`. Este trabajo mueve los
+que llevan más de ARCHIVE_AFTER_DAYS días eliminados a `equipment_archive` /
+`product_archive` (migración 0010), en lotes de ARCHIVE_BATCH_SIZE registros con un
+commit por lote: cada lote bloquea solo sus filas y el DELETE + INSERT es atómico, así
+que un registro nunca queda en las dos tablas ni en ninguna. `purge` borra del archivo
+lo archivado hace más de N días. Para volver a activar un registro archivado se usa
+restore_equipment/restore_product (POST /<entidad>/<id>/restore).
+
+Usa las columnas tipadas de 0008: las bajas anteriores a esa migración se archivan
+recién cuando las completa el backfill.
+
+Uso:
+    python -m src.data_access.archiver run                   # las dos tablas
+    python -m src.data_access.archiver run products --days 90 --max-batches 100
+    python -m src.data_access.archiver purge equipment --days 365
+    python -m src.data_access.archiver status
+
+En Lambda corre con el evento programado de serverless.yml (handler).
+"""
+import os
+import sys
+import time
+import argparse
+from src.data_access.db_connector import db_connector
+from src.data_access.queries import ARCHIVE_TABLES, archive_batch_query, purge_batch_query
+from src.utils import logger
+
+log = logger('Archiver')
+
+# Días que un registro eliminado sigue en la tabla caliente (y restaurable con un UPDATE)
+ARCHIVE_AFTER_DAYS = float(os.environ.get('ARCHIVE_AFTER_DAYS', 30))
+# Registros por lote (y por commit)
+BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+# Pausa entre lotes para dejar respirar a la replicación y al autovacuum
+PAUSE_MS = float(os.environ.get('ARCHIVE_PAUSE_MS', 50))
+# Margen que el handler de Lambda deja antes del timeout para terminar el lote en curso
+LAMBDA_MARGIN_S = 15
+
+TABLES = {"equipment": "Equipment", "products": "Product"}
+
+
+class Archiver:
+    def __init__(self, batch_size=BATCH_SIZE, pause_ms=PAUSE_MS):
+        self.batch_size = batch_size
+        self.pause = pause_ms / 1000
+        self.db = db_connector
+
+    def _run_batches(self, table, query, days, max_batches, deadline, action):
+        # Ejecuta `query` lote por lote hasta que no mueva nada, se llegue a
+        # max_batches o se pase el deadline (time.monotonic)
+        total = 0
+        batches = 0
+        started = time.perf_counter()
+        while max_batches is None or batches < max_batches:
+            if deadline is not None and time.monotonic() >= deadline:
+                log.warning(f"⚠️ Se agotó el tiempo para {action} {table}; el resto queda para la próxima corrida")
+                break
+            with self.db.connection() as connection:
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute(query, (days, self.batch_size))
+                        count = cursor.rowcount
+                    connection.commit()
+                except Exception as e:
+                    connection.rollback()
+                    log.error(f"❌ Error al {action} {table}: ", e)
+                    raise
+            total += count
+            batches += 1
+            if count < self.batch_size:
+                break
+            if self.pause:
+                time.sleep(self.pause)
+
+        if total:
+            log.info(f"✅ {table}: {total} registros ({action})", batches=batches,
+                     duration_s=round(time.perf_counter() - started, 1))
+        return total
+
+    def archive(self, table, days=ARCHIVE_AFTER_DAYS, max_batches=None, deadline=None):
+        """
+        Mueve al archivo los registros de `table` eliminados hace más de `days` días.
+
+        Args:
+            table (str): "Equipment" o "Product"
+            days (float): Ventana de retención en la tabla caliente
+            max_batches (int): Tope de lotes por corrida (None: hasta terminar)
+            deadline (float): time.monotonic() a partir del cual no se empiezan lotes nuevos
+
+        Returns:
+            int: Registros archivados
+        """
+        return self._run_batches(table, archive_batch_query(table), days, max_batches, deadline, "archivar")
+
+    def purge(self, table, days, max_batches=None, deadline=None):
+        """Borra definitivamente del archivo los registros archivados hace más de `days` días."""
+        if days is None or days < 0:
+            raise ValueError("Indicar cuántos días conservar el archivo (--days).")
+        return self._run_batches(table, purge_batch_query(table), days, max_batches, deadline, "purgar")
+
+    def status(self, table, days=ARCHIVE_AFTER_DAYS):
+        """
+        Returns:
+            dict: {"table", "pending": eliminados listos para archivar, "archived": registros en el archivo}
+        """
+        with self.db.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""SELECT count(*) FROM public."{table}"
+                        WHERE deleted = true AND modified_at < now() - %s::float8 * interval '1 day'""",
+                    (days,)
+                )
+                pending = cursor.fetchone()[0]
+                cursor.execute(f"SELECT count(*) FROM {ARCHIVE_TABLES[table]}")
+                archived = cursor.fetchone()[0]
+            connection.rollback()
+        return {"table": table, "pending": pending, "archived": archived}
+
+
+def handler(event, context):
+    """Punto de entrada del evento programado de Lambda: archiva las dos tablas dentro del tiempo disponible."""
+    logger.configure(environment=os.environ.get('LOGS', 'prod'))
+    deadline = None
+    if context is not None:
+        deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - LAMBDA_MARGIN_S
+    archiver = Archiver()
+    try:
+        return {table: archiver.archive(table, deadline=deadline) for table in TABLES.values()}
+    finally:
+        logger.flush()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m src.data_access.archiver',
+                                     description="Archiva o purga los registros eliminados.")
+    parser.add_argument('command', choices=('run', 'purge', 'status'))
+    parser.add_argument('entity', nargs='?', choices=tuple(TABLES), help="Por default, las dos tablas")
+    parser.add_argument('--days', type=float, help=f"run/status: días desde la baja (default: {ARCHIVE_AFTER_DAYS:g}); "
+                                                   f"purge: días desde el archivado (requerido)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--pause-ms', type=float, default=PAUSE_MS)
+    parser.add_argument('--max-batches', type=int, help="Tope de lotes por tabla")
+    args = parser.parse_args(argv[1:])
+
+    tables = [TABLES[args.entity]] if args.entity else list(TABLES.values())
+    archiver = Archiver(batch_size=args.batch_size, pause_ms=args.pause_ms)
+
+    if args.command == 'run':
+        days = ARCHIVE_AFTER_DAYS if args.days is None else args.days
+        for table in tables:
+            archiver.archive(table, days=days, max_batches=args.max_batches)
+    elif args.command == 'purge':
+        if args.days is None:
+            parser.error("purge requiere --days")
+        for table in tables:
+            archiver.purge(table, args.days, max_batches=args.max_batches)
+    else:
+        days = ARCHIVE_AFTER_DAYS if args.days is None else args.days
+        for table in tables:
+            status = archiver.status(table, days=days)
+            print(f"{table}: {status['pending']} eliminados para archivar, {status['archived']} en el archivo")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,41 @@
+from src.data_access.aggregates import (
+    EQUIPMENT_STATS_QUERY, PRODUCT_STATS_QUERY, REBUILD_QUERY, equipment_stats_row, product_stats_row
+)
+from src.data_access.async_db_connector import async_db_connector
+from src.utils import logger
+
+log = logger('Async_Aggregates')
+
+
+class AsyncCatalogAggregates:
+    """Versión asíncrona de CatalogAggregates (mismas consultas y mismo resultado)."""
+
+    def __init__(self):
+        self.db = async_db_connector
+
+    async def get_product_category_stats(self):
+        try:
+            async with self.db.connection() as connection:
+                rows = await connection.fetch(PRODUCT_STATS_QUERY)
+        except Exception as e:
+            log.error("❌ Error al obtener estadísticas de productos: ", e)
+            raise
+        return [product_stats_row(tuple(row)) for row in rows]
+
+    async def get_equipment_location_stats(self):
+        try:
+            async with self.db.connection() as connection:
+                rows = await connection.fetch(EQUIPMENT_STATS_QUERY)
+        except Exception as e:
+            log.error("❌ Error al obtener estadísticas de equipos: ", e)
+            raise
+        return [equipment_stats_row(tuple(row)) for row in rows]
+
+    async def rebuild(self):
+        try:
+            async with self.db.connection() as connection:
+                await connection.execute(REBUILD_QUERY)
+        except Exception as e:
+            log.error("❌ Error al recalcular los resúmenes del catálogo: ", e)
+            raise
+        log.info("✅ Resúmenes del catálogo recalculados")
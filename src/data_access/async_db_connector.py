@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import time
+import asyncio
+import contextlib
+from functools import lru_cache
+import asyncpg
+from src.data_access.errors import PoolTimeoutError
+from src.utils import logger, metrics
+
+log = logger('Async_DB_Connector')
+
+# Funciones que reciben (sentencia, duración en ms, filas) después de cada consulta
+query_hooks = [metrics.record_query]
+
+_PLACEHOLDERS = re.compile(r'%%|%s')
+
+
+@lru_cache(maxsize=256)
+def to_asyncpg(query):
+    """
+    Traduce los marcadores `%s` de psycopg2 a `$1, $2, ...` de asyncpg.
+
+    Así las dos capas comparten los mismos fragmentos de `queries.py` (y con
+    ello los mismos índices) y las métricas agrupan ambas bajo la misma huella.
+    """
+    counter = iter(range(1, 1_000_000))
+    return _PLACEHOLDERS.sub(lambda match: '%' if match.group() == '%%' else f'${next(counter)}', query)
+
+
+def _status_rows(status):
+    # execute devuelve la etiqueta del comando, p. ej. "UPDATE 3" o "INSERT 0 1"
+    try:
+        return int(status.rsplit(' ', 1)[-1])
+    except (AttributeError, ValueError):
+        return -1
+
+
+class InstrumentedConnection:
+    """
+    Envoltura de una conexión de asyncpg que acepta SQL con `%s` y mide cada consulta.
+
+    Expone el subconjunto que usan las clases de acceso a datos; la conexión
+    original queda en `raw` para lo demás.
+    """
+
+    __slots__ = ('raw',)
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    async def fetch(self, query, *args):
+        return await self._run(self.raw.fetch, query, args, len)
+
+    async def fetchrow(self, query, *args):
+        return await self._run(self.raw.fetchrow, query, args, lambda row: 0 if row is None else 1)
+
+    async def execute(self, query, *args):
+        return await self._run(self.raw.execute, query, args, _status_rows)
+
+    async def executemany(self, query, args):
+        start = time.perf_counter()
+        rows = -1
+        try:
+            await self.raw.executemany(to_asyncpg(query), args)
+            rows = len(args)
+        finally:
+            self._report(query, start, rows)
+
+    def transaction(self, **options):
+        return self.raw.transaction(**options)
+
+    def cursor(self, query, *args, prefetch=None):
+        """Cursor del lado del servidor; solo se puede usar dentro de una transacción."""
+        return self.raw.cursor(to_asyncpg(query), *args, prefetch=prefetch)
+
+    async def _run(self, method, query, args, count_rows):
+        start = time.perf_counter()
+        rows = -1
+        try:
+            result = await method(to_asyncpg(query), *args)
+            rows = count_rows(result)
+            return result
+        finally:
+            self._report(query, start, rows)
+
+    @staticmethod
+    def _report(query, start, rows):
+        duration_ms = (time.perf_counter() - start) * 1000
+        for hook in query_hooks:
+            try:
+                hook(query, duration_ms, rows)
+            except Exception as e:
+                log.debug("⚠️ Error en hook de instrumentación: ", e)
+
+
+class AsyncDatabaseConnector:
+    """
+    Pool de conexiones asyncpg compartido por las clases de acceso a datos asíncronas.
+
+    Es el equivalente de `DatabaseConnector` para el modo ASGI: mientras una
+    consulta espera a PostgreSQL, el event loop atiende otros requests, así que un
+    solo proceso mantiene varias consultas en vuelo. Usa las mismas variables
+    DB_* y DB_POOL_* que el pool síncrono.
+
+    El pool de asyncpg queda atado al event loop en el que se crea, por eso se abre
+    en el primer uso (dentro del loop del servidor) y no al importar el módulo.
+
+    Uso:
+        async with async_db_connector.connection() as connection:
+            row = await connection.fetchrow(query, *params)
+    """
+
+    def __init__(self, min_size=None, max_size=None, timeout=None, max_uses=None, max_idle=None):
+        self.db_host = os.environ.get("DB_HOST")
+        self.db_port = os.environ.get("DB_PORT")
+        self.db_name = os.environ.get("DB_NAME")
+        self.db_user = os.environ.get("DB_USER")
+        self.db_pass = os.environ.get("DB_PASS")
+
+        # Configuración del pool (parámetros explícitos > variables de entorno > defaults)
+        self.min_size = min_size if min_size is not None else int(os.environ.get("DB_POOL_MIN", 1))
+        self.max_size = max_size if max_size is not None else int(os.environ.get("DB_POOL_MAX", 5))
+        self.timeout = timeout if timeout is not None else float(os.environ.get("DB_POOL_TIMEOUT", 5))
+        self.max_uses = max_uses if max_uses is not None else int(os.environ.get("DB_POOL_MAX_USES", 5000))
+        self.max_idle = max_idle if max_idle is not None else float(os.environ.get("DB_POOL_MAX_IDLE", 600))
+
+        if self.max_size < 1 or self.min_size < 0 or self.min_size > self.max_size:
+            raise ValueError("Configuración de pool inválida: se requiere 0 <= min_size <= max_size y max_size >= 1.")
+
+        self._pool = None
+        self._opening = None
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        """Presta una conexión del pool y la devuelve al salir del bloque."""
+        start = time.perf_counter()
+        pool = await self.open()
+        try:
+            raw = await pool.acquire(timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeoutError(
+                f"No hay conexiones disponibles tras {self.timeout}s (max_size={self.max_size})."
+            ) from None
+        metrics.record('pool', (time.perf_counter() - start) * 1000)
+        try:
+            yield InstrumentedConnection(raw)
+        finally:
+            # asyncpg revierte transacciones abiertas y limpia el estado al liberar
+            await pool.release(raw)
+
+    async def open(self):
+        """Crea el pool (con `min_size` conexiones) si todavía no existe."""
+        if self._pool is not None:
+            return self._pool
+        # Varias tareas pueden pedir la primera conexión a la vez: solo una crea el pool
+        if self._opening is None:
+            self._opening = asyncio.ensure_future(self._create_pool())
+        try:
+            self._pool = await asyncio.shield(self._opening)
+        except Exception:
+            self._opening = None
+            raise
+        return self._pool
+
+    async def close(self):
+        """Cierra el pool; se llama al apagar el servidor ASGI."""
+        pool, self._pool, self._opening = self._pool, None, None
+        if pool is not None:
+            await pool.close()
+            log.debug("🔌 Pool asíncrono de PostgreSQL cerrado.")
+
+    def stats(self):
+        if self._pool is None:
+            return {"size": 0, "idle": 0, "in_use": 0, "max_size": self.max_size}
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        return {"size": size, "idle": idle, "in_use": size - idle, "max_size": self.max_size}
+
+    # ------------------------------------------------------------------
+    # Internos del pool
+    # ------------------------------------------------------------------
+
+    async def _create_pool(self):
+        start = time.perf_counter()
+        try:
+            pool = await asyncpg.create_pool(
+                host=self.db_host,
+                port=self.db_port,
+                database=self.db_name,
+                user=self.db_user,
+                password=self.db_pass,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                timeout=self.timeout,
+                # Equivalentes de DB_POOL_MAX_USES y DB_POOL_MAX_IDLE del pool síncrono
+                max_queries=self.max_uses,
+                max_inactive_connection_lifetime=self.max_idle,
+                init=self._init_connection
+            )
+        except Exception as e:
+            log.error("❌ Error al conectar a PostgreSQL (asyncpg): ", e)
+            raise
+        duration_ms = (time.perf_counter() - start) * 1000
+        metrics.record('connect', duration_ms)
+        metrics.registry.observe('connect', 'postgresql-async', duration_ms)
+        log.debug("✅ Pool asíncrono de PostgreSQL listo.")
+        return pool
+
+    @staticmethod
+    async def _init_connection(connection):
+        # Igual que register_adapter(dict, Json) en el pool síncrono: JSONB entra y sale como dict
+        for type_name in ('jsonb', 'json'):
+            await connection.set_type_codec(
+                type_name, encoder=json.dumps, decoder=json.loads, schema='pg_catalog'
+            )
+
+
+# Instancia compartida por el proceso ASGI
+async_db_connector = AsyncDatabaseConnector()
@@ -0,0 +1,454 @@
+import time
+import asyncio
+from src.data_access.async_db_connector import async_db_connector
+from src.data_access.entity_cache import equipment_cache
+from src.data_access.errors import NotFoundError, PreconditionFailedError
+from src.data_access.ids import normalize_ids
+from src.data_access.pagination import (
+    DEFAULT_ITERSIZE, decode_search_token, decode_token, encode_search_token, encode_token, normalize_change_cursor,
+    normalize_limit, normalize_search_term,
+)
+from src.data_access.queries import (
+    CHANGE_LOCK_KEYS, CHANGE_WRITERS_QUERY, CHANGES_POLL_MS, CHANGES_WAIT_MS,
+    ROW_COLUMNS, VERSION_COLUMNS, by_id_query, by_ids_query, changes_query, list_query, restore_from_archive_query,
+    search_query, undelete_query, watermark_query,
+)
+from src.entities import Equipment
+from src.utils import etags, logger, metrics, time_helper
+
+log = logger('Async_Equipment_DB')
+
+class AsyncEquipmentDB:
+    """
+    Versión asíncrona de EquipmentDB (asyncpg) con los mismos métodos, como corrutinas.
+
+    Comparte con la versión síncrona las consultas de `queries.py`, la caché de
+    entidades y la validación de la entidad, así que ambas devuelven lo mismo.
+    """
+    # Filas por executemany en las cargas masivas
+    BULK_CHUNK_SIZE = 1000
+    # Campos por los que se puede filtrar un listado
+    FILTERABLE_FIELDS = ('location', 'serial_number', 'createdBy')
+    # Campos que el cliente puede modificar con update
+    UPDATABLE_FIELDS = ('name', 'location', 'serial_number')
+
+    def __init__(self):
+        self.db = async_db_connector
+        self.cache = equipment_cache
+
+    def _build_equipment(self, row):
+        # asyncpg devuelve los UUID como uuid.UUID; la versión síncrona los entrega como str
+        return Equipment.from_row(str(row[0]), row[1])
+
+    def _cache_row(self, row, version=None):
+        # `version` es self.cache.version tomado antes de la consulta (ver EntityCache.version)
+        entity_id = str(row[0])
+        self.cache.set(entity_id, (entity_id, row[1]), version=version)
+
+    def _filters_document(self, filters):
+        if not filters:
+            return None
+        unknown = [field for field in filters if field not in self.FILTERABLE_FIELDS]
+        if unknown:
+            raise ValueError(f"No se puede filtrar por: {', '.join(unknown)}")
+        return dict(filters)
+
+    def _page_query(self, limit, after, filters, columns=ROW_COLUMNS):
+        limit = normalize_limit(limit)
+        contains = self._filters_document(filters)
+        params = []
+        if contains:
+            params.append(contains)
+        if after:
+            created_at, last_id = decode_token(after)
+            params.extend([created_at, last_id])
+        params.append(limit + 1)
+        query = list_query("Equipment", keyset=bool(after), contains=bool(contains), columns=columns)
+        return limit, query, params
+
+    def _search_query(self, term, limit, after):
+        # Igual que _page_query: (limit, sql, params) pidiendo limit + 1 filas
+        term = normalize_search_term(term)
+        limit = normalize_limit(limit)
+        params = [term, term, term]
+        if after:
+            rank, last_id = decode_search_token(after)
+            params.extend([rank, last_id])
+        params.append(limit + 1)
+        return limit, search_query("Equipment", keyset=bool(after)), params
+
+    async def _check_version(self, connection, equipment_id, if_match):
+        # Dentro de una transacción: la fila queda bloqueada hasta el UPDATE
+        current = await connection.fetchrow(by_id_query("Equipment", columns=VERSION_COLUMNS) + " FOR UPDATE", equipment_id)
+        if current is None:
+            raise NotFoundError(f"Equipo con ID {equipment_id} no encontrado")
+        if not etags.match(if_match, etags.entity_etag(str(current[0]), current[1])):
+            raise PreconditionFailedError(f"El equipo {equipment_id} cambió desde que se leyó (If-Match no coincide).")
+
+    def _new_equipment(self, equipment_data):
+        # Construir la entidad valida los datos recibidos
+        return Equipment(
+            name=equipment_data.get('name'),
+            location=equipment_data.get('location'),
+            serial_number=equipment_data.get('serial_number', 'N/A'),
+            createdBy=equipment_data.get('createdBy')
+        )
+
+    async def create_equipment(self, equipment_data):
+        equipment = self._new_equipment(equipment_data)
+
+        query = """
+            INSERT INTO public."Equipment" (id, data)
+            VALUES (%s, %s)
+        """
+
+        try:
+            async with self.db.connection() as connection:
+                await connection.execute(query, equipment.get_id(), equipment.get_data())
+        except Exception as e:
+            log.error("❌ Error al crear equipo: ", e)
+            raise
+
+        self.cache.set(str(equipment.get_id()), (str(equipment.get_id()), equipment.get_data()))
+        log.info(f"✅ Equipo creado exitosamente con ID: {equipment.get_id()}")
+        return equipment.get_id()
+
+    async def create_equipment_bulk(self, items, chunk_size=None):
+        """
+        Crea muchos registros en una sola transacción.
+
+        Igual que la versión síncrona: los inválidos se reportan sin detener la carga
+        y los válidos se envían en bloques de `chunk_size` filas con executemany,
+        que asyncpg manda en un solo viaje por bloque.
+
+        Returns:
+            dict: {"created": [ids], "failed": [{"index": i, "error": mensaje}]}
+        """
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        query = 'INSERT INTO public."Equipment" (id, data) VALUES (%s, %s)'
+        created = []
+        failed = []
+
+        try:
+            async with self.db.connection() as connection:
+                async with connection.transaction():
+                    chunk = []
+                    for index, equipment_data in enumerate(items):
+                        try:
+                            equipment = self._new_equipment(equipment_data)
+                        except (ValueError, TypeError, AttributeError) as e:
+                            failed.append({"index": index, "error": str(e)})
+                            continue
+                        chunk.append((equipment.get_id(), equipment.get_data()))
+                        if len(chunk) >= chunk_size:
+                            await connection.executemany(query, chunk)
+                            created.extend(row[0] for row in chunk)
+                            chunk = []
+                    if chunk:
+                        await connection.executemany(query, chunk)
+                        created.extend(row[0] for row in chunk)
+        except Exception as e:
+            log.error("❌ Error en la carga masiva de equipos: ", e)
+            raise
+
+        log.info(f"✅ Carga masiva: {len(created)} equipos creados, {len(failed)} con errores")
+        return {"created": created, "failed": failed}
+
+    async def get_equipment_by_id(self, equipment_id):
+        cached = self.cache.get(str(equipment_id))
+        if cached is not None:
+            log.debug("✅ Equipo encontrado en caché con ID: %s", equipment_id)
+            return self._build_equipment(cached)
+        version = self.cache.version
+
+        try:
+            async with self.db.connection() as connection:
+                result = await connection.fetchrow(by_id_query("Equipment"), equipment_id)
+        except Exception as e:
+            log.error("❌ Error al obtener equipo por ID: ", e)
+            raise
+
+        if result:
+            self._cache_row(result, version)
+            log.debug("✅ Equipo encontrado con ID: %s", equipment_id)
+            return self._build_equipment(result)
+        log.warning(f"⚠️ No se encontró equipo con ID: {equipment_id}")
+        return None
+
+    async def get_equipment_by_ids(self, ids):
+        """
+        Obtiene varios registros por ID en una sola consulta (`id = ANY(...)`).
+
+        Returns:
+            tuple: (dict {id: Equipment}, lista de IDs no encontrados o inválidos)
+        """
+        wanted, missing = normalize_ids(ids)
+
+        found = {}
+        pending = []
+        for entity_id in wanted:
+            cached = self.cache.get(entity_id)
+            if cached is not None:
+                found[entity_id] = self._build_equipment(cached)
+            else:
+                pending.append(entity_id)
+        if not pending:
+            return found, missing
+        version = self.cache.version
+
+        try:
+            async with self.db.connection() as connection:
+                results = await connection.fetch(by_ids_query("Equipment"), pending)
+        except Exception as e:
+            log.error("❌ Error al obtener equipos por IDs: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            for result in results:
+                self._cache_row(result, version)
+                found[str(result[0])] = self._build_equipment(result)
+        missing.extend(entity_id for entity_id in pending if entity_id not in found)
+
+        log.debug("✅ Se encontraron %s de %s equipos solicitados", len(found), len(wanted))
+        return found, missing
+
+    async def get_all_equipment(self):
+        equipment_list = [equipment async for equipment in self.iter_equipment()]
+        log.debug("✅ Se encontraron %s equipos", len(equipment_list))
+        return equipment_list
+
+    async def get_equipment_page(self, limit=None, after=None, filters=None):
+        """
+        Devuelve una página de equipos activos ordenados por (createdAt, id) descendente.
+
+        Mismos parámetros y resultado que EquipmentDB.get_equipment_page.
+        """
+        limit, query, params = self._page_query(limit, after, filters)
+
+        try:
+            async with self.db.connection() as connection:
+                results = await connection.fetch(query, *params)
+        except Exception as e:
+            log.error("❌ Error al obtener página de equipos: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            items = [self._build_equipment(result) for result in results[:limit]]
+        next_token = None
+        if len(results) > limit:
+            last = items[-1]
+            next_token = encode_token(last.createdAt, last.id)
+
+        log.debug("✅ Página con %s equipos", len(items))
+        return items, next_token
+
+    async def get_equipment_version(self, equipment_id):
+        """(id, modifiedAt) del registro sin traer el documento, o None si no existe."""
+        cached = self.cache.get(str(equipment_id))
+        if cached is not None:
+            return cached[0], cached[1].get('modifiedAt')
+
+        try:
+            async with self.db.connection() as connection:
+                result = await connection.fetchrow(by_id_query("Equipment", columns=VERSION_COLUMNS), equipment_id)
+        except Exception as e:
+            log.error("❌ Error al obtener versión del equipo: ", e)
+            raise
+        return (str(result[0]), result[1]) if result else None
+
+    async def get_equipment_page_versions(self, limit=None, after=None, filters=None):
+        """(lista de (id, modifiedAt), hay página siguiente) de la página equivalente, sin hidratar."""
+        limit, query, params = self._page_query(limit, after, filters, columns=VERSION_COLUMNS)
+
+        try:
+            async with self.db.connection() as connection:
+                results = await connection.fetch(query, *params)
+        except Exception as e:
+            log.error("❌ Error al obtener versiones de equipos: ", e)
+            raise
+
+        return [(str(row[0]), row[1]) for row in results[:limit]], len(results) > limit
+
+    async def search_equipment(self, term, limit=None, after=None):
+        """
+        Busca equipos activos por relevancia.
+
+        Mismos parámetros y resultado que EquipmentDB.search_equipment.
+        """
+        limit, query, params = self._search_query(term, limit, after)
+
+        try:
+            async with self.db.connection() as connection:
+                results = await connection.fetch(query, *params)
+        except Exception as e:
+            log.error("❌ Error al buscar equipos: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            items = [self._build_equipment(result) for result in results[:limit]]
+        next_token = None
+        if len(results) > limit:
+            last = results[limit - 1]
+            next_token = encode_search_token(last[2], str(last[0]))
+
+        log.debug("✅ Búsqueda con %s equipos", len(items))
+        return items, next_token
+
+    async def iter_equipment(self, itersize=DEFAULT_ITERSIZE):
+        """
+        Recorre todos los equipos activos con un cursor del lado del servidor.
+
+        Se traen `itersize` filas por viaje; la conexión queda prestada mientras el
+        generador esté abierto.
+        """
+        query = list_query("Equipment", limit=False)
+
+        try:
+            async with self.db.connection() as connection:
+                async with connection.transaction():
+                    async for result in connection.cursor(query, prefetch=itersize):
+                        yield self._build_equipment(result)
+        except Exception as e:
+            log.error("❌ Error al obtener todos los equipos: ", e)
+            raise
+
+    async def _wait_for_writers(self, connection):
+        """Versión asíncrona de EquipmentDB._wait_for_writers."""
+        key = CHANGE_LOCK_KEYS["Equipment"]
+        pending = {row[0] for row in await connection.fetch(CHANGE_WRITERS_QUERY, key)}
+        deadline = time.monotonic() + CHANGES_WAIT_MS / 1000
+        while pending:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(CHANGES_POLL_MS / 1000)
+            pending &= {row[0] for row in await connection.fetch(CHANGE_WRITERS_QUERY, key)}
+        return True
+
+    async def changes_since(self, cursor=None, limit=None):
+        """
+        Equipos creados, modificados o eliminados después de `cursor`.
+
+        Mismos parámetros y resultado que EquipmentDB.changes_since.
+        """
+        cursor = normalize_change_cursor(cursor)
+        limit = normalize_limit(limit)
+
+        try:
+            async with self.db.connection() as connection:
+                async with connection.transaction():
+                    watermark = (await connection.fetchrow(watermark_query("Equipment")))[0]
+                    settled = await self._wait_for_writers(connection)
+                if not settled:
+                    log.debug("⚠️ Escrituras largas en curso; el feed de equipos sigue en %s", cursor)
+                    return [], cursor, True
+                if cursor is None or cursor >= watermark:
+                    return [], max(watermark, cursor or 0), False
+                results = await connection.fetch(changes_query("Equipment"), cursor, watermark, limit + 1)
+        except Exception as e:
+            log.error("❌ Error al obtener cambios de equipos: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            items = [self._build_equipment(result) for result in results[:limit]]
+        has_more = len(results) > limit
+        next_cursor = results[limit - 1][2] if has_more else watermark
+
+        log.debug("✅ %s cambios de equipos desde %s", len(items), cursor)
+        return items, next_cursor, has_more
+
+    async def update_equipment(self, equipment_id, equipment_data, if_match=None):
+        """
+        Actualiza solo los campos recibidos en una sola sentencia (`data || cambios`).
+
+        Con `if_match` se compara primero el ETag actual, con la fila bloqueada.
+
+        Returns:
+            Equipment: El registro tal como quedó guardado
+        """
+        changes = {key: equipment_data[key] for key in self.UPDATABLE_FIELDS if key in equipment_data}
+        if ('name' in changes and not changes['name']) or ('location' in changes and not changes['location']):
+            raise ValueError("El nombre y la ubicación del equipo son requeridos.")
+        changes['modifiedAt'] = time_helper.now()
+        version = self.cache.version
+
+        query = """
+            UPDATE public."Equipment"
+            SET data = data || %s::jsonb
+            WHERE id = %s
+            RETURNING id, data
+        """
+
+        try:
+            async with self.db.connection() as connection:
+                if if_match is None:
+                    result = await connection.fetchrow(query, changes, equipment_id)
+                else:
+                    async with connection.transaction():
+                        await self._check_version(connection, equipment_id, if_match)
+                        result = await connection.fetchrow(query, changes, equipment_id)
+        except (NotFoundError, PreconditionFailedError):
+            raise
+        except Exception as e:
+            log.error("❌ Error al actualizar equipo: ", e)
+            raise
+
+        if result is None:
+            raise NotFoundError(f"Equipo con ID {equipment_id} no encontrado")
+
+        self._cache_row(result, version)
+        log.info(f"✅ Equipo actualizado exitosamente con ID: {equipment_id}")
+        return self._build_equipment(result)
+
+    async def delete_equipment(self, equipment_id):
+        """Marca el registro como eliminado (soft delete) en una sola sentencia."""
+        changes = {"deleted": True, "modifiedAt": time_helper.now()}
+
+        query = """
+            UPDATE public."Equipment"
+            SET data = data || %s::jsonb
+            WHERE id = %s
+            RETURNING id
+        """
+
+        try:
+            async with self.db.connection() as connection:
+                result = await connection.fetchrow(query, changes, equipment_id)
+        except Exception as e:
+            log.error("❌ Error al eliminar equipo: ", e)
+            raise
+
+        self.cache.invalidate(str(equipment_id))
+        if result is None:
+            raise NotFoundError(f"Equipo con ID {equipment_id} no encontrado")
+
+        log.info(f"✅ Equipo eliminado (marcado como eliminado) con ID: {equipment_id}")
+        return equipment_id
+
+    async def restore_equipment(self, equipment_id):
+        """
+        Vuelve a activar un equipo eliminado. Si sigue en la tabla se reactiva con un
+        UPDATE; si ya se archivó (ver archiver.py) se devuelve desde el archivo, en la
+        misma transacción.
+
+        Returns:
+            Equipment: El registro restaurado
+        """
+        changes = {"deleted": False, "modifiedAt": time_helper.now()}
+        version = self.cache.version
+
+        try:
+            async with self.db.connection() as connection:
+                async with connection.transaction():
+                    result = await connection.fetchrow(undelete_query("Equipment"), changes, equipment_id)
+                    if result is None:
+                        result = await connection.fetchrow(restore_from_archive_query("Equipment"), equipment_id, changes)
+        except Exception as e:
+            log.error("❌ Error al restaurar equipo: ", e)
+            raise
+
+        if result is None:
+            raise NotFoundError(f"Equipo eliminado con ID {equipment_id} no encontrado")
+
+        self._cache_row(result, version)
+        log.info(f"✅ Equipo restaurado con ID: {equipment_id}")
+        return self._build_equipment(result)
@@ -0,0 +1,459 @@
+import time
+import asyncio
+from src.data_access.async_db_connector import async_db_connector
+from src.data_access.entity_cache import product_cache
+from src.data_access.errors import NotFoundError, PreconditionFailedError
+from src.data_access.ids import normalize_ids
+from src.data_access.pagination import (
+    DEFAULT_ITERSIZE, decode_search_token, decode_token, encode_search_token, encode_token, normalize_change_cursor,
+    normalize_limit, normalize_search_term,
+)
+from src.data_access.queries import (
+    CHANGE_LOCK_KEYS, CHANGE_WRITERS_QUERY, CHANGES_POLL_MS, CHANGES_WAIT_MS,
+    ROW_COLUMNS, VERSION_COLUMNS, by_id_query, by_ids_query, changes_query, list_query, restore_from_archive_query,
+    search_query, undelete_query, watermark_query,
+)
+from src.entities import Product
+from src.utils import etags, logger, metrics, time_helper
+
+log = logger('Async_Product_DB')
+
+class AsyncProductDB:
+    """
+    Versión asíncrona de ProductDB (asyncpg) con los mismos métodos, como corrutinas.
+
+    Comparte con la versión síncrona las consultas de `queries.py`, la caché de
+    entidades y la validación de la entidad, así que ambas devuelven lo mismo.
+    """
+    # Filas por executemany en las cargas masivas
+    BULK_CHUNK_SIZE = 1000
+    # Campos por los que se puede filtrar un listado
+    FILTERABLE_FIELDS = ('category', 'createdBy')
+    # Campos que el cliente puede modificar con update
+    UPDATABLE_FIELDS = ('name', 'price', 'description', 'category')
+
+    def __init__(self):
+        self.db = async_db_connector
+        self.cache = product_cache
+
+    def _build_product(self, row):
+        # asyncpg devuelve los UUID como uuid.UUID; la versión síncrona los entrega como str
+        return Product.from_row(str(row[0]), row[1])
+
+    def _cache_row(self, row, version=None):
+        # `version` es self.cache.version tomado antes de la consulta (ver EntityCache.version)
+        entity_id = str(row[0])
+        self.cache.set(entity_id, (entity_id, row[1]), version=version)
+
+    def _filters_document(self, filters):
+        if not filters:
+            return None
+        unknown = [field for field in filters if field not in self.FILTERABLE_FIELDS]
+        if unknown:
+            raise ValueError(f"No se puede filtrar por: {', '.join(unknown)}")
+        return dict(filters)
+
+    def _page_query(self, limit, after, filters, columns=ROW_COLUMNS):
+        limit = normalize_limit(limit)
+        contains = self._filters_document(filters)
+        params = []
+        if contains:
+            params.append(contains)
+        if after:
+            created_at, last_id = decode_token(after)
+            params.extend([created_at, last_id])
+        params.append(limit + 1)
+        query = list_query("Product", keyset=bool(after), contains=bool(contains), columns=columns)
+        return limit, query, params
+
+    def _search_query(self, term, limit, after):
+        # Igual que _page_query: (limit, sql, params) pidiendo limit + 1 filas
+        term = normalize_search_term(term)
+        limit = normalize_limit(limit)
+        params = [term, term, term]
+        if after:
+            rank, last_id = decode_search_token(after)
+            params.extend([rank, last_id])
+        params.append(limit + 1)
+        return limit, search_query("Product", keyset=bool(after)), params
+
+    async def _check_version(self, connection, product_id, if_match):
+        # Dentro de una transacción: la fila queda bloqueada hasta el UPDATE
+        current = await connection.fetchrow(by_id_query("Product", columns=VERSION_COLUMNS) + " FOR UPDATE", product_id)
+        if current is None:
+            raise NotFoundError(f"Producto con ID {product_id} no encontrado")
+        if not etags.match(if_match, etags.entity_etag(str(current[0]), current[1])):
+            raise PreconditionFailedError(f"El producto {product_id} cambió desde que se leyó (If-Match no coincide).")
+
+    def _new_product(self, product_data):
+        # Construir la entidad valida los datos recibidos
+        return Product(
+            name=product_data.get('name'),
+            price=product_data.get('price'),
+            description=product_data.get('description', ''),
+            category=product_data.get('category', 'General'),
+            createdBy=product_data.get('createdBy')
+        )
+
+    async def create_product(self, product_data):
+        product = self._new_product(product_data)
+
+        query = """
+            INSERT INTO public."Product" (id, data)
+            VALUES (%s, %s)
+        """
+
+        try:
+            async with self.db.connection() as connection:
+                await connection.execute(query, product.get_id(), product.get_data())
+        except Exception as e:
+            log.error("❌ Error al crear producto: ", e)
+            raise
+
+        self.cache.set(str(product.get_id()), (str(product.get_id()), product.get_data()))
+        log.info(f"✅ Producto creado exitosamente con ID: {product.get_id()}")
+        return product.get_id()
+
+    async def create_products_bulk(self, items, chunk_size=None):
+        """
+        Crea muchos registros en una sola transacción.
+
+        Igual que la versión síncrona: los inválidos se reportan sin detener la carga
+        y los válidos se envían en bloques de `chunk_size` filas con executemany,
+        que asyncpg manda en un solo viaje por bloque.
+
+        Returns:
+            dict: {"created": [ids], "failed": [{"index": i, "error": mensaje}]}
+        """
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        query = 'INSERT INTO public."Product" (id, data) VALUES (%s, %s)'
+        created = []
+        failed = []
+
+        try:
+            async with self.db.connection() as connection:
+                async with connection.transaction():
+                    chunk = []
+                    for index, product_data in enumerate(items):
+                        try:
+                            product = self._new_product(product_data)
+                        except (ValueError, TypeError, AttributeError) as e:
+                            failed.append({"index": index, "error": str(e)})
+                            continue
+                        chunk.append((product.get_id(), product.get_data()))
+                        if len(chunk) >= chunk_size:
+                            await connection.executemany(query, chunk)
+                            created.extend(row[0] for row in chunk)
+                            chunk = []
+                    if chunk:
+                        await connection.executemany(query, chunk)
+                        created.extend(row[0] for row in chunk)
+        except Exception as e:
+            log.error("❌ Error en la carga masiva de productos: ", e)
+            raise
+
+        log.info(f"✅ Carga masiva: {len(created)} productos creados, {len(failed)} con errores")
+        return {"created": created, "failed": failed}
+
+    async def get_product_by_id(self, product_id):
+        cached = self.cache.get(str(product_id))
+        if cached is not None:
+            log.debug("✅ Producto encontrado en caché con ID: %s", product_id)
+            return self._build_product(cached)
+        version = self.cache.version
+
+        try:
+            async with self.db.connection() as connection:
+                result = await connection.fetchrow(by_id_query("Product"), product_id)
+        except Exception as e:
+            log.error("❌ Error al obtener producto por ID: ", e)
+            raise
+
+        if result:
+            self._cache_row(result, version)
+            log.debug("✅ Producto encontrado con ID: %s", product_id)
+            return self._build_product(result)
+        log.warning(f"⚠️ No se encontró producto con ID: {product_id}")
+        return None
+
+    async def get_products_by_ids(self, ids):
+        """
+        Obtiene varios registros por ID en una sola consulta (`id = ANY(...)`).
+
+        Returns:
+            tuple: (dict {id: Product}, lista de IDs no encontrados o inválidos)
+        """
+        wanted, missing = normalize_ids(ids)
+
+        found = {}
+        pending = []
+        for entity_id in wanted:
+            cached = self.cache.get(entity_id)
+            if cached is not None:
+                found[entity_id] = self._build_product(cached)
+            else:
+                pending.append(entity_id)
+        if not pending:
+            return found, missing
+        version = self.cache.version
+
+        try:
+            async with self.db.connection() as connection:
+                results = await connection.fetch(by_ids_query("Product"), pending)
+        except Exception as e:
+            log.error("❌ Error al obtener productos por IDs: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            for result in results:
+                self._cache_row(result, version)
+                found[str(result[0])] = self._build_product(result)
+        missing.extend(entity_id for entity_id in pending if entity_id not in found)
+
+        log.debug("✅ Se encontraron %s de %s productos solicitados", len(found), len(wanted))
+        return found, missing
+
+    async def get_all_products(self):
+        product_list = [product async for product in self.iter_products()]
+        log.debug("✅ Se encontraron %s productos", len(product_list))
+        return product_list
+
+    async def get_products_page(self, limit=None, after=None, filters=None):
+        """
+        Devuelve una página de productos activos ordenados por (createdAt, id) descendente.
+
+        Mismos parámetros y resultado que ProductDB.get_products_page.
+        """
+        limit, query, params = self._page_query(limit, after, filters)
+
+        try:
+            async with self.db.connection() as connection:
+                results = await connection.fetch(query, *params)
+        except Exception as e:
+            log.error("❌ Error al obtener página de productos: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            items = [self._build_product(result) for result in results[:limit]]
+        next_token = None
+        if len(results) > limit:
+            last = items[-1]
+            next_token = encode_token(last.createdAt, last.id)
+
+        log.debug("✅ Página con %s productos", len(items))
+        return items, next_token
+
+    async def get_product_version(self, product_id):
+        """(id, modifiedAt) del registro sin traer el documento, o None si no existe."""
+        cached = self.cache.get(str(product_id))
+        if cached is not None:
+            return cached[0], cached[1].get('modifiedAt')
+
+        try:
+            async with self.db.connection() as connection:
+                result = await connection.fetchrow(by_id_query("Product", columns=VERSION_COLUMNS), product_id)
+        except Exception as e:
+            log.error("❌ Error al obtener versión del producto: ", e)
+            raise
+        return (str(result[0]), result[1]) if result else None
+
+    async def get_products_page_versions(self, limit=None, after=None, filters=None):
+        """(lista de (id, modifiedAt), hay página siguiente) de la página equivalente, sin hidratar."""
+        limit, query, params = self._page_query(limit, after, filters, columns=VERSION_COLUMNS)
+
+        try:
+            async with self.db.connection() as connection:
+                results = await connection.fetch(query, *params)
+        except Exception as e:
+            log.error("❌ Error al obtener versiones de productos: ", e)
+            raise
+
+        return [(str(row[0]), row[1]) for row in results[:limit]], len(results) > limit
+
+    async def search_products(self, term, limit=None, after=None):
+        """
+        Busca productos activos por relevancia.
+
+        Mismos parámetros y resultado que ProductDB.search_products.
+        """
+        limit, query, params = self._search_query(term, limit, after)
+
+        try:
+            async with self.db.connection() as connection:
+                results = await connection.fetch(query, *params)
+        except Exception as e:
+            log.error("❌ Error al buscar productos: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            items = [self._build_product(result) for result in results[:limit]]
+        next_token = None
+        if len(results) > limit:
+            last = results[limit - 1]
+            next_token = encode_search_token(last[2], str(last[0]))
+
+        log.debug("✅ Búsqueda con %s productos", len(items))
+        return items, next_token
+
+    async def iter_products(self, itersize=DEFAULT_ITERSIZE):
+        """
+        Recorre todos los productos activos con un cursor del lado del servidor.
+
+        Se traen `itersize` filas por viaje; la conexión queda prestada mientras el
+        generador esté abierto.
+        """
+        query = list_query("Product", limit=False)
+
+        try:
+            async with self.db.connection() as connection:
+                async with connection.transaction():
+                    async for result in connection.cursor(query, prefetch=itersize):
+                        yield self._build_product(result)
+        except Exception as e:
+            log.error("❌ Error al obtener todos los productos: ", e)
+            raise
+
+    async def _wait_for_writers(self, connection):
+        """Versión asíncrona de ProductDB._wait_for_writers."""
+        key = CHANGE_LOCK_KEYS["Product"]
+        pending = {row[0] for row in await connection.fetch(CHANGE_WRITERS_QUERY, key)}
+        deadline = time.monotonic() + CHANGES_WAIT_MS / 1000
+        while pending:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(CHANGES_POLL_MS / 1000)
+            pending &= {row[0] for row in await connection.fetch(CHANGE_WRITERS_QUERY, key)}
+        return True
+
+    async def changes_since(self, cursor=None, limit=None):
+        """
+        Productos creados, modificados o eliminados después de `cursor`.
+
+        Mismos parámetros y resultado que ProductDB.changes_since.
+        """
+        cursor = normalize_change_cursor(cursor)
+        limit = normalize_limit(limit)
+
+        try:
+            async with self.db.connection() as connection:
+                async with connection.transaction():
+                    watermark = (await connection.fetchrow(watermark_query("Product")))[0]
+                    settled = await self._wait_for_writers(connection)
+                if not settled:
+                    log.debug("⚠️ Escrituras largas en curso; el feed de productos sigue en %s", cursor)
+                    return [], cursor, True
+                if cursor is None or cursor >= watermark:
+                    return [], max(watermark, cursor or 0), False
+                results = await connection.fetch(changes_query("Product"), cursor, watermark, limit + 1)
+        except Exception as e:
+            log.error("❌ Error al obtener cambios de productos: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            items = [self._build_product(result) for result in results[:limit]]
+        has_more = len(results) > limit
+        next_cursor = results[limit - 1][2] if has_more else watermark
+
+        log.debug("✅ %s cambios de productos desde %s", len(items), cursor)
+        return items, next_cursor, has_more
+
+    async def update_product(self, product_id, product_data, if_match=None):
+        """
+        Actualiza solo los campos recibidos en una sola sentencia (`data || cambios`).
+
+        Con `if_match` se compara primero el ETag actual, con la fila bloqueada.
+
+        Returns:
+            Product: El registro tal como quedó guardado
+        """
+        changes = {key: product_data[key] for key in self.UPDATABLE_FIELDS if key in product_data}
+        if 'name' in changes and not changes['name']:
+            raise ValueError("El nombre y el precio del producto son requeridos.")
+        if 'price' in changes:
+            if not changes['price']:
+                raise ValueError("El nombre y el precio del producto son requeridos.")
+            changes['price'] = float(changes['price'])
+        changes['modifiedAt'] = time_helper.now()
+        version = self.cache.version
+
+        query = """
+            UPDATE public."Product"
+            SET data = data || %s::jsonb
+            WHERE id = %s
+            RETURNING id, data
+        """
+
+        try:
+            async with self.db.connection() as connection:
+                if if_match is None:
+                    result = await connection.fetchrow(query, changes, product_id)
+                else:
+                    async with connection.transaction():
+                        await self._check_version(connection, product_id, if_match)
+                        result = await connection.fetchrow(query, changes, product_id)
+        except (NotFoundError, PreconditionFailedError):
+            raise
+        except Exception as e:
+            log.error("❌ Error al actualizar producto: ", e)
+            raise
+
+        if result is None:
+            raise NotFoundError(f"Producto con ID {product_id} no encontrado")
+
+        self._cache_row(result, version)
+        log.info(f"✅ Producto actualizado exitosamente con ID: {product_id}")
+        return self._build_product(result)
+
+    async def delete_product(self, product_id):
+        """Marca el registro como eliminado (soft delete) en una sola sentencia."""
+        changes = {"deleted": True, "modifiedAt": time_helper.now()}
+
+        query = """
+            UPDATE public."Product"
+            SET data = data || %s::jsonb
+            WHERE id = %s
+            RETURNING id
+        """
+
+        try:
+            async with self.db.connection() as connection:
+                result = await connection.fetchrow(query, changes, product_id)
+        except Exception as e:
+            log.error("❌ Error al eliminar producto: ", e)
+            raise
+
+        self.cache.invalidate(str(product_id))
+        if result is None:
+            raise NotFoundError(f"Producto con ID {product_id} no encontrado")
+
+        log.info(f"✅ Producto eliminado (marcado como eliminado) con ID: {product_id}")
+        return product_id
+
+    async def restore_product(self, product_id):
+        """
+        Vuelve a activar un producto eliminado. Si sigue en la tabla se reactiva con un
+        UPDATE; si ya se archivó (ver archiver.py) se devuelve desde el archivo, en la
+        misma transacción.
+
+        Returns:
+            Product: El registro restaurado
+        """
+        changes = {"deleted": False, "modifiedAt": time_helper.now()}
+        version = self.cache.version
+
+        try:
+            async with self.db.connection() as connection:
+                async with connection.transaction():
+                    result = await connection.fetchrow(undelete_query("Product"), changes, product_id)
+                    if result is None:
+                        result = await connection.fetchrow(restore_from_archive_query("Product"), product_id, changes)
+        except Exception as e:
+            log.error("❌ Error al restaurar producto: ", e)
+            raise
+
+        if result is None:
+            raise NotFoundError(f"Producto eliminado con ID {product_id} no encontrado")
+
+        self._cache_row(result, version)
+        log.info(f"✅ Producto restaurado con ID: {product_id}")
+        return self._build_product(result)
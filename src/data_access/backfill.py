@@ -0,0 +1,177 @@
+"""
+Backfill de las columnas tipadas de la migración 0008 (deleted, created_at,
+modified_at y, en Product, price y category) para las filas anteriores a ella.
+
+Recorre cada tabla por llave primaria en lotes de `BACKFILL_BATCH_SIZE` filas, cada
+uno en su propia transacción corta: solo se bloquean las filas del lote, y las que
+otra transacción ya tiene bloqueadas se saltean (SKIP LOCKED), porque esa escritura
+las completa con el trigger. El UPDATE no cambia `data`, así que no genera avisos de
+caché ni entradas del feed de cambios. Se puede cortar y retomar con --start-after.
+
+Uso:
+    python -m src.data_access.backfill run                 # las dos tablas
+    python -m src.data_access.backfill run products --batch-size 500 --pause-ms 100
+    python -m src.data_access.backfill check               # filas desalineadas; sale con 1 si hay
+"""
+import os
+import sys
+import time
+import argparse
+from src.data_access.db_connector import db_connector
+from src.utils import logger
+
+log = logger('Backfill')
+
+# Filas por transacción
+BATCH_SIZE = int(os.environ.get('BACKFILL_BATCH_SIZE', 1000))
+# Pausa entre lotes para dejar respirar a la replicación y al autovacuum
+PAUSE_MS = float(os.environ.get('BACKFILL_PAUSE_MS', 50))
+
+# Columnas tipadas de cada tabla y la expresión de `data` de la que salen (igual que el
+# trigger sync_typed_columns de la migración 0008)
+TYPED_COLUMNS = {
+    "Equipment": {
+        "deleted": "(data->>'deleted')::boolean",
+        "created_at": "(data->>'createdAt')::timestamptz",
+        "modified_at": "(data->>'modifiedAt')::timestamptz",
+    },
+    "Product": {
+        "deleted": "(data->>'deleted')::boolean",
+        "created_at": "(data->>'createdAt')::timestamptz",
+        "modified_at": "(data->>'modifiedAt')::timestamptz",
+        "price": "(data->>'price')::numeric",
+        "category": "(data->>'category')",
+    },
+}
+TABLES = {"equipment": "Equipment", "products": "Product"}
+
+
+def range_end_query(table):
+    # Última llave del próximo lote: la fila número batch_size después de la anterior
+    # o, si quedan menos, la última de la tabla (las dos recorren el índice de la
+    # llave primaria). Los parámetros son: último ID, batch_size - 1, último ID.
+    return f"""
+        SELECT COALESCE(
+            (SELECT id FROM public."{table}" WHERE id > %s ORDER BY id OFFSET %s LIMIT 1),
+            (SELECT id FROM public."{table}" WHERE id > %s ORDER BY id DESC LIMIT 1)
+        )
+    """
+
+
+def batch_update_query(table):
+    # Solo las filas que nunca pasaron por el trigger; el SET se pisa igual en el trigger
+    assignments = ", ".join(f"{column} = {expression}" for column, expression in TYPED_COLUMNS[table].items())
+    return f"""
+        WITH batch AS (
+            SELECT id FROM public."{table}"
+            WHERE id > %s AND id <= %s AND deleted IS NULL AND created_at IS NULL
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE public."{table}" t SET {assignments}
+        FROM batch WHERE t.id = batch.id
+    """
+
+
+def mismatch_query(table):
+    conditions = " OR ".join(
+        f"{column} IS DISTINCT FROM {expression}" for column, expression in TYPED_COLUMNS[table].items()
+    )
+    return f'SELECT count(*) FROM public."{table}" WHERE {conditions}'
+
+
+class Backfill:
+    def __init__(self, batch_size=BATCH_SIZE, pause_ms=PAUSE_MS):
+        if batch_size < 1:
+            raise ValueError("El tamaño de lote debe ser al menos 1.")
+        self.batch_size = batch_size
+        self.pause = pause_ms / 1000
+        self.db = db_connector
+
+    def run(self, table, start_after=None):
+        """
+        Completa las columnas tipadas de `table` lote por lote.
+
+        Args:
+            table (str): "Equipment" o "Product"
+            start_after (str): Retoma después de este ID (el último que informó una corrida anterior)
+
+        Returns:
+            int: Filas actualizadas
+        """
+        last_id = start_after or '00000000-0000-0000-0000-000000000000'
+        range_query = range_end_query(table)
+        update_query = batch_update_query(table)
+        updated = 0
+        batches = 0
+        started = time.perf_counter()
+
+        while True:
+            with self.db.connection() as connection:
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute(range_query, (last_id, self.batch_size - 1, last_id))
+                        end_id = cursor.fetchone()[0]
+                        if end_id is None:
+                            connection.rollback()
+                            break
+                        cursor.execute(update_query, (last_id, end_id))
+                        updated += cursor.rowcount
+                    connection.commit()
+                except Exception as e:
+                    connection.rollback()
+                    log.error(f"❌ Falló el backfill de {table} después del ID {last_id}: ", e)
+                    raise
+            last_id = str(end_id)
+            batches += 1
+            if batches % 100 == 0:
+                log.info(f"Backfill de {table} en curso", rows=updated, last_id=last_id)
+            if self.pause:
+                time.sleep(self.pause)
+
+        log.info(f"✅ Backfill de {table} terminado", rows=updated, batches=batches,
+                 duration_s=round(time.perf_counter() - started, 1))
+        return updated
+
+    def check(self, table):
+        """Cantidad de filas cuyas columnas tipadas no coinciden con `data` (recorre la tabla completa)."""
+        with self.db.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(mismatch_query(table))
+                count = cursor.fetchone()[0]
+            connection.rollback()
+        return count
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m src.data_access.backfill',
+                                     description="Completa las columnas tipadas de la migración 0008.")
+    parser.add_argument('command', choices=('run', 'check'))
+    parser.add_argument('entity', nargs='?', choices=tuple(TABLES), help="Por default, las dos tablas")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--pause-ms', type=float, default=PAUSE_MS)
+    parser.add_argument('--start-after', help="Retoma después de este ID (solo con una entidad)")
+    args = parser.parse_args(argv[1:])
+
+    if args.start_after and not args.entity:
+        parser.error("--start-after requiere indicar la entidad")
+    tables = [TABLES[args.entity]] if args.entity else list(TABLES.values())
+    backfill = Backfill(batch_size=args.batch_size, pause_ms=args.pause_ms)
+
+    if args.command == 'run':
+        for table in tables:
+            backfill.run(table, start_after=args.start_after)
+        return 0
+
+    pending = 0
+    for table in tables:
+        count = backfill.check(table)
+        pending += count
+        if count:
+            log.error(f"❌ {table}: {count} filas con columnas tipadas desalineadas")
+        else:
+            log.info(f"✅ {table}: columnas tipadas al día")
+    return 1 if pending else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
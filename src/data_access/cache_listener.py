@@ -0,0 +1,190 @@
+"""
+Invalidación de las cachés de entidades entre procesos con LISTEN/NOTIFY.
+
+Los triggers de `migrations/0007_cache_notifications.sql` publican en el canal
+`catalog_changes` un aviso "Tabla:id" por cada registro cuyo documento cambió o se
+borró (o "Tabla:*" si una sola sentencia tocó muchos). El listener los consume y
+saca esas llaves de la caché local, así la caché se puede usar con TTLs largos.
+
+Dos modos de uso:
+    - thread: un hilo daemon espera avisos con select() (servidores de larga vida).
+    - poll: cada request llama a poll(), que lee los avisos acumulados sin bloquear
+      (Lambda, donde el proceso está congelado entre invocaciones y un hilo no corre).
+
+Si la conexión de LISTEN se pierde, los avisos de ese intervalo no llegan nunca: al
+reconectar se vacían las cachés completas.
+"""
+import os
+import time
+import select
+import threading
+from src.data_access.db_connector import db_connector
+from src.data_access.entity_cache import equipment_cache, product_cache
+from src.utils import logger
+
+log = logger('Cache_Listener')
+
+# Tiene que coincidir con el canal de los triggers de la migración 0007
+CHANNEL = 'catalog_changes'
+# Segundos entre reintentos de conexión (modo thread)
+RECONNECT_DELAY = float(os.environ.get('CACHE_LISTENER_RECONNECT_DELAY', 1))
+# Segundos sin tráfico tras los cuales se verifica que la conexión siga viva con SELECT 1
+HEARTBEAT_INTERVAL = float(os.environ.get('CACHE_LISTENER_HEARTBEAT', 30))
+
+
+class CacheListener:
+    def __init__(self, caches=None, channel=CHANNEL):
+        """
+        Args:
+            caches (dict): Tabla -> EntityCache a invalidar (por defecto Equipment y Product)
+            channel (str): Canal de NOTIFY
+        """
+        self.caches = caches or {"Equipment": equipment_cache, "Product": product_cache}
+        self.channel = channel
+        self.db = db_connector
+        self._connection = None
+        self._last_seen = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+        self.notifications = 0
+        self.flushes = 0
+        self.reconnects = 0
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Arranca el hilo de escucha (idempotente; después de un fork lo vuelve a arrancar en el hijo)."""
+        self._check_fork()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='cache-listener', daemon=True)
+            self._thread.start()
+        log.info("✅ Listener de caché iniciado", channel=self.channel)
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._disconnect()
+
+    def poll(self):
+        """
+        Aplica los avisos pendientes sin bloquear. Pensado para llamarse al inicio de cada request.
+
+        Nunca lanza: si la conexión falla se vacían las cachés y se reconecta en la siguiente llamada.
+        """
+        self._check_fork()
+        with self._lock:
+            try:
+                self._ensure_connection()
+                if time.monotonic() - self._last_seen >= HEARTBEAT_INTERVAL:
+                    self._heartbeat()
+                self._drain()
+            except Exception as e:
+                log.warning("⚠️ Se perdió la conexión del listener de caché", error=str(e))
+                self._disconnect()
+                self._flush_all()
+
+    def stats(self):
+        return {
+            "channel": self.channel,
+            "connected": self._connection is not None and not self._connection.closed,
+            "thread": self._thread is not None and self._thread.is_alive(),
+            "notifications": self.notifications,
+            "flushes": self.flushes,
+            "reconnects": self.reconnects,
+        }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with self._lock:
+                    self._ensure_connection()
+                    connection = self._connection
+                readable, _, _ = select.select([connection], [], [], HEARTBEAT_INTERVAL)
+                with self._lock:
+                    if not readable:
+                        self._heartbeat()
+                    self._drain()
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                log.warning("⚠️ Se perdió la conexión del listener de caché", error=str(e))
+                with self._lock:
+                    self._disconnect()
+                    self._flush_all()
+                self._stop.wait(RECONNECT_DELAY)
+
+    def _check_fork(self):
+        # El hijo no hereda el hilo y no debe usar el socket del padre: se olvidan sin cerrarlos
+        if self._pid != os.getpid():
+            self._connection = None
+            self._thread = None
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+
+    def _ensure_connection(self):
+        if self._connection is not None and not self._connection.closed:
+            return
+        connection = self.db.connect()
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        self._connection = connection
+        self._last_seen = time.monotonic()
+        self.reconnects += 1
+        # Lo que cambió antes del LISTEN (o mientras no había conexión) no va a llegar como aviso
+        self._flush_all()
+        log.info("✅ Escuchando cambios del catálogo", channel=self.channel)
+
+    def _heartbeat(self):
+        with self._connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        self._last_seen = time.monotonic()
+
+    def _drain(self):
+        self._connection.poll()
+        notifies = self._connection.notifies
+        while notifies:
+            self._handle(notifies.pop(0).payload)
+        self._last_seen = time.monotonic()
+
+    def _handle(self, payload):
+        table, _, entity_id = payload.partition(':')
+        cache = self.caches.get(table)
+        if cache is None:
+            return
+        self.notifications += 1
+        if entity_id == '*':
+            cache.clear()
+        else:
+            cache.invalidate(entity_id)
+
+    def _flush_all(self):
+        for cache in self.caches.values():
+            cache.clear()
+        self.flushes += 1
+
+    def _disconnect(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+cache_listener = CacheListener()
@@ -0,0 +1,280 @@
+"""
+Importación y exportación masiva del catálogo en NDJSON o CSV, en memoria constante.
+
+Importar: los registros se leen de a uno desde el archivo (o el cuerpo del request), se
+validan con las clases de entidad en bloques de `chunk_size` y cada bloque se carga con
+COPY y se confirma por separado. Un bloque nunca está completo en memoria más de una vez.
+
+Exportar: un cursor del lado del servidor recorre la tabla y las filas salen como bytes
+a medida que llegan (NDJSON copia el JSONB en texto tal cual, sin decodificarlo).
+
+Uso:
+    python -m src.data_access.catalog_io import equipment equipos.ndjson
+    python -m src.data_access.catalog_io import products productos.csv --on-conflict update
+    python -m src.data_access.catalog_io export products - --format csv > productos.csv
+"""
+import io
+import os
+import sys
+import csv
+import json
+import uuid
+import argparse
+from src.data_access.db_connector import db_connector
+from src.data_access.pagination import DEFAULT_ITERSIZE
+from src.data_access.queries import LIVE_FILTER
+from src.entities import Equipment, Product
+from src.utils import logger, serializer
+
+log = logger('Catalog_IO')
+
+# Registros validados y cargados por cada COPY + commit
+CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 5000))
+# Errores que se detallan en el resultado; el resto solo se cuenta
+MAX_REPORTED_ERRORS = 100
+FORMATS = ('ndjson', 'csv')
+ON_CONFLICT = ('error', 'skip', 'update')
+
+ENTITIES = {
+    "equipment": {"table": "Equipment", "class": Equipment},
+    "products": {"table": "Product", "class": Product},
+}
+
+TRUE_VALUES = ('true', '1', 't', 'yes')
+
+
+def entity_fields(entity_class):
+    # Campos del documento en el orden de get_data(); el id va aparte
+    return [field for field in entity_class.__slots__ if field != 'id']
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato no soportado: {fmt} (usar {' o '.join(FORMATS)})")
+        return fmt
+    return 'csv' if str(path).lower().endswith('.csv') else 'ndjson'
+
+
+def read_ndjson(lines):
+    """Genera (número de línea, registro o excepción) desde líneas NDJSON (str o bytes)."""
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"JSON inválido: {e}")
+
+
+def read_csv(lines):
+    """Genera (número de registro, dict) desde líneas CSV con encabezado (str o bytes)."""
+    text_lines = (line.decode('utf-8') if isinstance(line, bytes) else line for line in lines)
+    for line_number, row in enumerate(csv.DictReader(text_lines), start=2):
+        yield line_number, row
+
+
+def copy_line(entity_id, data):
+    # Formato de texto de COPY: el JSON no trae tabs ni saltos de línea literales
+    # (json los escapa), pero sus `\` deben duplicarse
+    document = serializer.dumps(data).replace(b'\\', b'\\\\')
+    return str(entity_id).encode('ascii') + b'\t' + document + b'\n'
+
+
+class CatalogIO:
+    def __init__(self, entity):
+        """
+        Args:
+            entity (str): "equipment" o "products"
+        """
+        if entity not in ENTITIES:
+            raise ValueError(f"Entidad desconocida: {entity} (usar {' o '.join(ENTITIES)})")
+        self.entity = entity
+        self.table = ENTITIES[entity]["table"]
+        self.entity_class = ENTITIES[entity]["class"]
+        self.fields = entity_fields(self.entity_class)
+        self.db = db_connector
+
+    def _build(self, record):
+        # El constructor de la entidad valida; id, createdAt, modifiedAt y deleted se
+        # conservan si vienen (p. ej. al reimportar una exportación)
+        if not isinstance(record, dict):
+            raise ValueError("Cada registro debe ser un objeto.")
+        values = {key: record[key] for key in ('id', *self.fields) if record.get(key) not in (None, '')}
+        if 'id' in values:
+            values['id'] = str(uuid.UUID(str(values['id']).strip()))
+        if isinstance(values.get('deleted'), str):
+            values['deleted'] = values['deleted'].strip().lower() in TRUE_VALUES
+        return self.entity_class(**values)
+
+    def import_records(self, records, on_conflict='error', chunk_size=CHUNK_SIZE):
+        """
+        Valida y carga registros con COPY en bloques que se confirman por separado.
+
+        Args:
+            records (iterable): Pares (número de línea, dict o excepción de lectura),
+                como los que generan read_ndjson/read_csv
+            on_conflict (str): Si un ID ya existe: 'error' (el bloque falla), 'skip' o 'update'
+            chunk_size (int): Registros por bloque
+
+        Returns:
+            dict: {"imported", "skipped", "failed_count", "failed": [{"line", "error"}]}
+        """
+        if on_conflict not in ON_CONFLICT:
+            raise ValueError(f"on_conflict debe ser uno de: {', '.join(ON_CONFLICT)}")
+        result = {"imported": 0, "skipped": 0, "failed_count": 0, "failed": []}
+
+        def fail(line, error):
+            result["failed_count"] += 1
+            if len(result["failed"]) < MAX_REPORTED_ERRORS:
+                result["failed"].append({"line": line, "error": str(error)})
+
+        with self.db.connection() as connection:
+            chunk = []
+            lines = []
+            for line_number, record in records:
+                if isinstance(record, Exception):
+                    fail(line_number, record)
+                    continue
+                try:
+                    entity = self._build(record)
+                except (ValueError, TypeError, AttributeError) as e:
+                    fail(line_number, e)
+                    continue
+                chunk.append(copy_line(entity.get_id(), entity.get_data()))
+                lines.append(line_number)
+                if len(chunk) >= chunk_size:
+                    self._load_chunk(connection, chunk, lines, on_conflict, result, fail)
+                    chunk, lines = [], []
+            if chunk:
+                self._load_chunk(connection, chunk, lines, on_conflict, result, fail)
+
+        log.info(f"✅ Importación de {self.entity}: {result['imported']} cargados, "
+                 f"{result['skipped']} omitidos, {result['failed_count']} con errores")
+        return result
+
+    def _load_chunk(self, connection, chunk, lines, on_conflict, result, fail):
+        buffer = io.BytesIO(b''.join(chunk))
+        try:
+            with connection.cursor() as cursor:
+                if on_conflict == 'error':
+                    cursor.copy_expert(f'COPY public."{self.table}" (id, data) FROM STDIN', buffer)
+                    inserted = len(chunk)
+                else:
+                    # COPY no admite ON CONFLICT: se carga a una tabla temporal y se pasa con INSERT ... SELECT
+                    cursor.execute(
+                        "CREATE TEMP TABLE IF NOT EXISTS catalog_import_stage (id UUID, data JSONB) ON COMMIT DELETE ROWS"
+                    )
+                    cursor.copy_expert('COPY catalog_import_stage (id, data) FROM STDIN', buffer)
+                    action = "DO NOTHING" if on_conflict == 'skip' else "DO UPDATE SET data = EXCLUDED.data"
+                    cursor.execute(f"""
+                        INSERT INTO public."{self.table}" (id, data)
+                        SELECT DISTINCT ON (id) id, data FROM catalog_import_stage
+                        ON CONFLICT (id) {action}
+                    """)
+                    inserted = cursor.rowcount
+            connection.commit()
+        except Exception as e:
+            connection.rollback()
+            log.error(f"❌ Falló el bloque de importación (líneas {lines[0]}-{lines[-1]}): ", e)
+            result["failed_count"] += len(chunk) - 1
+            fail(f"{lines[0]}-{lines[-1]}", e)
+            return
+        result["imported"] += inserted
+        result["skipped"] += len(chunk) - inserted
+
+    def export_rows(self, fmt='ndjson', include_deleted=False, itersize=DEFAULT_ITERSIZE):
+        """
+        Genera la exportación como bloques de bytes, con un cursor del lado del servidor.
+
+        La conexión queda prestada mientras el generador esté abierto (p. ej. durante
+        toda la respuesta HTTP).
+        """
+        fmt = detect_format('', fmt)
+        where = "" if include_deleted else f"WHERE {LIVE_FILTER}"
+        if fmt == 'ndjson':
+            query = f'SELECT id, data::text FROM public."{self.table}" {where}'
+        else:
+            columns = ", ".join(f"data->>'{field}'" for field in self.fields)
+            query = f'SELECT id, {columns} FROM public."{self.table}" {where}'
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor(name=f'export_{self.entity}') as cursor:
+                    cursor.itersize = itersize
+                    cursor.execute(query)
+                    if fmt == 'ndjson':
+                        yield from self._ndjson_blocks(cursor, itersize)
+                    else:
+                        yield from self._csv_blocks(cursor, itersize)
+        except Exception as e:
+            log.error(f"❌ Error al exportar {self.entity}: ", e)
+            raise
+
+    def _ndjson_blocks(self, cursor, itersize):
+        block = []
+        for entity_id, document in cursor:
+            block.append(serializer.raw_entity(str(entity_id), document))
+            if len(block) >= itersize:
+                yield b'\n'.join(block) + b'\n'
+                block = []
+        if block:
+            yield b'\n'.join(block) + b'\n'
+
+    def _csv_blocks(self, cursor, itersize):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['id', *self.fields])
+        rows = 0
+        for row in cursor:
+            writer.writerow(row)
+            rows += 1
+            if rows % itersize == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m src.data_access.catalog_io',
+                                     description="Importa o exporta equipos/productos en NDJSON o CSV.")
+    parser.add_argument('command', choices=('import', 'export'))
+    parser.add_argument('entity', choices=tuple(ENTITIES))
+    parser.add_argument('path', help="Archivo de entrada/salida ('-' para stdin/stdout)")
+    parser.add_argument('--format', choices=FORMATS, help="Por default según la extensión (.csv o NDJSON)")
+    parser.add_argument('--on-conflict', choices=ON_CONFLICT, default='error')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--include-deleted', action='store_true', help="Exportar también los eliminados")
+    args = parser.parse_args(argv[1:])
+
+    catalog = CatalogIO(args.entity)
+    fmt = detect_format(args.path, args.format)
+    if args.command == 'import':
+        source = sys.stdin.buffer if args.path == '-' else open(args.path, 'rb')
+        try:
+            reader = read_csv(source) if fmt == 'csv' else read_ndjson(source)
+            result = catalog.import_records(reader, on_conflict=args.on_conflict, chunk_size=args.chunk_size)
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+        print(json.dumps(result, ensure_ascii=False, indent=2), file=sys.stderr)
+        return 1 if result["failed_count"] else 0
+
+    target = sys.stdout.buffer if args.path == '-' else open(args.path, 'wb')
+    try:
+        for block in catalog.export_rows(fmt, include_deleted=args.include_deleted):
+            target.write(block)
+    finally:
+        if target is sys.stdout.buffer:
+            target.flush()
+        else:
+            target.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -1,39 +1,317 @@
 import os
+import time
+import atexit
+import threading
+import contextlib
+from collections import deque
 import psycopg2
 import psycopg2.extras
-from src.utils import logger
+import psycopg2.extensions
+from src.data_access.errors import PoolTimeoutError
+from src.utils import logger, metrics
 
 log = logger('DB_Connector')
 
+# Los dicts se envían como JSONB sin tener que envolverlos a mano en cada consulta
+psycopg2.extensions.register_adapter(dict, psycopg2.extras.Json)
+
+
+# Funciones que reciben (sentencia, duración en ms, filas) después de cada execute
+query_hooks = [metrics.record_query]
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """Cursor que mide cada execute/executemany y lo reporta a `query_hooks`."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._report(query, start)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._report(query, start)
+
+    def _report(self, query, start):
+        duration_ms = (time.perf_counter() - start) * 1000
+        for hook in query_hooks:
+            try:
+                hook(query, duration_ms, self.rowcount)
+            except Exception as e:
+                log.debug("⚠️ Error en hook de instrumentación: ", e)
+
+
+class _PooledConnection:
+    __slots__ = ('raw', 'created_at', 'last_used', 'uses', 'generation')
+
+    def __init__(self, raw, generation):
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used = now
+        self.uses = 0
+        self.generation = generation
+
+
 class DatabaseConnector:
-    def __init__(self):
+    """
+    Pool de conexiones a PostgreSQL compartido por todas las clases de acceso a datos.
+
+    La instancia vive a nivel de módulo, así que en Lambda sobrevive entre
+    invocaciones "calientes" y se evita pagar TCP+TLS+autenticación en cada request.
+    Cada proceso (worker) tiene su propio pool: si el proceso se bifurca, el hijo
+    descarta las conexiones heredadas y abre las suyas.
+
+    Uso:
+        with db_connector.connection() as connection:
+            with connection.cursor() as cursor:
+                ...
+            connection.commit()
+    """
+
+    def __init__(self, min_size=None, max_size=None, timeout=None, max_uses=None,
+                 max_lifetime=None, max_idle=None, health_check_after=None):
         self.db_host = os.environ.get("DB_HOST")
         self.db_port = os.environ.get("DB_PORT")
         self.db_name = os.environ.get("DB_NAME")
         self.db_user = os.environ.get("DB_USER")
         self.db_pass = os.environ.get("DB_PASS")
-        self.connection = None
 
-    def get_connection(self):
+        # Configuración del pool (parámetros explícitos > variables de entorno > defaults)
+        self.min_size = min_size if min_size is not None else int(os.environ.get("DB_POOL_MIN", 1))
+        self.max_size = max_size if max_size is not None else int(os.environ.get("DB_POOL_MAX", 5))
+        self.timeout = timeout if timeout is not None else float(os.environ.get("DB_POOL_TIMEOUT", 5))
+        self.max_uses = max_uses if max_uses is not None else int(os.environ.get("DB_POOL_MAX_USES", 5000))
+        self.max_lifetime = max_lifetime if max_lifetime is not None else float(os.environ.get("DB_POOL_MAX_LIFETIME", 1800))
+        self.max_idle = max_idle if max_idle is not None else float(os.environ.get("DB_POOL_MAX_IDLE", 600))
+        # Segundos de inactividad a partir de los cuales se hace un ping antes de entregar la conexión
+        self.health_check_after = health_check_after if health_check_after is not None else float(os.environ.get("DB_POOL_HEALTHCHECK_AFTER", 30))
+
+        if self.max_size < 1 or self.min_size < 0 or self.min_size > self.max_size:
+            raise ValueError("Configuración de pool inválida: se requiere 0 <= min_size <= max_size y max_size >= 1.")
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._size = 0
+        self._generation = 0
+        self._pid = os.getpid()
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Presta una conexión del pool y la devuelve al salir del bloque."""
+        start = time.perf_counter()
+        pooled = self._checkout()
+        metrics.record('pool', (time.perf_counter() - start) * 1000)
+        failed = True
+        try:
+            yield pooled.raw
+            failed = False
+        finally:
+            # También cubre GeneratorExit cuando un generador que tiene la conexión se abandona
+            self._release(pooled, failed=failed)
+
+    def connect(self):
+        """
+        Abre una conexión propia, fuera del pool, con la misma configuración.
+
+        Es para usos de larga vida que no deben ocupar un lugar del pool (p. ej.
+        LISTEN); quien la pide es responsable de cerrarla.
+        """
+        return self._connect()
+
+    def warm(self):
+        """Abre conexiones hasta tener `min_size` disponibles (útil en el arranque del worker)."""
+        self._check_fork()
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+                generation = self._generation
+            try:
+                pooled = _PooledConnection(self._connect(), generation)
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    def close_all(self):
+        """Cierra las conexiones libres; las prestadas se cierran cuando se devuelvan."""
+        with self._cond:
+            self._generation += 1
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._close(pooled)
+        if idle:
+            log.debug("🔌 Pool de PostgreSQL cerrado (%s conexiones).", len(idle))
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    # ------------------------------------------------------------------
+    # Internos del pool
+    # ------------------------------------------------------------------
+
+    def _connect(self):
+        start = time.perf_counter()
         try:
-            self.connection = psycopg2.connect(
+            connection = psycopg2.connect(
                 host=self.db_host,
                 port=self.db_port,
                 dbname=self.db_name,
                 user=self.db_user,
                 password=self.db_pass,
-                client_encoding='utf8'
+                client_encoding='utf8',
+                connect_timeout=int(self.timeout) or 1,
+                # Keepalives para detectar conexiones muertas mientras Lambda está congelada
+                keepalives=1,
+                keepalives_idle=30,
+                keepalives_interval=10,
+                keepalives_count=3,
+                cursor_factory=InstrumentedCursor
             )
+            duration_ms = (time.perf_counter() - start) * 1000
+            metrics.record('connect', duration_ms)
+            metrics.registry.observe('connect', 'postgresql', duration_ms)
             log.debug("✅ Conexión a PostgreSQL exitosa.")
-            return self.connection
+            return connection
         except Exception as e:
             log.error(f"❌ Error al conectar a PostgreSQL: ", e)
             raise
 
-    def close_connection(self):
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-            log.debug("🔌 Conexión a PostgreSQL cerrada.")
+    def _close(self, pooled):
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
+
+    def _check_fork(self):
+        # Después de un fork el hijo no debe tocar los sockets del padre: se olvidan sin cerrarlos
+        if self._pid != os.getpid():
+            with self._cond:
+                if self._pid != os.getpid():
+                    self._idle.clear()
+                    self._size = 0
+                    self._generation += 1
+                    self._pid = os.getpid()
+
+    def _is_expired(self, pooled, now):
+        return (
+            pooled.raw.closed
+            or pooled.generation != self._generation
+            or pooled.uses >= self.max_uses
+            or now - pooled.created_at >= self.max_lifetime
+        )
+
+    def _is_healthy(self, pooled, now):
+        if now - pooled.last_used < self.health_check_after:
+            return True
+        try:
+            with pooled.raw.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            pooled.raw.rollback()
+            return True
+        except Exception as e:
+            log.debug("⚠️ Conexión inactiva descartada por health check: ", e)
+            return False
+
+    def _checkout(self):
+        self._check_fork()
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            pooled = None
+            create = False
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No hay conexiones disponibles tras {self.timeout}s (max_size={self.max_size})."
+                        )
+                    self._cond.wait(remaining)
+                if self._idle:
+                    # LIFO: la conexión usada más recientemente es la que menos probablemente esté muerta
+                    pooled = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+                generation = self._generation
+
+            if create:
+                try:
+                    pooled = _PooledConnection(self._connect(), generation)
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                now = time.monotonic()
+                if self._is_expired(pooled, now) or not self._is_healthy(pooled, now):
+                    self._discard(pooled)
+                    continue
+
+            pooled.uses += 1
+            return pooled
+
+    def _release(self, pooled, failed=False):
+        raw = pooled.raw
+        reusable = not raw.closed
+        if reusable and raw.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            # Nunca se devuelve al pool una conexión con una transacción abierta
+            try:
+                raw.rollback()
+            except Exception:
+                reusable = False
+        if reusable and failed:
+            reusable = raw.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+        now = time.monotonic()
+        pooled.last_used = now
+        if not reusable or self._is_expired(pooled, now):
+            self._discard(pooled)
+            return
+
+        with self._cond:
+            self._idle.append(pooled)
+            stale = []
+            # Se recortan conexiones ociosas por encima de min_size
+            while len(self._idle) > self.min_size and now - self._idle[0].last_used >= self.max_idle:
+                stale.append(self._idle.popleft())
+            self._size -= len(stale)
+            self._cond.notify()
+        for old in stale:
+            self._close(old)
+
+    def _discard(self, pooled):
+        self._close(pooled)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
 
-db_connector = DatabaseConnector()
\ No newline at end of file
+db_connector = DatabaseConnector()
+atexit.register(db_connector.close_all)
@@ -0,0 +1,132 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# Invalidaciones recientes que se recuerdan por llave (ver EntityCache.version)
+MAX_TRACKED_INVALIDATIONS = 4096
+
+
+class EntityCache:
+    """
+    Caché en memoria del proceso para filas de una tabla, con LRU y TTL.
+
+    Guarda la fila cruda (id, data) y no la entidad, así cada
+    lectura construye su propio objeto y nadie modifica la copia cacheada.
+    La instancia vive a nivel de módulo, por lo que se conserva entre
+    invocaciones "calientes" de Lambda y entre requests de un mismo worker.
+    """
+
+    def __init__(self, name, max_size=1000, ttl=60):
+        """
+        Args:
+            name (str): Nombre para logs y métricas
+            max_size (int): Entradas máximas; 0 desactiva la caché
+            ttl (float): Segundos que una entrada se considera vigente
+        """
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Contador de invalidaciones, última invalidación de cada llave reciente y
+        # versión por debajo de la cual ya no se sabe qué llaves se invalidaron
+        self._version = 0
+        self._invalidated = OrderedDict()
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get(self, key):
+        """Devuelve la fila cacheada o None si no está o ya expiró."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, row = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return row
+
+    @property
+    def version(self):
+        """
+        Versión actual de la caché; se toma antes de leer la base y se pasa a set().
+
+        Si la llave se invalidó mientras la consulta estaba en curso (p. ej. llegó
+        la notificación de un cambio de otro proceso), set() descarta la fila leída
+        en vez de guardar una copia que ya quedó vieja.
+        """
+        with self._lock:
+            return self._version
+
+    def set(self, key, row, version=None):
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if version is not None and (version < self._floor or self._invalidated.get(key, -1) > version):
+                return
+            self._entries[key] = (expires_at, row)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._version += 1
+            self._invalidated[key] = self._version
+            self._invalidated.move_to_end(key)
+            if len(self._invalidated) > MAX_TRACKED_INVALIDATIONS:
+                _, self._floor = self._invalidated.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version += 1
+            self._invalidated.clear()
+            self._floor = self._version
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+equipment_cache = EntityCache(
+    'equipment',
+    max_size=int(os.environ.get("EQUIPMENT_CACHE_SIZE", os.environ.get("ENTITY_CACHE_SIZE", 1000))),
+    ttl=float(os.environ.get("EQUIPMENT_CACHE_TTL", 60))
+)
+product_cache = EntityCache(
+    'product',
+    max_size=int(os.environ.get("PRODUCT_CACHE_SIZE", os.environ.get("ENTITY_CACHE_SIZE", 1000))),
+    ttl=float(os.environ.get("PRODUCT_CACHE_TTL", 60))
+)
@@ -1,194 +1,597 @@
+import time
 import psycopg2.extras
 from src.data_access.db_connector import db_connector
+from src.data_access.entity_cache import equipment_cache
+from src.data_access.errors import NotFoundError, PreconditionFailedError, QueueFullError
+from src.data_access.ids import normalize_ids
+from src.data_access import write_batcher
+from src.data_access.pagination import (
+    DEFAULT_ITERSIZE, decode_search_token, decode_token, encode_search_token, encode_token, normalize_change_cursor,
+    normalize_limit, normalize_search_term,
+)
+from src.data_access.queries import (
+    CHANGE_LOCK_KEYS, CHANGE_WRITERS_QUERY, CHANGES_POLL_MS, CHANGES_WAIT_MS,
+    RAW_COLUMNS, ROW_COLUMNS, VERSION_COLUMNS, by_id_query, by_ids_query, changes_query, list_query,
+    restore_from_archive_query, search_query, undelete_query, watermark_query,
+)
 from src.entities import Equipment
-from src.utils import logger
+from src.utils import etags, logger, metrics, time_helper
 
 log = logger('Equipment_DB')
 
 class EquipmentDB:
+    # Filas por INSERT multi-fila en las cargas masivas
+    BULK_CHUNK_SIZE = 1000
+    # Campos por los que se puede filtrar un listado
+    FILTERABLE_FIELDS = ('location', 'serial_number', 'createdBy')
+    # Campos que el cliente puede modificar con update
+    UPDATABLE_FIELDS = ('name', 'location', 'serial_number')
+
     def __init__(self):
+        # Las conexiones se piden prestadas al pool compartido en cada operación
         self.db = db_connector
-        self.connection = None
+        # Caché LRU/TTL compartida por todas las instancias del proceso
+        self.cache = equipment_cache
+        # Con WRITE_BATCHING=1 las altas individuales comparten transacción (ver write_batcher.py)
+        self.batcher = write_batcher.equipment_batcher if write_batcher.ENABLED else None
 
-    def get_connection(self):
-        if not self.connection:
-            self.connection = self.db.get_connection()
-        return self.connection
+    def _build_equipment(self, row):
+        # Filas de cursores de tuplas: (id, data)
+        return Equipment.from_row(row[0], row[1])
 
-    def close_connection(self):
-        if self.connection:
-            self.db.close_connection()
-            self.connection = None
+    def _cache_row(self, row, version=None):
+        # `version` es self.cache.version tomado antes de la consulta (ver EntityCache.version)
+        entity_id = str(row[0])
+        self.cache.set(entity_id, (entity_id, row[1]), version=version)
 
-    def create_equipment(self, equipment_data):
+    def _filters_document(self, filters):
+        # Los filtros se mandan como un documento para `data @> %s`, que resuelve el índice GIN
+        if not filters:
+            return None
+        unknown = [field for field in filters if field not in self.FILTERABLE_FIELDS]
+        if unknown:
+            raise ValueError(f"No se puede filtrar por: {', '.join(unknown)}")
+        return dict(filters)
+
+    def _page_query(self, limit, after, filters, columns=ROW_COLUMNS):
+        # Devuelve (limit, sql, params) de una página; la consulta pide limit + 1 filas
+        # para saber si hay una página siguiente
+        limit = normalize_limit(limit)
+        contains = self._filters_document(filters)
+        params = []
+        if contains:
+            params.append(contains)
+        if after:
+            created_at, last_id = decode_token(after)
+            params.extend([created_at, last_id])
+        params.append(limit + 1)
+        query = list_query("Equipment", keyset=bool(after), contains=bool(contains), columns=columns)
+        return limit, query, params
+
+    def _search_query(self, term, limit, after):
+        # Igual que _page_query: (limit, sql, params) pidiendo limit + 1 filas
+        term = normalize_search_term(term)
+        limit = normalize_limit(limit)
+        params = [term, term, term]
+        if after:
+            rank, last_id = decode_search_token(after)
+            params.extend([rank, last_id])
+        params.append(limit + 1)
+        return limit, search_query("Equipment", keyset=bool(after)), params
+
+    def _check_version(self, cursor, equipment_id, if_match):
+        # Bloquea la fila hasta el commit para que nadie la cambie entre la comparación y el UPDATE
+        cursor.execute(by_id_query("Equipment", columns=VERSION_COLUMNS) + " FOR UPDATE", (equipment_id,))
+        current = cursor.fetchone()
+        if current is None:
+            raise NotFoundError(f"Equipo con ID {equipment_id} no encontrado")
+        if not etags.match(if_match, etags.entity_etag(current[0], current[1])):
+            raise PreconditionFailedError(f"El equipo {equipment_id} cambió desde que se leyó (If-Match no coincide).")
+
+    def _new_equipment(self, equipment_data):
+        # Construir la entidad valida los datos recibidos
+        return Equipment(
+            name=equipment_data.get('name'),
+            location=equipment_data.get('location'),
+            serial_number=equipment_data.get('serial_number', 'N/A'),
+            createdBy=equipment_data.get('createdBy')
+        )
+
+    def _insert_batched(self, equipment):
+        # Espera el commit del lote en el que quedó la fila; el error es el de esa fila
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            equipment = Equipment(
-                name=equipment_data.get('name'),
-                location=equipment_data.get('location'),
-                serial_number=equipment_data.get('serial_number', 'N/A'),
-                createdBy=equipment_data.get('createdBy')
-            )
-            
-            query = """
-                INSERT INTO public."Equipment" (id, data)
-                VALUES (%s, %s)
-                RETURNING id
-            """
-            
-            cursor.execute(query, (equipment.get_id(), equipment.get_data()))
-            connection.commit()
-            
-            log.info(f"✅ Equipo creado exitosamente con ID: {equipment.get_id()}")
-            return equipment.get_id()
-            
+            with metrics.span('batch_wait'):
+                self.batcher.insert(equipment.get_id(), equipment.get_data())
+        except QueueFullError:
+            log.warning("⚠️ Cola de escrituras llena al crear equipo")
+            raise
         except Exception as e:
-            if connection:
-                connection.rollback()
             log.error(f"❌ Error al crear equipo: ", e)
             raise
-        finally:
-            if cursor:
-                cursor.close()
+
+    def create_equipment(self, equipment_data):
+        equipment = self._new_equipment(equipment_data)
+
+        query = """
+            INSERT INTO public."Equipment" (id, data)
+            VALUES (%s, %s)
+            RETURNING id
+        """
+
+        if self.batcher is not None:
+            self._insert_batched(equipment)
+        else:
+            with self.db.connection() as connection:
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute(query, (equipment.get_id(), equipment.get_data()))
+                    connection.commit()
+                except Exception as e:
+                    connection.rollback()
+                    log.error(f"❌ Error al crear equipo: ", e)
+                    raise
+
+        self.cache.set(str(equipment.get_id()), (str(equipment.get_id()), equipment.get_data()))
+        log.info(f"✅ Equipo creado exitosamente con ID: {equipment.get_id()}")
+        return equipment.get_id()
+
+    def create_equipment_bulk(self, items, chunk_size=None):
+        """
+        Crea muchos registros en una sola transacción.
+
+        Cada elemento se valida con el constructor de Equipment; los inválidos se reportan
+        y no detienen la carga. Los válidos se insertan en bloques de `chunk_size`
+        filas con un INSERT multi-fila (execute_values) y se hace un único commit.
+
+        Returns:
+            dict: {"created": [ids], "failed": [{"index": i, "error": mensaje}]}
+        """
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        query = 'INSERT INTO public."Equipment" (id, data) VALUES %s'
+        created = []
+        failed = []
+
+        with self.db.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    chunk = []
+                    for index, equipment_data in enumerate(items):
+                        try:
+                            equipment = self._new_equipment(equipment_data)
+                        except (ValueError, TypeError, AttributeError) as e:
+                            failed.append({"index": index, "error": str(e)})
+                            continue
+                        chunk.append((equipment.get_id(), equipment.get_data()))
+                        if len(chunk) >= chunk_size:
+                            psycopg2.extras.execute_values(cursor, query, chunk, page_size=chunk_size)
+                            created.extend(row[0] for row in chunk)
+                            chunk = []
+                    if chunk:
+                        psycopg2.extras.execute_values(cursor, query, chunk, page_size=chunk_size)
+                        created.extend(row[0] for row in chunk)
+                connection.commit()
+                # Los IDs son nuevos, no hay nada que invalidar; tampoco se precargan
+                # para que una carga masiva no desplace de la caché a los registros calientes
+            except Exception as e:
+                connection.rollback()
+                log.error(f"❌ Error en la carga masiva de equipos: ", e)
+                raise
+
+        log.info(f"✅ Carga masiva: {len(created)} equipos creados, {len(failed)} con errores")
+        return {"created": created, "failed": failed}
 
     def get_equipment_by_id(self, equipment_id):
+        cached = self.cache.get(str(equipment_id))
+        if cached is not None:
+            log.debug("✅ Equipo encontrado en caché con ID: %s", equipment_id)
+            return self._build_equipment(cached)
+        version = self.cache.version
+
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(cursor_factory=psycopg2.extras.DictCursor)
-            
-            query = 'SELECT id, data FROM public."Equipment" WHERE id = %s'
-            cursor.execute(query, (equipment_id,))
-            result = cursor.fetchone()
-            
-            if result:
-                data = result['data']
-                equipment = Equipment(
-                    id=result['id'],
-                    name=data['name'],
-                    location=data['location'],
-                    serial_number=data['serial_number'],
-                    createdBy=data['createdBy'],
-                    createdAt=data['createdAt'],
-                    modifiedAt=data['modifiedAt'],
-                    deleted=data['deleted']
-                )
-                log.debug(f"✅ Equipo encontrado con ID: {equipment_id}")
-                return equipment
-            else:
-                log.warning(f"⚠️ No se encontró equipo con ID: {equipment_id}")
-                return None
-                
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    query = by_id_query("Equipment")
+                    cursor.execute(query, (equipment_id,))
+                    result = cursor.fetchone()
         except Exception as e:
             log.error(f"❌ Error al obtener equipo por ID: ", e)
             raise
-        finally:
-            if cursor:
-                cursor.close()
 
-    def get_all_equipment(self):
+        if result:
+            self._cache_row(result, version)
+            equipment = self._build_equipment(result)
+            log.debug("✅ Equipo encontrado con ID: %s", equipment_id)
+            return equipment
+        else:
+            log.warning(f"⚠️ No se encontró equipo con ID: {equipment_id}")
+            return None
+
+    def get_equipment_by_ids(self, ids):
+        """
+        Obtiene varios registros por ID en una sola consulta (`id = ANY(...)`).
+
+        Args:
+            ids (iterable): IDs a buscar; los repetidos se consultan una sola vez
+
+        Returns:
+            tuple: (dict {id: Equipment}, lista de IDs no encontrados o inválidos)
+        """
+        wanted, missing = normalize_ids(ids)
+
+        # Primero la caché; solo los que falten van a la base de datos
+        found = {}
+        pending = []
+        for entity_id in wanted:
+            cached = self.cache.get(entity_id)
+            if cached is not None:
+                found[entity_id] = self._build_equipment(cached)
+            else:
+                pending.append(entity_id)
+        if not pending:
+            return found, missing
+        version = self.cache.version
+
+        query = by_ids_query("Equipment")
+
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(cursor_factory=psycopg2.extras.DictCursor)
-            
-            query = 'SELECT id, data FROM public."Equipment" WHERE data->>\'deleted\' = \'false\' ORDER BY data->>\'createdAt\' DESC'
-            cursor.execute(query)
-            results = cursor.fetchall()
-            
-            equipment_list = []
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, (pending,))
+                    results = cursor.fetchall()
+        except Exception as e:
+            log.error(f"❌ Error al obtener equipos por IDs: ", e)
+            raise
+
+        with metrics.span('hydrate'):
             for result in results:
-                data = result['data']
-                equipment = Equipment(
-                    id=result['id'],
-                    name=data['name'],
-                    location=data['location'],
-                    serial_number=data['serial_number'],
-                    createdBy=data['createdBy'],
-                    createdAt=data['createdAt'],
-                    modifiedAt=data['modifiedAt'],
-                    deleted=data['deleted']
-                )
-                equipment_list.append(equipment)
-            
-            log.debug(f"✅ Se encontraron {len(equipment_list)} equipos")
-            return equipment_list
-            
+                self._cache_row(result, version)
+                found[str(result[0])] = self._build_equipment(result)
+        missing.extend(entity_id for entity_id in pending if entity_id not in found)
+
+        log.debug("✅ Se encontraron %s de %s equipos solicitados", len(found), len(wanted))
+        return found, missing
+
+    def get_all_equipment(self):
+        equipment_list = list(self.iter_equipment())
+        log.debug("✅ Se encontraron %s equipos", len(equipment_list))
+        return equipment_list
+
+    def get_equipment_page(self, limit=None, after=None, filters=None):
+        """
+        Devuelve una página de equipos activos ordenados por (createdAt, id) descendente.
+
+        Args:
+            limit (int): Tamaño de página (se acota a MAX_PAGE_SIZE)
+            after (str): Token opaco devuelto por la página anterior
+            filters (dict): Igualdad exacta sobre FILTERABLE_FIELDS (se resuelve con el índice GIN)
+
+        Returns:
+            tuple: (lista de Equipment, token de la siguiente página o None)
+        """
+        limit, query, params = self._page_query(limit, after, filters)
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
         except Exception as e:
-            log.error(f"❌ Error al obtener todos los equipos: ", e)
+            log.error(f"❌ Error al obtener página de equipos: ", e)
             raise
-        finally:
-            if cursor:
-                cursor.close()
 
-    def update_equipment(self, equipment_id, equipment_data):
+        with metrics.span('hydrate'):
+            items = [self._build_equipment(result) for result in results[:limit]]
+        next_token = None
+        if len(results) > limit:
+            last = items[-1]
+            next_token = encode_token(last.createdAt, last.id)
+
+        log.debug("✅ Página con %s equipos", len(items))
+        return items, next_token
+
+    def get_equipment_page_raw(self, limit=None, after=None, filters=None):
+        """
+        Como get_equipment_page, pero sin decodificar el JSONB ni hidratar entidades.
+
+        Returns:
+            tuple: (lista de (id, modifiedAt, documento JSON en texto), token de la siguiente página o None)
+        """
+        limit, query, params = self._page_query(limit, after, filters, columns=RAW_COLUMNS)
+
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            # Obtener equipo existente
-            existing_equipment = self.get_equipment_by_id(equipment_id)
-            if not existing_equipment:
-                raise ValueError(f"Equipo con ID {equipment_id} no encontrado")
-            
-            # Actualizar datos
-            existing_equipment.name = equipment_data.get('name', existing_equipment.name)
-            existing_equipment.location = equipment_data.get('location', existing_equipment.location)
-            existing_equipment.serial_number = equipment_data.get('serial_number', existing_equipment.serial_number)
-            existing_equipment.modifiedAt = existing_equipment.modifiedAt
-            
-            query = """
-                UPDATE public."Equipment"
-                SET data = %s
-                WHERE id = %s
-            """
-            
-            cursor.execute(query, (existing_equipment.get_data(), equipment_id))
-            connection.commit()
-            
-            log.info(f"✅ Equipo actualizado exitosamente con ID: {equipment_id}")
-            return equipment_id
-            
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
         except Exception as e:
-            if connection:
-                connection.rollback()
-            log.error(f"❌ Error al actualizar equipo: ", e)
+            log.error("❌ Error al obtener página de equipos: ", e)
             raise
-        finally:
-            if cursor:
-                cursor.close()
 
-    def delete_equipment(self, equipment_id):
+        next_token = None
+        if len(results) > limit:
+            last = results[limit - 1]
+            next_token = encode_token(last[2], last[0])
+        return [(str(row[0]), row[1], row[3]) for row in results[:limit]], next_token
+
+    def get_equipment_version(self, equipment_id):
+        """
+        Devuelve (id, modifiedAt) de un registro sin traer el documento, o None si no existe.
+
+        Alcanza para calcular su ETag y contestar un If-None-Match con 304; si el
+        registro está en caché ni siquiera se consulta la base.
+        """
+        cached = self.cache.get(str(equipment_id))
+        if cached is not None:
+            return cached[0], cached[1].get('modifiedAt')
+
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            # Obtener equipo existente
-            existing_equipment = self.get_equipment_by_id(equipment_id)
-            if not existing_equipment:
-                raise ValueError(f"Equipo con ID {equipment_id} no encontrado")
-            
-            # Marcar como eliminado
-            existing_equipment.deleted = True
-            existing_equipment.modifiedAt = existing_equipment.modifiedAt
-            
-            query = """
-                UPDATE public."Equipment"
-                SET data = %s
-                WHERE id = %s
-            """
-            
-            cursor.execute(query, (existing_equipment.get_data(), equipment_id))
-            connection.commit()
-            
-            log.info(f"✅ Equipo eliminado (marcado como eliminado) con ID: {equipment_id}")
-            return equipment_id
-            
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(by_id_query("Equipment", columns=VERSION_COLUMNS), (equipment_id,))
+                    result = cursor.fetchone()
         except Exception as e:
-            if connection:
-                connection.rollback()
-            log.error(f"❌ Error al eliminar equipo: ", e)
+            log.error("❌ Error al obtener versión del equipo: ", e)
             raise
-        finally:
-            if cursor:
-                cursor.close()
\ No newline at end of file
+        return (str(result[0]), result[1]) if result else None
+
+    def get_equipment_page_versions(self, limit=None, after=None, filters=None):
+        """
+        Versión de la página que devolvería get_equipment_page con los mismos argumentos.
+
+        Misma consulta e índice, pero solo lee (id, modifiedAt): no hidrata entidades.
+
+        Returns:
+            tuple: (lista de (id, modifiedAt), True si hay una página siguiente)
+        """
+        limit, query, params = self._page_query(limit, after, filters, columns=VERSION_COLUMNS)
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
+        except Exception as e:
+            log.error("❌ Error al obtener versiones de equipos: ", e)
+            raise
+
+        return [(str(row[0]), row[1]) for row in results[:limit]], len(results) > limit
+
+    def search_equipment(self, term, limit=None, after=None):
+        """
+        Busca equipos activos por nombre, ubicación o número de serie.
+
+        Combina texto completo en español (admite "frases", OR y -exclusiones) con
+        coincidencia aproximada por trigramas, así que tolera errores de tipeo. Los
+        resultados vienen ordenados por relevancia y paginados con keyset sobre (rank, id).
+
+        Args:
+            term (str): Texto a buscar
+            limit (int): Tamaño de página (se acota a MAX_PAGE_SIZE)
+            after (str): Token opaco devuelto por la página anterior de la misma búsqueda
+
+        Returns:
+            tuple: (lista de Equipment en orden de relevancia, token de la siguiente página o None)
+        """
+        limit, query, params = self._search_query(term, limit, after)
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
+        except Exception as e:
+            log.error("❌ Error al buscar equipos: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            items = [self._build_equipment(result) for result in results[:limit]]
+        next_token = None
+        if len(results) > limit:
+            last = results[limit - 1]
+            next_token = encode_search_token(last[2], last[0])
+
+        log.debug("✅ Búsqueda con %s equipos", len(items))
+        return items, next_token
+
+    def iter_equipment(self, itersize=DEFAULT_ITERSIZE):
+        """
+        Recorre todos los equipos activos con un cursor del lado del servidor.
+
+        Solo se mantienen `itersize` filas en memoria a la vez, así que el consumo
+        no depende del tamaño de la tabla. La conexión queda prestada mientras el
+        generador esté abierto.
+        """
+        query = list_query("Equipment", limit=False)
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor(name='iter_equipment') as cursor:
+                    cursor.itersize = itersize
+                    cursor.execute(query)
+                    for result in cursor:
+                        yield self._build_equipment(result)
+        except Exception as e:
+            log.error("❌ Error al obtener todos los equipos: ", e)
+            raise
+
+    def _wait_for_writers(self, db_cursor):
+        """
+        Espera a que terminen las escrituras que tenían el lock compartido de la tabla
+        al leer el watermark: las únicas que pueden tener un change_seq menor o igual
+        todavía sin confirmar. Las que empiezan después no se esperan (ver
+        CHANGES_WAIT_MS en queries.py).
+
+        Returns:
+            bool: True si terminaron todas antes de CHANGES_WAIT_MS
+        """
+        key = CHANGE_LOCK_KEYS["Equipment"]
+        db_cursor.execute(CHANGE_WRITERS_QUERY, (key,))
+        pending = {row[0] for row in db_cursor.fetchall()}
+        deadline = time.monotonic() + CHANGES_WAIT_MS / 1000
+        while pending:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(CHANGES_POLL_MS / 1000)
+            db_cursor.execute(CHANGE_WRITERS_QUERY, (key,))
+            pending &= {row[0] for row in db_cursor.fetchall()}
+        return True
+
+    def changes_since(self, cursor=None, limit=None):
+        """
+        Equipos creados, modificados o eliminados (soft delete) después de `cursor`.
+
+        El cursor es el change_seq que la base asigna en cada escritura, no el
+        modifiedAt. Antes de leer se espera a que terminen las escrituras que ya
+        tienen número (advisory lock de la tabla, ver migración 0005), así ningún
+        cambio queda atrás del cursor devuelto. Si alguna sigue abierta después de
+        CHANGES_WAIT_MS se devuelve el mismo cursor, sin cambios y con True: el
+        cliente reintenta más tarde. Sin cursor solo se devuelve la posición actual:
+        el cliente la guarda antes de su descarga inicial.
+
+        Args:
+            cursor (int): Cursor devuelto por la llamada anterior (None para empezar)
+            limit (int): Cambios máximos por llamada (se acota a MAX_PAGE_SIZE)
+
+        Returns:
+            tuple: (lista de Equipment en orden de cambio, incluidos los eliminados,
+                    cursor para la próxima llamada, True si hay que volver a llamar)
+        """
+        cursor = normalize_change_cursor(cursor)
+        limit = normalize_limit(limit)
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor() as db_cursor:
+                    db_cursor.execute(watermark_query("Equipment"))
+                    watermark = db_cursor.fetchone()[0]
+                    settled = self._wait_for_writers(db_cursor)
+                    connection.commit()
+                    if not settled:
+                        log.debug("⚠️ Escrituras largas en curso; el feed de equipos sigue en %s", cursor)
+                        return [], cursor, True
+                    if cursor is None or cursor >= watermark:
+                        return [], max(watermark, cursor or 0), False
+                    db_cursor.execute(changes_query("Equipment"), (cursor, watermark, limit + 1))
+                    results = db_cursor.fetchall()
+        except Exception as e:
+            log.error("❌ Error al obtener cambios de equipos: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            items = [self._build_equipment(result) for result in results[:limit]]
+        has_more = len(results) > limit
+        next_cursor = results[limit - 1][2] if has_more else watermark
+
+        log.debug("✅ %s cambios de equipos desde %s", len(items), cursor)
+        return items, next_cursor, has_more
+
+    def update_equipment(self, equipment_id, equipment_data, if_match=None):
+        """
+        Actualiza solo los campos recibidos en una sola sentencia.
+
+        PostgreSQL mezcla las llaves cambiadas sobre el JSONB actual (`data || cambios`),
+        así que no hay lectura previa ni se pisan cambios concurrentes a otros campos.
+        Con `if_match` (valor del header If-Match) primero se bloquea la fila y se
+        compara su ETag; si no coincide se lanza PreconditionFailedError.
+
+        Returns:
+            Equipment: El registro tal como quedó guardado
+        """
+        changes = {key: equipment_data[key] for key in self.UPDATABLE_FIELDS if key in equipment_data}
+        if ('name' in changes and not changes['name']) or ('location' in changes and not changes['location']):
+            raise ValueError("El nombre y la ubicación del equipo son requeridos.")
+        changes['modifiedAt'] = time_helper.now()
+        version = self.cache.version
+
+        query = """
+            UPDATE public."Equipment"
+            SET data = data || %s::jsonb
+            WHERE id = %s
+            RETURNING id, data
+        """
+
+        with self.db.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    if if_match is not None:
+                        self._check_version(cursor, equipment_id, if_match)
+                    cursor.execute(query, (changes, equipment_id))
+                    updated = cursor.rowcount
+                    result = cursor.fetchone()
+                connection.commit()
+            except (NotFoundError, PreconditionFailedError):
+                connection.rollback()
+                raise
+            except Exception as e:
+                connection.rollback()
+                log.error(f"❌ Error al actualizar equipo: ", e)
+                raise
+
+        if updated == 0:
+            raise NotFoundError(f"Equipo con ID {equipment_id} no encontrado")
+
+        self._cache_row(result, version)
+        log.info(f"✅ Equipo actualizado exitosamente con ID: {equipment_id}")
+        return self._build_equipment(result)
+
+    def delete_equipment(self, equipment_id):
+        """Marca el registro como eliminado (soft delete) en una sola sentencia."""
+        changes = {"deleted": True, "modifiedAt": time_helper.now()}
+
+        query = """
+            UPDATE public."Equipment"
+            SET data = data || %s::jsonb
+            WHERE id = %s
+            RETURNING id
+        """
+
+        with self.db.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, (changes, equipment_id))
+                    deleted = cursor.rowcount
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                log.error(f"❌ Error al eliminar equipo: ", e)
+                raise
+
+        self.cache.invalidate(str(equipment_id))
+        if deleted == 0:
+            raise NotFoundError(f"Equipo con ID {equipment_id} no encontrado")
+
+        log.info(f"✅ Equipo eliminado (marcado como eliminado) con ID: {equipment_id}")
+        return equipment_id
+
+    def restore_equipment(self, equipment_id):
+        """
+        Vuelve a activar un equipo eliminado. Si sigue en la tabla se reactiva con un
+        UPDATE; si ya se archivó (ver archiver.py) se devuelve desde el archivo, en la
+        misma transacción.
+
+        Returns:
+            Equipment: El registro restaurado
+        """
+        changes = {"deleted": False, "modifiedAt": time_helper.now()}
+        version = self.cache.version
+
+        with self.db.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(undelete_query("Equipment"), (changes, equipment_id))
+                    result = cursor.fetchone()
+                    if result is None:
+                        cursor.execute(restore_from_archive_query("Equipment"), (equipment_id, changes))
+                        result = cursor.fetchone()
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                log.error(f"❌ Error al restaurar equipo: ", e)
+                raise
+
+        if result is None:
+            raise NotFoundError(f"Equipo eliminado con ID {equipment_id} no encontrado")
+
+        self._cache_row(result, version)
+        log.info(f"✅ Equipo restaurado con ID: {equipment_id}")
+        return self._build_equipment(result)
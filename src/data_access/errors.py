@@ -0,0 +1,14 @@
+class NotFoundError(ValueError):
+    """El registro solicitado no existe. Hereda de ValueError para no romper a quien ya lo captura así."""
+
+
+class PreconditionFailedError(ValueError):
+    """El registro cambió desde que el cliente lo leyó (If-Match no coincide con su ETag)."""
+
+
+class PoolTimeoutError(Exception):
+    """Se lanza cuando no hay conexiones libres dentro del tiempo de espera del pool."""
+
+
+class QueueFullError(Exception):
+    """La cola de escrituras agrupadas está llena (o cerrándose): el cliente debe reintentar más tarde."""
@@ -0,0 +1,23 @@
+import uuid
+
+
+def normalize_ids(ids):
+    """
+    Limpia una lista de IDs antes de consultarla.
+
+    Returns:
+        tuple: (IDs válidos en forma canónica y sin repetir, IDs que no son UUID válidos)
+    """
+    valid = []
+    invalid = []
+    seen = set()
+    for raw_id in ids:
+        try:
+            entity_id = str(uuid.UUID(str(raw_id).strip()))
+        except ValueError:
+            invalid.append(raw_id)
+            continue
+        if entity_id not in seen:
+            seen.add(entity_id)
+            valid.append(entity_id)
+    return valid, invalid
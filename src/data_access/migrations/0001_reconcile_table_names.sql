@@ -0,0 +1,22 @@
+-- Las clases de acceso a datos usan public."Equipment" y public."Product", pero
+-- create_tables.sql creaba equipment/products en minúsculas. Si existen las tablas
+-- viejas se renombran (conservando los datos); si no existe ninguna se crean.
+DO $$
+BEGIN
+    IF to_regclass('public."Equipment"') IS NULL AND to_regclass('public.equipment') IS NOT NULL THEN
+        ALTER TABLE public.equipment RENAME TO "Equipment";
+    END IF;
+    IF to_regclass('public."Product"') IS NULL AND to_regclass('public.products') IS NOT NULL THEN
+        ALTER TABLE public.products RENAME TO "Product";
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS public."Equipment" (
+    id UUID PRIMARY KEY,
+    data JSONB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS public."Product" (
+    id UUID PRIMARY KEY,
+    data JSONB NOT NULL
+);
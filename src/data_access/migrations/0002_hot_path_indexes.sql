@@ -0,0 +1,26 @@
+-- migrate:no-transaction
+-- Índices para las rutas calientes. Se crean CONCURRENTLY para no bloquear escrituras,
+-- por eso esta migración corre fuera de una transacción (una sentencia a la vez).
+--
+-- *_live_created_idx: índice parcial sobre (createdAt, id) solo para filas no eliminadas.
+--   Cubre el filtro `(data->>'deleted') = 'false'` y el ORDER BY createdAt DESC, id DESC
+--   (recorrido hacia atrás) de los listados, sin Sort y sin leer tombstones.
+-- *_data_gin_idx: GIN jsonb_path_ops para filtros por contención (`data @> '{...}'`).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS equipment_live_created_idx
+    ON public."Equipment" ((data->>'createdAt'), id)
+    WHERE (data->>'deleted') = 'false';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_live_created_idx
+    ON public."Product" ((data->>'createdAt'), id)
+    WHERE (data->>'deleted') = 'false';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS equipment_data_gin_idx
+    ON public."Equipment" USING GIN (data jsonb_path_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_data_gin_idx
+    ON public."Product" USING GIN (data jsonb_path_ops);
+
+ANALYZE public."Equipment";
+
+ANALYZE public."Product";
@@ -0,0 +1,32 @@
+-- migrate:no-transaction
+-- Índices de búsqueda (pg_trgm + texto completo). Igual que 0002, se crean CONCURRENTLY
+-- y la migración corre fuera de una transacción.
+--
+-- *_search_tsv_idx: GIN sobre el tsvector ponderado de los campos de búsqueda
+--   (`queries.search_vector`), para `@@ websearch_to_tsquery(...)`.
+-- *_search_trgm_idx: GIN gin_trgm_ops sobre los campos concatenados (`queries.search_text`),
+--   para la coincidencia aproximada `término <% texto`.
+-- Ambos son parciales sobre las filas no eliminadas, como los listados.
+-- Las expresiones tienen que ser idénticas a las de queries.py.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS equipment_search_tsv_idx
+    ON public."Equipment" USING GIN ((setweight(to_tsvector('spanish'::regconfig, coalesce(data->>'name', '')), 'A') || setweight(to_tsvector('spanish'::regconfig, coalesce(data->>'location', '')), 'B') || setweight(to_tsvector('simple'::regconfig, coalesce(data->>'serial_number', '')), 'C')))
+    WHERE (data->>'deleted') = 'false';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS equipment_search_trgm_idx
+    ON public."Equipment" USING GIN ((coalesce(data->>'name', '') || ' ' || coalesce(data->>'location', '') || ' ' || coalesce(data->>'serial_number', '')) gin_trgm_ops)
+    WHERE (data->>'deleted') = 'false';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_search_tsv_idx
+    ON public."Product" USING GIN ((setweight(to_tsvector('spanish'::regconfig, coalesce(data->>'name', '')), 'A') || setweight(to_tsvector('spanish'::regconfig, coalesce(data->>'description', '')), 'B') || setweight(to_tsvector('spanish'::regconfig, coalesce(data->>'category', '')), 'C')))
+    WHERE (data->>'deleted') = 'false';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_search_trgm_idx
+    ON public."Product" USING GIN ((coalesce(data->>'name', '') || ' ' || coalesce(data->>'description', '') || ' ' || coalesce(data->>'category', '')) gin_trgm_ops)
+    WHERE (data->>'deleted') = 'false';
+
+ANALYZE public."Equipment";
+
+ANALYZE public."Product";
@@ -0,0 +1,192 @@
+-- Resúmenes del catálogo mantenidos por triggers: cantidad de productos y precio
+-- mínimo/promedio/máximo por categoría, y cantidad de equipos por ubicación.
+-- Solo cuentan los registros activos ((data->>'deleted') = 'false').
+--
+-- Los triggers son por sentencia y leen las tablas de transición (old_rows/new_rows):
+-- una carga masiva o un UPDATE de muchas filas actualiza cada grupo una sola vez, en
+-- orden de llave para que dos cargas concurrentes no se bloqueen en orden inverso.
+-- Un UPDATE que no cambia categoría, precio ni `deleted` (p. ej. solo el nombre) se
+-- cancela en el GROUP BY y no escribe nada.
+--
+-- El mínimo y el máximo no se pueden restar, así que product_category_prices guarda
+-- cuántos productos hay en cada (categoría, precio); min/max salen de su llave primaria.
+
+CREATE TABLE IF NOT EXISTS public.product_category_stats (
+    category TEXT PRIMARY KEY,
+    product_count BIGINT NOT NULL,
+    price_sum NUMERIC NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS public.product_category_prices (
+    category TEXT NOT NULL,
+    price NUMERIC NOT NULL,
+    product_count BIGINT NOT NULL,
+    PRIMARY KEY (category, price)
+);
+
+CREATE TABLE IF NOT EXISTS public.equipment_location_stats (
+    location TEXT PRIMARY KEY,
+    equipment_count BIGINT NOT NULL
+);
+
+-- Aplica a los resúmenes de productos los documentos `docs` con su signo en `deltas`
+-- (+1 fila nueva, -1 fila anterior).
+CREATE OR REPLACE FUNCTION public.product_stats_apply(docs JSONB[], deltas INTEGER[]) RETURNS void AS $$
+BEGIN
+    INSERT INTO public.product_category_stats AS s (category, product_count, price_sum)
+    SELECT coalesce(doc->>'category', 'General'), sum(delta), sum(coalesce((doc->>'price')::numeric, 0) * delta)
+    FROM unnest(docs, deltas) AS t(doc, delta)
+    WHERE (doc->>'deleted') = 'false'
+    GROUP BY 1
+    HAVING sum(delta) <> 0 OR sum(coalesce((doc->>'price')::numeric, 0) * delta) <> 0
+    ORDER BY 1
+    ON CONFLICT (category) DO UPDATE
+        SET product_count = s.product_count + EXCLUDED.product_count,
+            price_sum = s.price_sum + EXCLUDED.price_sum;
+
+    INSERT INTO public.product_category_prices AS p (category, price, product_count)
+    SELECT coalesce(doc->>'category', 'General'), coalesce((doc->>'price')::numeric, 0), sum(delta)
+    FROM unnest(docs, deltas) AS t(doc, delta)
+    WHERE (doc->>'deleted') = 'false'
+    GROUP BY 1, 2
+    HAVING sum(delta) <> 0
+    ORDER BY 1, 2
+    ON CONFLICT (category, price) DO UPDATE
+        SET product_count = p.product_count + EXCLUDED.product_count;
+
+    -- Los grupos que quedan vacíos se borran para que leer los resúmenes sea O(grupos)
+    DELETE FROM public.product_category_stats
+    WHERE product_count = 0
+      AND category = ANY (ARRAY(SELECT coalesce(doc->>'category', 'General') FROM unnest(docs) AS t(doc)));
+    DELETE FROM public.product_category_prices
+    WHERE product_count = 0
+      AND category = ANY (ARRAY(SELECT coalesce(doc->>'category', 'General') FROM unnest(docs) AS t(doc)));
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.equipment_stats_apply(docs JSONB[], deltas INTEGER[]) RETURNS void AS $$
+BEGIN
+    INSERT INTO public.equipment_location_stats AS s (location, equipment_count)
+    SELECT coalesce(doc->>'location', ''), sum(delta)
+    FROM unnest(docs, deltas) AS t(doc, delta)
+    WHERE (doc->>'deleted') = 'false'
+    GROUP BY 1
+    HAVING sum(delta) <> 0
+    ORDER BY 1
+    ON CONFLICT (location) DO UPDATE
+        SET equipment_count = s.equipment_count + EXCLUDED.equipment_count;
+
+    DELETE FROM public.equipment_location_stats
+    WHERE equipment_count = 0
+      AND location = ANY (ARRAY(SELECT coalesce(doc->>'location', '') FROM unnest(docs) AS t(doc)));
+END;
+$$ LANGUAGE plpgsql;
+
+-- Un trigger por operación, porque cada una expone tablas de transición distintas.
+-- TG_ARGV[0] es la función *_stats_apply de la tabla.
+CREATE OR REPLACE FUNCTION public.catalog_stats_on_insert() RETURNS trigger AS $$
+BEGIN
+    EXECUTE format('SELECT public.%I(array_agg(data), array_agg(1)) FROM new_rows', TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.catalog_stats_on_update() RETURNS trigger AS $$
+BEGIN
+    EXECUTE format(
+        'SELECT public.%I(array_agg(data), array_agg(delta)) FROM ('
+        '    SELECT data, -1 AS delta FROM old_rows UNION ALL SELECT data, 1 FROM new_rows'
+        ') AS changes', TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.catalog_stats_on_delete() RETURNS trigger AS $$
+BEGIN
+    EXECUTE format('SELECT public.%I(array_agg(data), array_agg(-1)) FROM old_rows', TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recalcula todos los resúmenes desde las tablas base. Bloquea las escrituras de
+-- catálogo (SHARE) mientras corre, así el resultado es consistente.
+CREATE OR REPLACE FUNCTION public.rebuild_catalog_stats() RETURNS void AS $$
+BEGIN
+    LOCK TABLE public."Product", public."Equipment" IN SHARE MODE;
+    TRUNCATE public.product_category_stats, public.product_category_prices, public.equipment_location_stats;
+
+    INSERT INTO public.product_category_stats (category, product_count, price_sum)
+    SELECT coalesce(data->>'category', 'General'), count(*), sum(coalesce((data->>'price')::numeric, 0))
+    FROM public."Product"
+    WHERE (data->>'deleted') = 'false'
+    GROUP BY 1;
+
+    INSERT INTO public.product_category_prices (category, price, product_count)
+    SELECT coalesce(data->>'category', 'General'), coalesce((data->>'price')::numeric, 0), count(*)
+    FROM public."Product"
+    WHERE (data->>'deleted') = 'false'
+    GROUP BY 1, 2;
+
+    INSERT INTO public.equipment_location_stats (location, equipment_count)
+    SELECT coalesce(data->>'location', ''), count(*)
+    FROM public."Equipment"
+    WHERE (data->>'deleted') = 'false'
+    GROUP BY 1;
+END;
+$$ LANGUAGE plpgsql;
+
+-- TRUNCATE no dispara triggers por fila: se vacían los resúmenes de esa tabla
+CREATE OR REPLACE FUNCTION public.product_stats_on_truncate() RETURNS trigger AS $$
+BEGIN
+    TRUNCATE public.product_category_stats, public.product_category_prices;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.equipment_stats_on_truncate() RETURNS trigger AS $$
+BEGIN
+    TRUNCATE public.equipment_location_stats;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS product_stats_insert ON public."Product";
+CREATE TRIGGER product_stats_insert AFTER INSERT ON public."Product"
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.catalog_stats_on_insert('product_stats_apply');
+
+DROP TRIGGER IF EXISTS product_stats_update ON public."Product";
+CREATE TRIGGER product_stats_update AFTER UPDATE ON public."Product"
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.catalog_stats_on_update('product_stats_apply');
+
+DROP TRIGGER IF EXISTS product_stats_delete ON public."Product";
+CREATE TRIGGER product_stats_delete AFTER DELETE ON public."Product"
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.catalog_stats_on_delete('product_stats_apply');
+
+DROP TRIGGER IF EXISTS product_stats_truncate ON public."Product";
+CREATE TRIGGER product_stats_truncate AFTER TRUNCATE ON public."Product"
+    FOR EACH STATEMENT EXECUTE FUNCTION public.product_stats_on_truncate();
+
+DROP TRIGGER IF EXISTS equipment_stats_insert ON public."Equipment";
+CREATE TRIGGER equipment_stats_insert AFTER INSERT ON public."Equipment"
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.catalog_stats_on_insert('equipment_stats_apply');
+
+DROP TRIGGER IF EXISTS equipment_stats_update ON public."Equipment";
+CREATE TRIGGER equipment_stats_update AFTER UPDATE ON public."Equipment"
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.catalog_stats_on_update('equipment_stats_apply');
+
+DROP TRIGGER IF EXISTS equipment_stats_delete ON public."Equipment";
+CREATE TRIGGER equipment_stats_delete AFTER DELETE ON public."Equipment"
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.catalog_stats_on_delete('equipment_stats_apply');
+
+DROP TRIGGER IF EXISTS equipment_stats_truncate ON public."Equipment";
+CREATE TRIGGER equipment_stats_truncate AFTER TRUNCATE ON public."Equipment"
+    FOR EACH STATEMENT EXECUTE FUNCTION public.equipment_stats_on_truncate();
+
+-- Carga inicial con los datos que ya existen
+SELECT public.rebuild_catalog_stats();
@@ -0,0 +1,38 @@
+-- Feed de cambios: cada INSERT y UPDATE (incluido el soft delete) asigna a la fila
+-- un change_seq nuevo de la secuencia de su tabla, así los clientes piden "lo que
+-- cambió después de N" sin depender del modifiedAt que manda el cliente.
+--
+-- Las secuencias no respetan el orden de commit: una transacción puede tomar el 41,
+-- otra el 42 y confirmar primero la del 42. Para que un lector no avance su cursor
+-- más allá de un 41 todavía invisible, cada escritor toma el advisory lock compartido
+-- de la tabla antes de pedir su número. El lector lee el último número entregado (W),
+-- toma ese lock en modo exclusivo (espera a que confirmen los escritores en curso,
+-- que son los únicos que pueden tener números <= W sin confirmar) y lo suelta; después
+-- lee solo hasta W. Ver EquipmentDB.changes_since.
+--
+-- La columna se agrega sin default, así el ALTER no reescribe la tabla. Las filas
+-- existentes quedan con change_seq NULL: son anteriores a cualquier cursor y se
+-- obtienen con los listados normales. El índice se crea en 0006 (CONCURRENTLY).
+
+CREATE SEQUENCE IF NOT EXISTS public.equipment_change_seq;
+CREATE SEQUENCE IF NOT EXISTS public.product_change_seq;
+
+ALTER TABLE public."Equipment" ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+ALTER TABLE public."Product" ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+
+-- TG_ARGV[0]: secuencia de la tabla; TG_ARGV[1]: llave del advisory lock (queries.CHANGE_LOCK_KEYS)
+CREATE OR REPLACE FUNCTION public.assign_change_seq() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock_shared(TG_ARGV[1]::bigint);
+    NEW.change_seq := nextval(TG_ARGV[0]::regclass);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS equipment_change_seq ON public."Equipment";
+CREATE TRIGGER equipment_change_seq BEFORE INSERT OR UPDATE ON public."Equipment"
+    FOR EACH ROW EXECUTE FUNCTION public.assign_change_seq('public.equipment_change_seq', '72031002');
+
+DROP TRIGGER IF EXISTS product_change_seq ON public."Product";
+CREATE TRIGGER product_change_seq BEFORE INSERT OR UPDATE ON public."Product"
+    FOR EACH ROW EXECUTE FUNCTION public.assign_change_seq('public.product_change_seq', '72031003');
@@ -0,0 +1,11 @@
+-- migrate:no-transaction
+-- Índice del feed de cambios (ver 0005). Las filas anteriores al feed tienen
+-- change_seq NULL y quedan fuera del índice parcial.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS equipment_change_seq_idx
+    ON public."Equipment" (change_seq)
+    WHERE change_seq IS NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_change_seq_idx
+    ON public."Product" (change_seq)
+    WHERE change_seq IS NOT NULL;
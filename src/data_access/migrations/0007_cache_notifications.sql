@@ -0,0 +1,70 @@
+-- Avisos de cambios para invalidar las cachés de entidades de otros procesos
+-- (ver cache_listener.py). Por cada registro cuyo documento cambió o que se borró se
+-- publica "Tabla:id" en el canal catalog_changes; NOTIFY se entrega recién con el
+-- commit y los avisos repetidos dentro de una transacción se envían una sola vez.
+--
+-- Los INSERT no avisan: un registro nuevo no puede estar en ninguna caché. Un UPDATE
+-- que no cambia `data` (p. ej. solo columnas derivadas) tampoco. Si una sentencia
+-- toca más de 1000 registros se envía un solo "Tabla:*" que vacía esa caché.
+
+CREATE OR REPLACE FUNCTION public.notify_catalog_ids(table_name TEXT, ids UUID[]) RETURNS void AS $$
+BEGIN
+    IF cardinality(ids) > 1000 THEN
+        PERFORM pg_notify('catalog_changes', table_name || ':*');
+    ELSIF cardinality(ids) > 0 THEN
+        PERFORM pg_notify('catalog_changes', table_name || ':' || changed_id) FROM unnest(ids) AS t(changed_id);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.notify_catalog_update() RETURNS trigger AS $$
+BEGIN
+    PERFORM public.notify_catalog_ids(
+        TG_TABLE_NAME,
+        ARRAY(SELECT n.id FROM new_rows n JOIN old_rows o ON o.id = n.id WHERE n.data IS DISTINCT FROM o.data)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.notify_catalog_delete() RETURNS trigger AS $$
+BEGIN
+    PERFORM public.notify_catalog_ids(TG_TABLE_NAME, ARRAY(SELECT id FROM old_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.notify_catalog_truncate() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('catalog_changes', TG_TABLE_NAME || ':*');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS equipment_notify_update ON public."Equipment";
+CREATE TRIGGER equipment_notify_update AFTER UPDATE ON public."Equipment"
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.notify_catalog_update();
+
+DROP TRIGGER IF EXISTS equipment_notify_delete ON public."Equipment";
+CREATE TRIGGER equipment_notify_delete AFTER DELETE ON public."Equipment"
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.notify_catalog_delete();
+
+DROP TRIGGER IF EXISTS equipment_notify_truncate ON public."Equipment";
+CREATE TRIGGER equipment_notify_truncate AFTER TRUNCATE ON public."Equipment"
+    FOR EACH STATEMENT EXECUTE FUNCTION public.notify_catalog_truncate();
+
+DROP TRIGGER IF EXISTS product_notify_update ON public."Product";
+CREATE TRIGGER product_notify_update AFTER UPDATE ON public."Product"
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.notify_catalog_update();
+
+DROP TRIGGER IF EXISTS product_notify_delete ON public."Product";
+CREATE TRIGGER product_notify_delete AFTER DELETE ON public."Product"
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.notify_catalog_delete();
+
+DROP TRIGGER IF EXISTS product_notify_truncate ON public."Product";
+CREATE TRIGGER product_notify_truncate AFTER TRUNCATE ON public."Product"
+    FOR EACH STATEMENT EXECUTE FUNCTION public.notify_catalog_truncate();
@@ -0,0 +1,63 @@
+-- Columnas tipadas para los campos calientes del documento: deleted, created_at y
+-- modified_at en las dos tablas, más price y category en Product. Las mantiene un
+-- trigger BEFORE INSERT OR UPDATE a partir de `data`, que sigue siendo la fuente de
+-- verdad: ningún código escribe estas columnas directamente.
+--
+-- Con columnas tipadas el filtro de activos es un boolean, los listados se ordenan
+-- por instante (el texto ISO ordena mal si createdAt mezcla offsets, p. ej. con
+-- horario de verano) y los precios se comparan como numeric.
+--
+-- Las columnas se agregan sin default, así el ALTER no reescribe la tabla. Las filas
+-- existentes quedan en NULL hasta que las completa `python -m src.data_access.backfill`
+-- en lotes cortos; recién entonces se activa TYPED_COLUMNS=1 (ver queries.py). Los
+-- índices se crean en 0009 (CONCURRENTLY).
+
+-- El ALTER necesita un lock exclusivo breve: mejor fallar que hacer cola detrás de una
+-- transacción larga y bloquear a todos los que lleguen después
+SET LOCAL lock_timeout = '5s';
+
+ALTER TABLE public."Equipment"
+    ADD COLUMN IF NOT EXISTS deleted BOOLEAN,
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS modified_at TIMESTAMPTZ;
+
+ALTER TABLE public."Product"
+    ADD COLUMN IF NOT EXISTS deleted BOOLEAN,
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS modified_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS price NUMERIC,
+    ADD COLUMN IF NOT EXISTS category TEXT;
+
+CREATE OR REPLACE FUNCTION public.sync_typed_columns() RETURNS trigger AS $$
+BEGIN
+    NEW.deleted := (NEW.data->>'deleted')::boolean;
+    NEW.created_at := (NEW.data->>'createdAt')::timestamptz;
+    NEW.modified_at := (NEW.data->>'modifiedAt')::timestamptz;
+    IF TG_TABLE_NAME = 'Product' THEN
+        NEW.price := (NEW.data->>'price')::numeric;
+        NEW.category := NEW.data->>'category';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS equipment_typed_columns ON public."Equipment";
+CREATE TRIGGER equipment_typed_columns BEFORE INSERT OR UPDATE ON public."Equipment"
+    FOR EACH ROW EXECUTE FUNCTION public.sync_typed_columns();
+
+DROP TRIGGER IF EXISTS product_typed_columns ON public."Product";
+CREATE TRIGGER product_typed_columns BEFORE INSERT OR UPDATE ON public."Product"
+    FOR EACH ROW EXECUTE FUNCTION public.sync_typed_columns();
+
+-- Un UPDATE que no cambia `data` (como los del backfill) no es un cambio para el feed:
+-- conserva su change_seq en vez de reenviarse a todos los clientes de /changes
+CREATE OR REPLACE FUNCTION public.assign_change_seq() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.data IS NOT DISTINCT FROM OLD.data THEN
+        RETURN NEW;
+    END IF;
+    PERFORM pg_advisory_xact_lock_shared(TG_ARGV[1]::bigint);
+    NEW.change_seq := nextval(TG_ARGV[0]::regclass);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
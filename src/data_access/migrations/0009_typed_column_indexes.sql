@@ -0,0 +1,19 @@
+-- migrate:no-transaction
+-- Índices sobre las columnas tipadas de 0008, equivalentes a los *_live_created_idx de
+-- 0002 pero con un timestamptz de 8 bytes en lugar del texto ISO de createdAt. Se usan
+-- con TYPED_COLUMNS=1 (queries.LIVE_FILTER = "deleted = false").
+--
+-- Mientras el backfill no terminó, las filas viejas (deleted NULL) no entran al índice
+-- parcial; se agregan a medida que el backfill las completa.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS equipment_live_created_at_idx
+    ON public."Equipment" (created_at, id)
+    WHERE deleted = false;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_live_created_at_idx
+    ON public."Product" (created_at, id)
+    WHERE deleted = false;
+
+ANALYZE public."Equipment";
+
+ANALYZE public."Product";
@@ -0,0 +1,22 @@
+-- Archivo de registros eliminados. Los soft deletes más viejos que la ventana de
+-- retención se mueven de "Equipment"/"Product" a estas tablas (ver archiver.py), así
+-- las tablas calientes y sus índices crecen con el inventario activo y no con el
+-- histórico de bajas. Ninguna lectura de la API consulta el archivo; solo la
+-- restauración (restore_equipment/restore_product) y el purgado.
+--
+-- archived_at indica cuándo se movió cada registro (lo usa el purgado).
+
+CREATE TABLE IF NOT EXISTS public.equipment_archive (
+    id UUID PRIMARY KEY,
+    data JSONB NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS public.product_archive (
+    id UUID PRIMARY KEY,
+    data JSONB NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS equipment_archive_archived_at_idx ON public.equipment_archive (archived_at);
+CREATE INDEX IF NOT EXISTS product_archive_archived_at_idx ON public.product_archive (archived_at);
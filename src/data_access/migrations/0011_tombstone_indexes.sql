@@ -0,0 +1,13 @@
+-- migrate:no-transaction
+-- Índices parciales sobre los registros eliminados, ordenados por cuándo se eliminaron
+-- (modified_at de las columnas tipadas de 0008). El archivador toma de acá cada lote
+-- sin recorrer las filas activas. Las bajas anteriores a 0008 entran a medida que las
+-- completa el backfill.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS equipment_tombstones_idx
+    ON public."Equipment" (modified_at)
+    WHERE deleted = true;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_tombstones_idx
+    ON public."Product" (modified_at)
+    WHERE deleted = true;
@@ -0,0 +1,205 @@
+import os
+import re
+import sys
+from src.data_access.db_connector import db_connector
+from src.utils import logger
+
+log = logger('Migrator')
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d{4})_([a-z0-9_]+)\.sql$')
+NO_TRANSACTION_MARKER = '-- migrate:no-transaction'
+
+# Llave del advisory lock que evita que dos despliegues migren a la vez
+MIGRATION_LOCK_KEY = 72_031_001
+
+# Un CREATE INDEX CONCURRENTLY que falla (o se corta) deja el índice creado pero INVALID;
+# con IF NOT EXISTS el siguiente intento lo daría por bueno. Captura (índice, tabla).
+CONCURRENT_INDEX = re.compile(
+    r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(?:ONLY\s+)?([\w."]+)',
+    re.IGNORECASE
+)
+INDEX_VALIDITY_QUERY = """
+    SELECT i.indexrelid::regclass::text, i.indisvalid
+    FROM pg_catalog.pg_index i
+    JOIN pg_catalog.pg_class c ON c.oid = i.indexrelid
+    WHERE i.indrelid = %s::regclass AND c.relname = %s
+"""
+
+
+class Migration:
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def read(self):
+        with open(self.path, encoding='utf-8') as sql_file:
+            return sql_file.read()
+
+    @property
+    def transactional(self):
+        return not self.read().lstrip().startswith(NO_TRANSACTION_MARKER)
+
+
+class Migrator:
+    """
+    Aplica en orden los archivos `NNNN_nombre.sql` de `migrations/` y registra cada
+    versión aplicada en `public.schema_migrations`.
+
+    Las migraciones normales corren en una sola transacción. Las que empiezan con
+    `-- migrate:no-transaction` (p. ej. CREATE INDEX CONCURRENTLY) corren en autocommit,
+    una sentencia a la vez; en esos archivos cada sentencia debe terminar en `;` al
+    final de la línea y no pueden usar bloques $$ ... $$. Antes de cada CREATE INDEX
+    CONCURRENTLY se borra el índice si quedó INVALID de un intento anterior, y después
+    se verifica que haya quedado válido.
+    """
+
+    def __init__(self, migrations_dir=MIGRATIONS_DIR):
+        self.db = db_connector
+        self.migrations_dir = migrations_dir
+
+    def discover(self):
+        migrations = []
+        for file_name in sorted(os.listdir(self.migrations_dir)):
+            match = MIGRATION_FILE.match(file_name)
+            if match:
+                migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(self.migrations_dir, file_name)))
+        versions = [migration.version for migration in migrations]
+        if len(versions) != len(set(versions)):
+            raise ValueError("Hay dos migraciones con el mismo número de versión.")
+        return migrations
+
+    def applied_versions(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS public.schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """)
+            cursor.execute("SELECT version FROM public.schema_migrations")
+            versions = {row[0] for row in cursor.fetchall()}
+        connection.commit()
+        return versions
+
+    def status(self):
+        with self.db.connection() as connection:
+            applied = self.applied_versions(connection)
+        return [
+            {"version": migration.version, "name": migration.name, "applied": migration.version in applied}
+            for migration in self.discover()
+        ]
+
+    def migrate(self, target=None):
+        """Aplica las migraciones pendientes (hasta `target` si se indica). Devuelve las versiones aplicadas."""
+        applied_now = []
+        with self.db.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+            connection.commit()
+            try:
+                applied = self.applied_versions(connection)
+                for migration in self.discover():
+                    if migration.version in applied:
+                        continue
+                    if target is not None and migration.version > target:
+                        break
+                    self._apply(connection, migration)
+                    applied_now.append(migration.version)
+            finally:
+                connection.autocommit = False
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+                connection.commit()
+
+        if applied_now:
+            log.info(f"✅ Migraciones aplicadas: {applied_now}")
+        else:
+            log.info("✅ El esquema ya está al día.")
+        return applied_now
+
+    def _apply(self, connection, migration):
+        log.info(f"⏳ Aplicando migración {migration.version:04d}_{migration.name}")
+        sql = migration.read()
+        register = "INSERT INTO public.schema_migrations (version, name) VALUES (%s, %s)"
+        try:
+            if migration.transactional:
+                with connection.cursor() as cursor:
+                    cursor.execute(sql)
+                    cursor.execute(register, (migration.version, migration.name))
+                connection.commit()
+            else:
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    for statement in split_statements(sql):
+                        index = CONCURRENT_INDEX.match(statement)
+                        if index:
+                            self._drop_invalid_index(cursor, *index.groups())
+                        cursor.execute(statement)
+                        if index:
+                            self._check_index(cursor, *index.groups())
+                    cursor.execute(register, (migration.version, migration.name))
+                connection.autocommit = False
+        except Exception as e:
+            if not connection.autocommit:
+                connection.rollback()
+            connection.autocommit = False
+            log.error(f"❌ Error al aplicar la migración {migration.version:04d}_{migration.name}: ", e)
+            raise
+
+    def _drop_invalid_index(self, cursor, index_name, table):
+        cursor.execute(INDEX_VALIDITY_QUERY, (table, index_name))
+        row = cursor.fetchone()
+        if row is not None and not row[1]:
+            log.warning(f"⚠️ El índice {row[0]} quedó INVALID de un intento anterior; se vuelve a crear.")
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {row[0]}")
+
+    def _check_index(self, cursor, index_name, table):
+        cursor.execute(INDEX_VALIDITY_QUERY, (table, index_name))
+        row = cursor.fetchone()
+        if row is None or not row[1]:
+            raise RuntimeError(f"El índice {index_name} sobre {table} no quedó válido después de crearlo.")
+
+
+def split_statements(sql):
+    """Separa un script simple en sentencias (cada una termina en `;` al final de una línea)."""
+    statements = []
+    current = []
+    for line in sql.splitlines():
+        if line.strip().startswith('--') and not current:
+            continue
+        current.append(line)
+        if line.rstrip().endswith(';'):
+            statement = '\n'.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+    if '\n'.join(current).strip():
+        statements.append('\n'.join(current).strip())
+    return statements
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'migrate'
+    migrator = Migrator()
+    if command == 'migrate':
+        target = int(argv[2]) if len(argv) > 2 else None
+        migrator.migrate(target)
+    elif command == 'status':
+        for item in migrator.status():
+            mark = 'x' if item['applied'] else ' '
+            print(f"[{mark}] {item['version']:04d}_{item['name']}")
+    elif command == 'check':
+        from src.data_access.plan_check import check_hot_queries
+        failures = check_hot_queries()
+        return 1 if failures else 0
+    else:
+        print("Uso: python -m src.data_access.migrator [migrate [versión] | status | check]")
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
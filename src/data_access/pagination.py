@@ -0,0 +1,82 @@
+import json
+import base64
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_ITERSIZE = 500
+
+
+def encode_token(created_at, entity_id):
+    """Codifica la posición (createdAt, id) del último elemento de una página en un token opaco."""
+    raw = json.dumps([created_at, str(entity_id)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        position, entity_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError("Token de paginación inválido.")
+    if not isinstance(entity_id, str):
+        raise ValueError("Token de paginación inválido.")
+    return position, entity_id
+
+
+def decode_token(token):
+    """Devuelve la tupla (createdAt, id) contenida en un token generado por encode_token."""
+    created_at, entity_id = _decode(token)
+    if not isinstance(created_at, str):
+        raise ValueError("Token de paginación inválido.")
+    return created_at, entity_id
+
+
+def encode_search_token(rank, entity_id):
+    """Token de la siguiente página de una búsqueda: posición (rank, id) del último resultado."""
+    raw = json.dumps([rank, str(entity_id)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_search_token(token):
+    """Devuelve la tupla (rank, id) contenida en un token generado por encode_search_token."""
+    rank, entity_id = _decode(token)
+    if isinstance(rank, bool) or not isinstance(rank, (int, float)):
+        raise ValueError("Token de paginación inválido.")
+    return float(rank), entity_id
+
+
+def normalize_limit(limit):
+    """Acota el tamaño de página a [1, MAX_PAGE_SIZE]."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("El parámetro 'limit' debe ser un número entero.")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+MAX_SEARCH_LENGTH = 200
+
+
+def normalize_search_term(term):
+    """Quita espacios de los extremos y valida el término de búsqueda."""
+    term = (term or '').strip()
+    if not term:
+        raise ValueError("El parámetro 'q' es requerido.")
+    if len(term) > MAX_SEARCH_LENGTH:
+        raise ValueError(f"El parámetro 'q' admite como máximo {MAX_SEARCH_LENGTH} caracteres.")
+    return term
+
+
+def normalize_change_cursor(cursor):
+    """Cursor del feed de cambios: entero >= 0, o None para pedir solo la posición actual."""
+    if cursor is None or cursor == '':
+        return None
+    try:
+        cursor = int(cursor)
+    except (TypeError, ValueError):
+        raise ValueError("El parámetro 'cursor' debe ser un número entero.")
+    if cursor < 0:
+        raise ValueError("El parámetro 'cursor' debe ser mayor o igual a 0.")
+    return cursor
@@ -0,0 +1,73 @@
+import sys
+import json
+import uuid
+from src.data_access.db_connector import db_connector
+from src.data_access.queries import by_id_query, by_ids_query, changes_query, list_query, search_query
+from src.utils import logger
+
+log = logger('Plan_Check')
+
+TABLES = ("Equipment", "Product")
+
+
+def hot_queries(table):
+    """Consultas calientes de cada tabla con parámetros representativos: (nombre, sql, params, ordenada)."""
+    sample_id = str(uuid.uuid4())
+    return [
+        (f"{table}.list_first_page", list_query(table), [50], True),
+        (f"{table}.list_next_page", list_query(table, keyset=True), ["2024-01-01T00:00:00+00:00", sample_id, 50], True),
+        (f"{table}.list_filtered", list_query(table, contains=True), [json.dumps({"createdBy": "plan_check"}), 50], False),
+        (f"{table}.by_id", by_id_query(table), [sample_id], False),
+        (f"{table}.by_ids", by_ids_query(table), [[sample_id, str(uuid.uuid4())]], False),
+        (f"{table}.search", search_query(table), ["plan check"] * 3 + [50], False),
+        (f"{table}.search_next_page", search_query(table, keyset=True), ["plan check"] * 3 + [0.5, sample_id, 50], False),
+        (f"{table}.changes", changes_query(table), [0, 1000, 50], True),
+    ]
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(cursor, query, params):
+    cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+    document = cursor.fetchone()[0]
+    if isinstance(document, str):
+        document = json.loads(document)
+    return document[0]["Plan"]
+
+
+def check_hot_queries(tables=TABLES):
+    """
+    Corre EXPLAIN sobre las consultas calientes y devuelve la lista de fallas.
+
+    Con `enable_seqscan = off` el planificador solo elige un Seq Scan cuando no hay
+    ningún índice utilizable, así que la verificación no depende de cuántas filas
+    tenga la tabla. En los listados ordenados también se rechaza un nodo Sort, porque
+    significa que el índice no cubre el ORDER BY.
+    """
+    failures = []
+    with db_connector.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            for table in tables:
+                for name, query, params, ordered in hot_queries(table):
+                    plan = explain(cursor, query, params)
+                    node_types = [node["Node Type"] for node in plan_nodes(plan)]
+                    if "Seq Scan" in node_types:
+                        failures.append((name, "Seq Scan"))
+                    elif ordered and "Sort" in node_types:
+                        failures.append((name, "Sort"))
+                    else:
+                        log.info(f"✅ {name}: {' > '.join(node_types)}")
+        connection.rollback()
+
+    for name, reason in failures:
+        log.error(f"❌ {name} no usa índice ({reason})")
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if check_hot_queries() else 0)
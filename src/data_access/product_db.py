@@ -1,198 +1,602 @@
+import time
 import psycopg2.extras
 from src.data_access.db_connector import db_connector
+from src.data_access.entity_cache import product_cache
+from src.data_access.errors import NotFoundError, PreconditionFailedError, QueueFullError
+from src.data_access.ids import normalize_ids
+from src.data_access import write_batcher
+from src.data_access.pagination import (
+    DEFAULT_ITERSIZE, decode_search_token, decode_token, encode_search_token, encode_token, normalize_change_cursor,
+    normalize_limit, normalize_search_term,
+)
+from src.data_access.queries import (
+    CHANGE_LOCK_KEYS, CHANGE_WRITERS_QUERY, CHANGES_POLL_MS, CHANGES_WAIT_MS,
+    RAW_COLUMNS, ROW_COLUMNS, VERSION_COLUMNS, by_id_query, by_ids_query, changes_query, list_query,
+    restore_from_archive_query, search_query, undelete_query, watermark_query,
+)
 from src.entities import Product
-from src.utils import logger
+from src.utils import etags, logger, metrics, time_helper
 
 log = logger('Product_DB')
 
 class ProductDB:
+    # Filas por INSERT multi-fila en las cargas masivas
+    BULK_CHUNK_SIZE = 1000
+    # Campos por los que se puede filtrar un listado
+    FILTERABLE_FIELDS = ('category', 'createdBy')
+    # Campos que el cliente puede modificar con update
+    UPDATABLE_FIELDS = ('name', 'price', 'description', 'category')
+
     def __init__(self):
+        # Las conexiones se piden prestadas al pool compartido en cada operación
         self.db = db_connector
-        self.connection = None
+        # Caché LRU/TTL compartida por todas las instancias del proceso
+        self.cache = product_cache
+        # Con WRITE_BATCHING=1 las altas individuales comparten transacción (ver write_batcher.py)
+        self.batcher = write_batcher.product_batcher if write_batcher.ENABLED else None
 
-    def get_connection(self):
-        if not self.connection:
-            self.connection = self.db.get_connection()
-        return self.connection
+    def _build_product(self, row):
+        # Filas de cursores de tuplas: (id, data)
+        return Product.from_row(row[0], row[1])
 
-    def close_connection(self):
-        if self.connection:
-            self.db.close_connection()
-            self.connection = None
+    def _cache_row(self, row, version=None):
+        # `version` es self.cache.version tomado antes de la consulta (ver EntityCache.version)
+        entity_id = str(row[0])
+        self.cache.set(entity_id, (entity_id, row[1]), version=version)
 
-    def create_product(self, product_data):
+    def _filters_document(self, filters):
+        # Los filtros se mandan como un documento para `data @> %s`, que resuelve el índice GIN
+        if not filters:
+            return None
+        unknown = [field for field in filters if field not in self.FILTERABLE_FIELDS]
+        if unknown:
+            raise ValueError(f"No se puede filtrar por: {', '.join(unknown)}")
+        return dict(filters)
+
+    def _page_query(self, limit, after, filters, columns=ROW_COLUMNS):
+        # Devuelve (limit, sql, params) de una página; la consulta pide limit + 1 filas
+        # para saber si hay una página siguiente
+        limit = normalize_limit(limit)
+        contains = self._filters_document(filters)
+        params = []
+        if contains:
+            params.append(contains)
+        if after:
+            created_at, last_id = decode_token(after)
+            params.extend([created_at, last_id])
+        params.append(limit + 1)
+        query = list_query("Product", keyset=bool(after), contains=bool(contains), columns=columns)
+        return limit, query, params
+
+    def _search_query(self, term, limit, after):
+        # Igual que _page_query: (limit, sql, params) pidiendo limit + 1 filas
+        term = normalize_search_term(term)
+        limit = normalize_limit(limit)
+        params = [term, term, term]
+        if after:
+            rank, last_id = decode_search_token(after)
+            params.extend([rank, last_id])
+        params.append(limit + 1)
+        return limit, search_query("Product", keyset=bool(after)), params
+
+    def _check_version(self, cursor, product_id, if_match):
+        # Bloquea la fila hasta el commit para que nadie la cambie entre la comparación y el UPDATE
+        cursor.execute(by_id_query("Product", columns=VERSION_COLUMNS) + " FOR UPDATE", (product_id,))
+        current = cursor.fetchone()
+        if current is None:
+            raise NotFoundError(f"Producto con ID {product_id} no encontrado")
+        if not etags.match(if_match, etags.entity_etag(current[0], current[1])):
+            raise PreconditionFailedError(f"El producto {product_id} cambió desde que se leyó (If-Match no coincide).")
+
+    def _new_product(self, product_data):
+        # Construir la entidad valida los datos recibidos
+        return Product(
+            name=product_data.get('name'),
+            price=product_data.get('price'),
+            description=product_data.get('description', ''),
+            category=product_data.get('category', 'General'),
+            createdBy=product_data.get('createdBy')
+        )
+
+    def _insert_batched(self, product):
+        # Espera el commit del lote en el que quedó la fila; el error es el de esa fila
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            product = Product(
-                name=product_data.get('name'),
-                price=product_data.get('price'),
-                description=product_data.get('description', ''),
-                category=product_data.get('category', 'General'),
-                createdBy=product_data.get('createdBy')
-            )
-            
-            query = """
-                INSERT INTO public."Product" (id, data)
-                VALUES (%s, %s)
-                RETURNING id
-            """
-            
-            cursor.execute(query, (product.get_id(), product.get_data()))
-            connection.commit()
-            
-            log.info(f"✅ Producto creado exitosamente con ID: {product.get_id()}")
-            return product.get_id()
-            
+            with metrics.span('batch_wait'):
+                self.batcher.insert(product.get_id(), product.get_data())
+        except QueueFullError:
+            log.warning("⚠️ Cola de escrituras llena al crear producto")
+            raise
         except Exception as e:
-            if connection:
-                connection.rollback()
             log.error(f"❌ Error al crear producto: ", e)
             raise
-        finally:
-            if cursor:
-                cursor.close()
+
+    def create_product(self, product_data):
+        product = self._new_product(product_data)
+
+        query = """
+            INSERT INTO public."Product" (id, data)
+            VALUES (%s, %s)
+            RETURNING id
+        """
+
+        if self.batcher is not None:
+            self._insert_batched(product)
+        else:
+            with self.db.connection() as connection:
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute(query, (product.get_id(), product.get_data()))
+                    connection.commit()
+                except Exception as e:
+                    connection.rollback()
+                    log.error(f"❌ Error al crear producto: ", e)
+                    raise
+
+        self.cache.set(str(product.get_id()), (str(product.get_id()), product.get_data()))
+        log.info(f"✅ Producto creado exitosamente con ID: {product.get_id()}")
+        return product.get_id()
+
+    def create_products_bulk(self, items, chunk_size=None):
+        """
+        Crea muchos registros en una sola transacción.
+
+        Cada elemento se valida con el constructor de Product; los inválidos se reportan
+        y no detienen la carga. Los válidos se insertan en bloques de `chunk_size`
+        filas con un INSERT multi-fila (execute_values) y se hace un único commit.
+
+        Returns:
+            dict: {"created": [ids], "failed": [{"index": i, "error": mensaje}]}
+        """
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        query = 'INSERT INTO public."Product" (id, data) VALUES %s'
+        created = []
+        failed = []
+
+        with self.db.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    chunk = []
+                    for index, product_data in enumerate(items):
+                        try:
+                            product = self._new_product(product_data)
+                        except (ValueError, TypeError, AttributeError) as e:
+                            failed.append({"index": index, "error": str(e)})
+                            continue
+                        chunk.append((product.get_id(), product.get_data()))
+                        if len(chunk) >= chunk_size:
+                            psycopg2.extras.execute_values(cursor, query, chunk, page_size=chunk_size)
+                            created.extend(row[0] for row in chunk)
+                            chunk = []
+                    if chunk:
+                        psycopg2.extras.execute_values(cursor, query, chunk, page_size=chunk_size)
+                        created.extend(row[0] for row in chunk)
+                connection.commit()
+                # Los IDs son nuevos, no hay nada que invalidar; tampoco se precargan
+                # para que una carga masiva no desplace de la caché a los registros calientes
+            except Exception as e:
+                connection.rollback()
+                log.error(f"❌ Error en la carga masiva de productos: ", e)
+                raise
+
+        log.info(f"✅ Carga masiva: {len(created)} productos creados, {len(failed)} con errores")
+        return {"created": created, "failed": failed}
 
     def get_product_by_id(self, product_id):
+        cached = self.cache.get(str(product_id))
+        if cached is not None:
+            log.debug("✅ Producto encontrado en caché con ID: %s", product_id)
+            return self._build_product(cached)
+        version = self.cache.version
+
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(cursor_factory=psycopg2.extras.DictCursor)
-            
-            query = 'SELECT id, data FROM public."Product" WHERE id = %s'
-            cursor.execute(query, (product_id,))
-            result = cursor.fetchone()
-            
-            if result:
-                data = result['data']
-                product = Product(
-                    id=result['id'],
-                    name=data['name'],
-                    price=data['price'],
-                    description=data['description'],
-                    category=data['category'],
-                    createdBy=data['createdBy'],
-                    createdAt=data['createdAt'],
-                    modifiedAt=data['modifiedAt'],
-                    deleted=data['deleted']
-                )
-                log.debug(f"✅ Producto encontrado con ID: {product_id}")
-                return product
-            else:
-                log.warning(f"⚠️ No se encontró producto con ID: {product_id}")
-                return None
-                
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    query = by_id_query("Product")
+                    cursor.execute(query, (product_id,))
+                    result = cursor.fetchone()
         except Exception as e:
             log.error(f"❌ Error al obtener producto por ID: ", e)
             raise
-        finally:
-            if cursor:
-                cursor.close()
 
-    def get_all_products(self):
+        if result:
+            self._cache_row(result, version)
+            product = self._build_product(result)
+            log.debug("✅ Producto encontrado con ID: %s", product_id)
+            return product
+        else:
+            log.warning(f"⚠️ No se encontró producto con ID: {product_id}")
+            return None
+
+    def get_products_by_ids(self, ids):
+        """
+        Obtiene varios registros por ID en una sola consulta (`id = ANY(...)`).
+
+        Args:
+            ids (iterable): IDs a buscar; los repetidos se consultan una sola vez
+
+        Returns:
+            tuple: (dict {id: Product}, lista de IDs no encontrados o inválidos)
+        """
+        wanted, missing = normalize_ids(ids)
+
+        # Primero la caché; solo los que falten van a la base de datos
+        found = {}
+        pending = []
+        for entity_id in wanted:
+            cached = self.cache.get(entity_id)
+            if cached is not None:
+                found[entity_id] = self._build_product(cached)
+            else:
+                pending.append(entity_id)
+        if not pending:
+            return found, missing
+        version = self.cache.version
+
+        query = by_ids_query("Product")
+
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(cursor_factory=psycopg2.extras.DictCursor)
-            
-            query = 'SELECT id, data FROM public."Product" WHERE data->>\'deleted\' = \'false\' ORDER BY data->>\'createdAt\' DESC'
-            cursor.execute(query)
-            results = cursor.fetchall()
-            
-            product_list = []
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, (pending,))
+                    results = cursor.fetchall()
+        except Exception as e:
+            log.error(f"❌ Error al obtener productos por IDs: ", e)
+            raise
+
+        with metrics.span('hydrate'):
             for result in results:
-                data = result['data']
-                product = Product(
-                    id=result['id'],
-                    name=data['name'],
-                    price=data['price'],
-                    description=data['description'],
-                    category=data['category'],
-                    createdBy=data['createdBy'],
-                    createdAt=data['createdAt'],
-                    modifiedAt=data['modifiedAt'],
-                    deleted=data['deleted']
-                )
-                product_list.append(product)
-            
-            log.debug(f"✅ Se encontraron {len(product_list)} productos")
-            return product_list
-            
+                self._cache_row(result, version)
+                found[str(result[0])] = self._build_product(result)
+        missing.extend(entity_id for entity_id in pending if entity_id not in found)
+
+        log.debug("✅ Se encontraron %s de %s productos solicitados", len(found), len(wanted))
+        return found, missing
+
+    def get_all_products(self):
+        product_list = list(self.iter_products())
+        log.debug("✅ Se encontraron %s productos", len(product_list))
+        return product_list
+
+    def get_products_page(self, limit=None, after=None, filters=None):
+        """
+        Devuelve una página de productos activos ordenados por (createdAt, id) descendente.
+
+        Args:
+            limit (int): Tamaño de página (se acota a MAX_PAGE_SIZE)
+            after (str): Token opaco devuelto por la página anterior
+            filters (dict): Igualdad exacta sobre FILTERABLE_FIELDS (se resuelve con el índice GIN)
+
+        Returns:
+            tuple: (lista de Product, token de la siguiente página o None)
+        """
+        limit, query, params = self._page_query(limit, after, filters)
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
         except Exception as e:
-            log.error(f"❌ Error al obtener todos los productos: ", e)
+            log.error(f"❌ Error al obtener página de productos: ", e)
             raise
-        finally:
-            if cursor:
-                cursor.close()
 
-    def update_product(self, product_id, product_data):
+        with metrics.span('hydrate'):
+            items = [self._build_product(result) for result in results[:limit]]
+        next_token = None
+        if len(results) > limit:
+            last = items[-1]
+            next_token = encode_token(last.createdAt, last.id)
+
+        log.debug("✅ Página con %s productos", len(items))
+        return items, next_token
+
+    def get_products_page_raw(self, limit=None, after=None, filters=None):
+        """
+        Como get_products_page, pero sin decodificar el JSONB ni hidratar entidades.
+
+        Returns:
+            tuple: (lista de (id, modifiedAt, documento JSON en texto), token de la siguiente página o None)
+        """
+        limit, query, params = self._page_query(limit, after, filters, columns=RAW_COLUMNS)
+
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            # Obtener producto existente
-            existing_product = self.get_product_by_id(product_id)
-            if not existing_product:
-                raise ValueError(f"Producto con ID {product_id} no encontrado")
-            
-            # Actualizar datos
-            existing_product.name = product_data.get('name', existing_product.name)
-            existing_product.price = product_data.get('price', existing_product.price)
-            existing_product.description = product_data.get('description', existing_product.description)
-            existing_product.category = product_data.get('category', existing_product.category)
-            existing_product.modifiedAt = existing_product.modifiedAt
-            
-            query = """
-                UPDATE public."Product"
-                SET data = %s
-                WHERE id = %s
-            """
-            
-            cursor.execute(query, (existing_product.get_data(), product_id))
-            connection.commit()
-            
-            log.info(f"✅ Producto actualizado exitosamente con ID: {product_id}")
-            return product_id
-            
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
         except Exception as e:
-            if connection:
-                connection.rollback()
-            log.error(f"❌ Error al actualizar producto: ", e)
+            log.error("❌ Error al obtener página de productos: ", e)
             raise
-        finally:
-            if cursor:
-                cursor.close()
 
-    def delete_product(self, product_id):
+        next_token = None
+        if len(results) > limit:
+            last = results[limit - 1]
+            next_token = encode_token(last[2], last[0])
+        return [(str(row[0]), row[1], row[3]) for row in results[:limit]], next_token
+
+    def get_product_version(self, product_id):
+        """
+        Devuelve (id, modifiedAt) de un registro sin traer el documento, o None si no existe.
+
+        Alcanza para calcular su ETag y contestar un If-None-Match con 304; si el
+        registro está en caché ni siquiera se consulta la base.
+        """
+        cached = self.cache.get(str(product_id))
+        if cached is not None:
+            return cached[0], cached[1].get('modifiedAt')
+
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            # Obtener producto existente
-            existing_product = self.get_product_by_id(product_id)
-            if not existing_product:
-                raise ValueError(f"Producto con ID {product_id} no encontrado")
-            
-            # Marcar como eliminado
-            existing_product.deleted = True
-            existing_product.modifiedAt = existing_product.modifiedAt
-            
-            query = """
-                UPDATE public."Product"
-                SET data = %s
-                WHERE id = %s
-            """
-            
-            cursor.execute(query, (existing_product.get_data(), product_id))
-            connection.commit()
-            
-            log.info(f"✅ Producto eliminado (marcado como eliminado) con ID: {product_id}")
-            return product_id
-            
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(by_id_query("Product", columns=VERSION_COLUMNS), (product_id,))
+                    result = cursor.fetchone()
         except Exception as e:
-            if connection:
-                connection.rollback()
-            log.error(f"❌ Error al eliminar producto: ", e)
+            log.error("❌ Error al obtener versión del producto: ", e)
             raise
-        finally:
-            if cursor:
-                cursor.close()
\ No newline at end of file
+        return (str(result[0]), result[1]) if result else None
+
+    def get_products_page_versions(self, limit=None, after=None, filters=None):
+        """
+        Versión de la página que devolvería get_products_page con los mismos argumentos.
+
+        Misma consulta e índice, pero solo lee (id, modifiedAt): no hidrata entidades.
+
+        Returns:
+            tuple: (lista de (id, modifiedAt), True si hay una página siguiente)
+        """
+        limit, query, params = self._page_query(limit, after, filters, columns=VERSION_COLUMNS)
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
+        except Exception as e:
+            log.error("❌ Error al obtener versiones de productos: ", e)
+            raise
+
+        return [(str(row[0]), row[1]) for row in results[:limit]], len(results) > limit
+
+    def search_products(self, term, limit=None, after=None):
+        """
+        Busca productos activos por nombre, descripción o categoría.
+
+        Combina texto completo en español (admite "frases", OR y -exclusiones) con
+        coincidencia aproximada por trigramas, así que tolera errores de tipeo. Los
+        resultados vienen ordenados por relevancia y paginados con keyset sobre (rank, id).
+
+        Args:
+            term (str): Texto a buscar
+            limit (int): Tamaño de página (se acota a MAX_PAGE_SIZE)
+            after (str): Token opaco devuelto por la página anterior de la misma búsqueda
+
+        Returns:
+            tuple: (lista de Product en orden de relevancia, token de la siguiente página o None)
+        """
+        limit, query, params = self._search_query(term, limit, after)
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
+        except Exception as e:
+            log.error("❌ Error al buscar productos: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            items = [self._build_product(result) for result in results[:limit]]
+        next_token = None
+        if len(results) > limit:
+            last = results[limit - 1]
+            next_token = encode_search_token(last[2], last[0])
+
+        log.debug("✅ Búsqueda con %s productos", len(items))
+        return items, next_token
+
+    def iter_products(self, itersize=DEFAULT_ITERSIZE):
+        """
+        Recorre todos los productos activos con un cursor del lado del servidor.
+
+        Solo se mantienen `itersize` filas en memoria a la vez, así que el consumo
+        no depende del tamaño de la tabla. La conexión queda prestada mientras el
+        generador esté abierto.
+        """
+        query = list_query("Product", limit=False)
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor(name='iter_products') as cursor:
+                    cursor.itersize = itersize
+                    cursor.execute(query)
+                    for result in cursor:
+                        yield self._build_product(result)
+        except Exception as e:
+            log.error("❌ Error al obtener todos los productos: ", e)
+            raise
+
+    def _wait_for_writers(self, db_cursor):
+        """
+        Espera a que terminen las escrituras que tenían el lock compartido de la tabla
+        al leer el watermark: las únicas que pueden tener un change_seq menor o igual
+        todavía sin confirmar. Las que empiezan después no se esperan (ver
+        CHANGES_WAIT_MS en queries.py).
+
+        Returns:
+            bool: True si terminaron todas antes de CHANGES_WAIT_MS
+        """
+        key = CHANGE_LOCK_KEYS["Product"]
+        db_cursor.execute(CHANGE_WRITERS_QUERY, (key,))
+        pending = {row[0] for row in db_cursor.fetchall()}
+        deadline = time.monotonic() + CHANGES_WAIT_MS / 1000
+        while pending:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(CHANGES_POLL_MS / 1000)
+            db_cursor.execute(CHANGE_WRITERS_QUERY, (key,))
+            pending &= {row[0] for row in db_cursor.fetchall()}
+        return True
+
+    def changes_since(self, cursor=None, limit=None):
+        """
+        Productos creados, modificados o eliminados (soft delete) después de `cursor`.
+
+        El cursor es el change_seq que la base asigna en cada escritura, no el
+        modifiedAt. Antes de leer se espera a que terminen las escrituras que ya
+        tienen número (advisory lock de la tabla, ver migración 0005), así ningún
+        cambio queda atrás del cursor devuelto. Si alguna sigue abierta después de
+        CHANGES_WAIT_MS se devuelve el mismo cursor, sin cambios y con True: el
+        cliente reintenta más tarde. Sin cursor solo se devuelve la posición actual:
+        el cliente la guarda antes de su descarga inicial.
+
+        Args:
+            cursor (int): Cursor devuelto por la llamada anterior (None para empezar)
+            limit (int): Cambios máximos por llamada (se acota a MAX_PAGE_SIZE)
+
+        Returns:
+            tuple: (lista de Product en orden de cambio, incluidos los eliminados,
+                    cursor para la próxima llamada, True si hay que volver a llamar)
+        """
+        cursor = normalize_change_cursor(cursor)
+        limit = normalize_limit(limit)
+
+        try:
+            with self.db.connection() as connection:
+                with connection.cursor() as db_cursor:
+                    db_cursor.execute(watermark_query("Product"))
+                    watermark = db_cursor.fetchone()[0]
+                    settled = self._wait_for_writers(db_cursor)
+                    connection.commit()
+                    if not settled:
+                        log.debug("⚠️ Escrituras largas en curso; el feed de productos sigue en %s", cursor)
+                        return [], cursor, True
+                    if cursor is None or cursor >= watermark:
+                        return [], max(watermark, cursor or 0), False
+                    db_cursor.execute(changes_query("Product"), (cursor, watermark, limit + 1))
+                    results = db_cursor.fetchall()
+        except Exception as e:
+            log.error("❌ Error al obtener cambios de productos: ", e)
+            raise
+
+        with metrics.span('hydrate'):
+            items = [self._build_product(result) for result in results[:limit]]
+        has_more = len(results) > limit
+        next_cursor = results[limit - 1][2] if has_more else watermark
+
+        log.debug("✅ %s cambios de productos desde %s", len(items), cursor)
+        return items, next_cursor, has_more
+
+    def update_product(self, product_id, product_data, if_match=None):
+        """
+        Actualiza solo los campos recibidos en una sola sentencia.
+
+        PostgreSQL mezcla las llaves cambiadas sobre el JSONB actual (`data || cambios`),
+        así que no hay lectura previa ni se pisan cambios concurrentes a otros campos.
+        Con `if_match` (valor del header If-Match) primero se bloquea la fila y se
+        compara su ETag; si no coincide se lanza PreconditionFailedError.
+
+        Returns:
+            Product: El registro tal como quedó guardado
+        """
+        changes = {key: product_data[key] for key in self.UPDATABLE_FIELDS if key in product_data}
+        if 'name' in changes and not changes['name']:
+            raise ValueError("El nombre y el precio del producto son requeridos.")
+        if 'price' in changes:
+            if not changes['price']:
+                raise ValueError("El nombre y el precio del producto son requeridos.")
+            changes['price'] = float(changes['price'])
+        changes['modifiedAt'] = time_helper.now()
+        version = self.cache.version
+
+        query = """
+            UPDATE public."Product"
+            SET data = data || %s::jsonb
+            WHERE id = %s
+            RETURNING id, data
+        """
+
+        with self.db.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    if if_match is not None:
+                        self._check_version(cursor, product_id, if_match)
+                    cursor.execute(query, (changes, product_id))
+                    updated = cursor.rowcount
+                    result = cursor.fetchone()
+                connection.commit()
+            except (NotFoundError, PreconditionFailedError):
+                connection.rollback()
+                raise
+            except Exception as e:
+                connection.rollback()
+                log.error(f"❌ Error al actualizar producto: ", e)
+                raise
+
+        if updated == 0:
+            raise NotFoundError(f"Producto con ID {product_id} no encontrado")
+
+        self._cache_row(result, version)
+        log.info(f"✅ Producto actualizado exitosamente con ID: {product_id}")
+        return self._build_product(result)
+
+    def delete_product(self, product_id):
+        """Marca el registro como eliminado (soft delete) en una sola sentencia."""
+        changes = {"deleted": True, "modifiedAt": time_helper.now()}
+
+        query = """
+            UPDATE public."Product"
+            SET data = data || %s::jsonb
+            WHERE id = %s
+            RETURNING id
+        """
+
+        with self.db.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, (changes, product_id))
+                    deleted = cursor.rowcount
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                log.error(f"❌ Error al eliminar producto: ", e)
+                raise
+
+        self.cache.invalidate(str(product_id))
+        if deleted == 0:
+            raise NotFoundError(f"Producto con ID {product_id} no encontrado")
+
+        log.info(f"✅ Producto eliminado (marcado como eliminado) con ID: {product_id}")
+        return product_id
+
+    def restore_product(self, product_id):
+        """
+        Vuelve a activar un producto eliminado. Si sigue en la tabla se reactiva con un
+        UPDATE; si ya se archivó (ver archiver.py) se devuelve desde el archivo, en la
+        misma transacción.
+
+        Returns:
+            Product: El registro restaurado
+        """
+        changes = {"deleted": False, "modifiedAt": time_helper.now()}
+        version = self.cache.version
+
+        with self.db.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(undelete_query("Product"), (changes, product_id))
+                    result = cursor.fetchone()
+                    if result is None:
+                        cursor.execute(restore_from_archive_query("Product"), (product_id, changes))
+                        result = cursor.fetchone()
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                log.error(f"❌ Error al restaurar producto: ", e)
+                raise
+
+        if result is None:
+            raise NotFoundError(f"Producto eliminado con ID {product_id} no encontrado")
+
+        self._cache_row(result, version)
+        log.info(f"✅ Producto restaurado con ID: {product_id}")
+        return self._build_product(result)
@@ -0,0 +1,235 @@
+"""
+Fragmentos SQL compartidos por las clases de acceso a datos.
+
+Las expresiones tienen que coincidir textualmente con las de los índices de
+`migrations/0002_hot_path_indexes.sql`, `migrations/0003_search_indexes.sql` y
+`migrations/0009_typed_column_indexes.sql`; si no, PostgreSQL no puede usar el índice
+parcial y vuelve a un Seq Scan + Sort. `plan_check.py` verifica que así sea.
+"""
+import os
+
+# Con TYPED_COLUMNS=1 los listados filtran y ordenan por las columnas tipadas de la
+# migración 0008 en lugar de extraer texto del JSONB. Activarlo recién cuando
+# `python -m src.data_access.backfill check` no encuentra filas pendientes: las filas
+# sin completar tienen deleted NULL y no aparecerían en los listados.
+TYPED_COLUMNS = os.environ.get('TYPED_COLUMNS', '0') == '1'
+
+# Predicado del índice parcial *_live_created_idx (y de los índices de búsqueda)
+JSON_LIVE_FILTER = "(data->>'deleted') = 'false'"
+JSON_CREATED_AT = "(data->>'createdAt')"
+# Predicado y llave de orden del índice parcial *_live_created_at_idx
+TYPED_LIVE_FILTER = "deleted = false"
+TYPED_CREATED_AT = "created_at"
+
+# Filtro de registros activos y llave de orden de los listados
+LIVE_FILTER = TYPED_LIVE_FILTER if TYPED_COLUMNS else JSON_LIVE_FILTER
+CREATED_AT = TYPED_CREATED_AT if TYPED_COLUMNS else JSON_CREATED_AT
+# El token de página guarda createdAt como texto ISO; con columnas tipadas se convierte
+# (el ::text explícito hace que asyncpg mande el parámetro como texto)
+CREATED_AT_PARAM = "%s::text::timestamptz" if TYPED_COLUMNS else "%s"
+# Columnas por defecto y las que bastan para calcular ETags (sin traer el documento a Python)
+ROW_COLUMNS = "id, data"
+VERSION_COLUMNS = "id, (data->>'modifiedAt')"
+# El documento como texto (sin decodificarlo en Python) más lo necesario para ETag y token
+RAW_COLUMNS = "id, (data->>'modifiedAt'), (data->>'createdAt'), data::text"
+
+
+def list_query(table, keyset=False, contains=False, limit=True, columns=ROW_COLUMNS):
+    """
+    Construye el SELECT de los listados de registros activos.
+
+    Args:
+        table (str): "Equipment" o "Product"
+        keyset (bool): Agrega la condición `(createdAt, id) < (%s, %s)` para páginas siguientes
+        contains (bool): Agrega `data @> %s::jsonb` para filtrar por campos (usa el índice GIN)
+        limit (bool): Agrega `LIMIT %s`
+        columns (str): Columnas del SELECT (VERSION_COLUMNS para la consulta de versiones)
+
+    Los parámetros se pasan en este orden: filtro de contención, keyset, limit.
+    """
+    conditions = [LIVE_FILTER]
+    if contains:
+        conditions.append("data @> %s::jsonb")
+    if keyset:
+        conditions.append(f"({CREATED_AT}, id) < ({CREATED_AT_PARAM}, %s::uuid)")
+
+    query = f"""
+            SELECT {columns} FROM public."{table}"
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {CREATED_AT} DESC, id DESC
+        """
+    if limit:
+        query += "    LIMIT %s\n        "
+    return query
+
+
+def by_ids_query(table):
+    return f'SELECT id, data FROM public."{table}" WHERE id = ANY(%s::uuid[])'
+
+
+def by_id_query(table, columns=ROW_COLUMNS):
+    return f'SELECT {columns} FROM public."{table}" WHERE id = %s'
+
+
+# Campos de búsqueda de cada tabla: (campo, peso en el ranking, configuración de texto).
+# Los números de serie van con 'simple' para no aplicarles stemming.
+SEARCH_FIELDS = {
+    "Equipment": (("name", "A", "spanish"), ("location", "B", "spanish"), ("serial_number", "C", "simple")),
+    "Product": (("name", "A", "spanish"), ("description", "B", "spanish"), ("category", "C", "spanish")),
+}
+
+
+def search_vector(table):
+    """tsvector ponderado de los campos de búsqueda (expresión del índice *_search_tsv_idx)."""
+    parts = [
+        f"setweight(to_tsvector('{config}'::regconfig, coalesce(data->>'{field}', '')), '{weight}')"
+        for field, weight, config in SEARCH_FIELDS[table]
+    ]
+    return "(" + " || ".join(parts) + ")"
+
+
+def search_text(table):
+    """Campos de búsqueda concatenados (expresión del índice trigram *_search_trgm_idx)."""
+    parts = [f"coalesce(data->>'{field}', '')" for field, _, _ in SEARCH_FIELDS[table]]
+    return "(" + " || ' ' || ".join(parts) + ")"
+
+
+def search_query(table, keyset=False, columns=ROW_COLUMNS):
+    """
+    Búsqueda de texto completo con tolerancia a errores de tipeo sobre registros activos.
+
+    Filtra con JSON_LIVE_FILTER aun con TYPED_COLUMNS=1: es el predicado de los índices
+    de búsqueda de 0003.
+
+    Una fila coincide si el tsvector contiene la consulta (`websearch_to_tsquery`:
+    admite "frases", OR y -exclusiones) o si el término se parece a alguna palabra
+    de los campos (`<%` de pg_trgm). Cada condición usa su índice GIN y el planificador
+    las combina con un BitmapOr. El ranking suma ts_rank_cd y word_similarity.
+
+    Los parámetros se pasan en este orden: término (ranking), término (tsquery),
+    término (trigram), keyset (rank, id) y limit.
+    """
+    vector = search_vector(table)
+    text = search_text(table)
+    query = f"""
+            SELECT * FROM (
+                SELECT {columns},
+                       (ts_rank_cd({vector}, tsq) + word_similarity(%s, {text}))::float8 AS rank
+                FROM public."{table}", websearch_to_tsquery('spanish', %s) AS tsq
+                WHERE {JSON_LIVE_FILTER}
+                  AND ({vector} @@ tsq OR %s <%% {text})
+            ) ranked
+        """
+    if keyset:
+        query += "    WHERE (rank, id) < (%s, %s::uuid)\n        "
+    query += "    ORDER BY rank DESC, id DESC\n            LIMIT %s\n        "
+    return query
+
+
+# Feed de cambios (migración 0005). Cada INSERT/UPDATE recibe un change_seq de la
+# secuencia de su tabla mientras tiene el advisory lock compartido de la tabla.
+# Las llaves tienen que coincidir con las de los triggers de la migración.
+CHANGE_SEQUENCES = {"Equipment": "public.equipment_change_seq", "Product": "public.product_change_seq"}
+CHANGE_LOCK_KEYS = {"Equipment": 72_031_002, "Product": 72_031_003}
+# El lector no toma el lock: justo después de leer el watermark anota qué transacciones
+# tienen el lock compartido de la tabla. Toda escritura con change_seq <= watermark está
+# entre ellas o ya terminó, así que alcanza con esperar a esas y no a las que empiecen
+# después: el feed avanza aunque la tabla nunca deje de recibir escrituras. Si alguna
+# sigue abierta después de CHANGES_WAIT_MS (p. ej. una carga masiva larga) se responde
+# sin cambios, con el mismo cursor y `more` en True, y la ruta agrega Retry-After.
+CHANGES_WAIT_MS = float(os.environ.get('CHANGES_WAIT_MS', 200))
+# Intervalo entre consultas a pg_locks mientras se espera
+CHANGES_POLL_MS = float(os.environ.get('CHANGES_POLL_MS', 5))
+# Transacciones con el advisory lock compartido de una tabla (parámetro: la llave de
+# CHANGE_LOCK_KEYS, que pg_locks muestra partida en classid/objid)
+CHANGE_WRITERS_QUERY = """
+    SELECT virtualtransaction FROM pg_catalog.pg_locks
+    WHERE locktype = 'advisory' AND objsubid = 1 AND granted
+      AND ((classid::bigint << 32) | objid::bigint) = %s
+"""
+CHANGE_COLUMNS = "id, data, change_seq"
+
+
+def watermark_query(table):
+    """Último change_seq entregado por la secuencia (0 si todavía no entregó ninguno)."""
+    return f"SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM {CHANGE_SEQUENCES[table]}"
+
+
+def changes_query(table):
+    """
+    Registros con `change_seq` en (cursor, watermark], en orden, incluidos los eliminados.
+
+    Los parámetros se pasan en este orden: cursor, watermark, limit.
+    """
+    return f"""
+            SELECT {CHANGE_COLUMNS} FROM public."{table}"
+            WHERE change_seq > %s AND change_seq <= %s
+            ORDER BY change_seq
+            LIMIT %s
+        """
+
+
+# Archivo de registros eliminados (migraciones 0010 y 0011). Las lecturas de la API
+# nunca consultan estas tablas: solo el archivador, el purgado y la restauración.
+ARCHIVE_TABLES = {"Equipment": "public.equipment_archive", "Product": "public.product_archive"}
+
+
+def archive_batch_query(table):
+    """
+    Mueve al archivo hasta `limit` registros eliminados hace más de `days` días, en una
+    sola sentencia. Los que otra transacción tiene bloqueados quedan para el lote siguiente.
+
+    Los parámetros se pasan en este orden: days, limit.
+    """
+    return f"""
+            WITH moved AS (
+                DELETE FROM public."{table}"
+                WHERE id IN (
+                    SELECT id FROM public."{table}"
+                    WHERE deleted = true AND modified_at < now() - %s::float8 * interval '1 day'
+                    ORDER BY modified_at
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, data
+            )
+            INSERT INTO {ARCHIVE_TABLES[table]} (id, data)
+            SELECT id, data FROM moved
+            ON CONFLICT (id) DO UPDATE SET data = EXCLUDED.data, archived_at = now()
+        """
+
+
+def purge_batch_query(table):
+    """Borra del archivo hasta `limit` registros archivados hace más de `days` días. Parámetros: days, limit."""
+    archive = ARCHIVE_TABLES[table]
+    return f"""
+            DELETE FROM {archive}
+            WHERE id IN (
+                SELECT id FROM {archive}
+                WHERE archived_at < now() - %s::float8 * interval '1 day'
+                ORDER BY archived_at
+                LIMIT %s
+            )
+        """
+
+
+def undelete_query(table):
+    """Reactiva un registro eliminado que todavía no se archivó. Parámetros: cambios, id."""
+    return f"""
+            UPDATE public."{table}"
+            SET data = data || %s::jsonb
+            WHERE id = %s AND (data->>'deleted') = 'true'
+            RETURNING id, data
+        """
+
+
+def restore_from_archive_query(table):
+    """Devuelve un registro del archivo a su tabla aplicándole los cambios. Parámetros: id, cambios."""
+    return f"""
+            WITH restored AS (
+                DELETE FROM {ARCHIVE_TABLES[table]} WHERE id = %s RETURNING id, data
+            )
+            INSERT INTO public."{table}" (id, data)
+            SELECT id, data || %s::jsonb FROM restored
+            RETURNING id, data
+        """
@@ -0,0 +1,263 @@
+"""
+Agrupación de INSERTs concurrentes en una sola transacción (group commit).
+
+Con WRITE_BATCHING=1, create_equipment/create_product no hacen su propio commit: dejan
+la fila en una cola acotada y esperan. Un hilo por tabla junta lo que llegó en los
+próximos WRITE_BATCH_DELAY_MS (o hasta WRITE_BATCH_SIZE filas), lo inserta con un solo
+INSERT multi-fila y hace un único commit para todas. Cada llamador recibe su propio
+ID o su propio error.
+
+Sirve en servidores de larga vida con muchos POST concurrentes (hilos de gunicorn,
+servidor de desarrollo). En Lambda cada contenedor atiende un request a la vez, así
+que no hay nada que agrupar.
+"""
+import os
+import time
+import queue
+import atexit
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import psycopg2.extras
+from src.data_access.db_connector import db_connector
+from src.data_access.errors import QueueFullError
+from src.utils import logger, metrics
+
+log = logger('Write_Batcher')
+
+ENABLED = os.environ.get('WRITE_BATCHING', '0') == '1'
+# Filas máximas por transacción
+MAX_BATCH = int(os.environ.get('WRITE_BATCH_SIZE', 200))
+# Espera máxima desde la primera fila pendiente hasta el commit
+MAX_DELAY_MS = float(os.environ.get('WRITE_BATCH_DELAY_MS', 5))
+# Filas máximas esperando en la cola; por encima se rechaza con QueueFullError
+MAX_QUEUE = int(os.environ.get('WRITE_BATCH_QUEUE', 5000))
+# Segundos que submit() espera un lugar en la cola antes de rechazar
+ENQUEUE_TIMEOUT = float(os.environ.get('WRITE_BATCH_ENQUEUE_TIMEOUT', 0.5))
+# Segundos que insert() espera el commit de su fila mientras sigue en la cola (ver insert)
+RESULT_TIMEOUT = float(os.environ.get('WRITE_BATCH_RESULT_TIMEOUT', 30))
+
+# Marca para despertar al hilo cuando se cierra
+_STOP = object()
+
+
+class PendingInsert:
+    __slots__ = ('row_id', 'data', 'future', 'enqueued_at')
+
+    def __init__(self, row_id, data):
+        self.row_id = row_id
+        self.data = data
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class WriteBatcher:
+    def __init__(self, table, max_batch=MAX_BATCH, max_delay_ms=MAX_DELAY_MS, max_queue=MAX_QUEUE,
+                 enqueue_timeout=ENQUEUE_TIMEOUT):
+        self.table = table
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.enqueue_timeout = enqueue_timeout
+        self.db = db_connector
+        self.batch_query = f'INSERT INTO public."{table}" (id, data) VALUES %s'
+        self.single_query = f'INSERT INTO public."{table}" (id, data) VALUES (%s, %s)'
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._pid = os.getpid()
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def submit(self, row_id, data):
+        """
+        Encola una fila y devuelve un Future que se resuelve con su ID después del commit.
+
+        Raises:
+            QueueFullError: Si la cola sigue llena después de `enqueue_timeout` o el batcher se está cerrando
+        """
+        if self._closed:
+            raise QueueFullError(f"Las escrituras agrupadas de {self.table} se están cerrando.")
+        self._ensure_started()
+        pending = PendingInsert(row_id, data)
+        try:
+            self._queue.put(pending, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self.rejected += 1
+            raise QueueFullError(f"Demasiadas escrituras pendientes en {self.table}; reintentar más tarde.")
+        return pending.future
+
+    def insert(self, row_id, data, timeout=RESULT_TIMEOUT):
+        """
+        submit() y espera el resultado: devuelve el ID o lanza el error de esa fila.
+
+        Si pasan `timeout` segundos con la fila todavía en la cola, se cancela (el hilo
+        ya no la inserta) y se lanza QueueFullError. Si ya está en un lote en curso no
+        se puede retirar: se espera el resultado de ese lote, porque cortar antes
+        informaría un error para una fila que puede quedar confirmada.
+
+        Raises:
+            QueueFullError: Cola llena, batcher cerrándose o fila cancelada por timeout
+        """
+        future = self.submit(row_id, data)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            if not future.cancel():
+                return future.result()
+            self.rejected += 1
+            raise QueueFullError(f"La escritura en {self.table} no llegó a procesarse a tiempo; reintentar más tarde.")
+
+    def close(self, timeout=10):
+        """Deja de aceptar filas, confirma las que ya están en la cola y detiene el hilo."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            # put sin timeout: el hilo sigue vaciando la cola, así que siempre hay lugar
+            self._queue.put(_STOP)
+            thread.join(timeout)
+            log.info(f"✅ Escrituras agrupadas de {self.table} cerradas", batches=self.batches, rows=self.rows)
+
+    def stats(self):
+        return {
+            "table": self.table,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "avg_batch": round(self.rows / self.batches, 1) if self.batches else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        if self._pid != os.getpid():
+            # Después de un fork el hilo del padre no existe en el hijo; las filas
+            # heredadas en la cola pertenecen a requests del padre
+            self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._thread = None
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f'write-batcher-{self.table}', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+        # Al cerrar se confirma lo que quedó en la cola (incluido un submit que le ganó a close)
+        leftover = self._drain_nowait()
+        for start in range(0, len(leftover), self.max_batch):
+            self._flush(leftover[start:start + self.max_batch])
+
+    def _drain_nowait(self):
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not _STOP:
+                items.append(item)
+
+    def _flush(self, batch):
+        # Las filas cuyo insert() ya se rindió (Future cancelado) no se escriben; las
+        # demás quedan en curso y ya no se pueden cancelar
+        batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        start = time.perf_counter()
+        try:
+            with self.db.connection() as connection:
+                try:
+                    with connection.cursor() as cursor:
+                        psycopg2.extras.execute_values(
+                            cursor, self.batch_query, [(item.row_id, item.data) for item in batch], page_size=len(batch)
+                        )
+                except Exception as e:
+                    # Falló el INSERT: nada quedó escrito, así que se puede reintentar fila por fila
+                    connection.rollback()
+                    if len(batch) == 1:
+                        raise
+                    log.warning(f"⚠️ Falló el lote de {len(batch)} filas en {self.table}; se reintenta fila por fila", error=str(e))
+                    done = self._flush_each(connection, batch)
+                else:
+                    # Si falla el commit no se reintenta: el lote pudo haber quedado confirmado
+                    # y reinsertarlo duplicaría filas. Todas las filas reciben el error.
+                    connection.commit()
+                    done = batch
+        except Exception as e:
+            log.error(f"❌ Error al escribir lote en {self.table}: ", e)
+            for item in batch:
+                _resolve(item.future, error=e)
+            return
+
+        duration_ms = (time.perf_counter() - start) * 1000
+        metrics.registry.observe('write_batch', self.table, duration_ms, rows=len(done))
+        self.batches += 1
+        self.rows += len(done)
+        for item in done:
+            _resolve(item.future, result=item.row_id)
+
+    def _flush_each(self, connection, batch):
+        # Un SAVEPOINT por fila: las que fallan reciben su error y el resto se confirma junto
+        done = []
+        with connection.cursor() as cursor:
+            for item in batch:
+                cursor.execute("SAVEPOINT batch_row")
+                try:
+                    cursor.execute(self.single_query, (item.row_id, item.data))
+                    cursor.execute("RELEASE SAVEPOINT batch_row")
+                    done.append(item)
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT batch_row")
+                    _resolve(item.future, error=e)
+        connection.commit()
+        return done
+
+
+def _resolve(future, result=None, error=None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+equipment_batcher = WriteBatcher("Equipment")
+product_batcher = WriteBatcher("Product")
+
+
+@atexit.register
+def close_all():
+    for batcher in (equipment_batcher, product_batcher):
+        batcher.close()
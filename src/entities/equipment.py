@@ -1,6 +1,9 @@
 from src.utils import id_generator, time_helper
 
 class Equipment:
+    # Sin __dict__ por instancia: menos memoria y acceso a atributos más rápido en listados grandes
+    __slots__ = ('id', 'name', 'location', 'serial_number', 'createdBy', 'createdAt', 'modifiedAt', 'deleted')
+
     def __init__(self, id=None, name=None, location=None, createdBy=None, **kwargs):
         
         if not name or not location:
@@ -12,9 +15,28 @@ class Equipment:
         self.serial_number = kwargs.get('serial_number', 'N/A')
         self.createdBy = createdBy
         self.createdAt = kwargs.get('createdAt') or time_helper.now()
-        self.modifiedAt = time_helper.now()
+        self.modifiedAt = kwargs.get('modifiedAt') or time_helper.now()
         self.deleted = kwargs.get('deleted', False)
 
+    @classmethod
+    def from_row(cls, id, data):
+        """
+        Hidrata un equipo desde una fila ya guardada (id, data JSONB).
+
+        Es el camino de lectura: confía en los datos de la base, así que no valida
+        ni consulta el reloj, y conserva el modifiedAt almacenado.
+        """
+        equipment = cls.__new__(cls)
+        equipment.id = id
+        equipment.name = data.get('name')
+        equipment.location = data.get('location')
+        equipment.serial_number = data.get('serial_number', 'N/A')
+        equipment.createdBy = data.get('createdBy')
+        equipment.createdAt = data.get('createdAt')
+        equipment.modifiedAt = data.get('modifiedAt')
+        equipment.deleted = data.get('deleted', False)
+        return equipment
+
     def get_id(self):
         return self.id
 
@@ -28,4 +50,4 @@ class Equipment:
             "createdAt": self.createdAt,
             "modifiedAt": self.modifiedAt,
             "deleted": self.deleted
-        }
\ No newline at end of file
+        }
@@ -1,6 +1,9 @@
 from src.utils import id_generator, time_helper
 
 class Product:
+    # Sin __dict__ por instancia: menos memoria y acceso a atributos más rápido en listados grandes
+    __slots__ = ('id', 'name', 'price', 'description', 'category', 'createdBy', 'createdAt', 'modifiedAt', 'deleted')
+
     def __init__(self, id=None, name=None, price=None, createdBy=None, **kwargs):
         
         if not name or not price:
@@ -13,9 +16,29 @@ class Product:
         self.category = kwargs.get('category', 'General')
         self.createdBy = createdBy
         self.createdAt = kwargs.get('createdAt') or time_helper.now()
-        self.modifiedAt = time_helper.now()
+        self.modifiedAt = kwargs.get('modifiedAt') or time_helper.now()
         self.deleted = kwargs.get('deleted', False)
 
+    @classmethod
+    def from_row(cls, id, data):
+        """
+        Hidrata un producto desde una fila ya guardada (id, data JSONB).
+
+        Es el camino de lectura: confía en los datos de la base, así que no valida
+        ni consulta el reloj, y conserva el modifiedAt almacenado.
+        """
+        product = cls.__new__(cls)
+        product.id = id
+        product.name = data.get('name')
+        product.price = data.get('price')
+        product.description = data.get('description', '')
+        product.category = data.get('category', 'General')
+        product.createdBy = data.get('createdBy')
+        product.createdAt = data.get('createdAt')
+        product.modifiedAt = data.get('modifiedAt')
+        product.deleted = data.get('deleted', False)
+        return product
+
     def get_id(self):
         return self.id
 
@@ -30,4 +53,4 @@ class Product:
             "createdAt": self.createdAt,
             "modifiedAt": self.modifiedAt,
             "deleted": self.deleted
-        }
\ No newline at end of file
+        }
@@ -1,7 +1,9 @@
-#from .id_generator import IdGenerator
+from .id_generator import IdGenerator
 from .time_helper import TimeHelper
 from .logger import AppLogger # <--- AÑADE ESTA LÍNEA
+from . import metrics
+from . import etags
 
-#id_generator = IdGenerator
+# `id_generator` queda como el submódulo (src.utils.id_generator.make_id), que es lo que usan las entidades
 time = TimeHelper
 logger = AppLogger # <--- AÑADE ESTA LÍNEA
\ No newline at end of file
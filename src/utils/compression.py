@@ -0,0 +1,72 @@
+"""
+Compresión de respuestas negociada con Accept-Encoding (br o gzip).
+
+brotli es opcional: si no está instalado solo se ofrece gzip. Se importa en la
+primera respuesta que lo necesita para no sumar al arranque en frío.
+"""
+import os
+import gzip
+from functools import lru_cache
+
+# Cuerpos más chicos que esto se envían tal cual: comprimirlos cuesta más de lo que ahorra
+MIN_SIZE = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+
+@lru_cache(maxsize=None)
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def accepted_encodings(header):
+    """
+    Codificaciones que el cliente lista en Accept-Encoding con su q: {"gzip": 1.0, "br": 0.0, "*": 0.5}.
+
+    Incluye las que vienen con q=0 (rechazos explícitos); un q inválido cuenta como 0.
+    """
+    accepted = {}
+    for part in (header or '').split(','):
+        coding, *params = [piece.strip() for piece in part.split(';')]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.lower()] = quality
+    return accepted
+
+
+def encoding_quality(accepted, coding):
+    # `*` solo cubre las codificaciones que el header no lista (RFC 9110 §12.5.3)
+    if coding in accepted:
+        return accepted[coding]
+    return accepted.get('*', 0.0)
+
+
+def choose_encoding(header):
+    """La codificación con mayor q entre br (si está brotli) y gzip; a igual q gana br. None si ninguna se acepta."""
+    accepted = accepted_encodings(header)
+    candidates = ('br', 'gzip') if _brotli() is not None else ('gzip',)
+    best = max(candidates, key=lambda coding: encoding_quality(accepted, coding))
+    return best if encoding_quality(accepted, best) > 0 else None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return _brotli().compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def should_compress(mimetype, size, min_size=MIN_SIZE):
+    return size >= min_size and bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
@@ -0,0 +1,62 @@
+"""
+ETags débiles derivados de (id, modifiedAt).
+
+Un registro cambia de versión cada vez que cambia su modifiedAt, así que el ETag
+se puede calcular con una consulta que solo lee esas columnas (o desde la caché),
+sin hidratar entidades ni serializar el cuerpo.
+
+Son débiles (W/"...") porque identifican la versión del registro y no los bytes:
+el mismo ETag sale con el cuerpo en gzip, br o sin comprimir, y con JSON_PASSTHROUGH
+o sin él. Por eso If-None-Match e If-Match los comparan en forma débil.
+"""
+from hashlib import blake2b
+
+
+def _quote(digest):
+    return f'W/"{digest.hexdigest()}"'
+
+
+def entity_etag(entity_id, modified_at):
+    return _quote(blake2b(f"{entity_id}|{modified_at}".encode('utf-8'), digest_size=12))
+
+
+def collection_etag(versions, has_more=False):
+    """
+    ETag de una página a partir de sus pares (id, modifiedAt) en orden.
+
+    `has_more` entra en el hash porque la presencia del token de la siguiente
+    página también forma parte de la respuesta.
+    """
+    digest = blake2b(digest_size=12)
+    for entity_id, modified_at in versions:
+        digest.update(f"{entity_id}|{modified_at}\n".encode('utf-8'))
+    digest.update(b"more" if has_more else b"end")
+    return _quote(digest)
+
+
+def _candidates(header):
+    return [candidate.strip() for candidate in header.split(',') if candidate.strip()]
+
+
+def _weak_match(header, etag):
+    # Comparación débil (RFC 9110 §8.8.3.2): se ignora el prefijo W/ de ambos lados
+    if not header:
+        return False
+    opaque = etag.removeprefix('W/')
+    return any(candidate == '*' or candidate.removeprefix('W/') == opaque for candidate in _candidates(header))
+
+
+def none_match(header, etag):
+    """True si `If-None-Match` ya incluye `etag`."""
+    return _weak_match(header, etag)
+
+
+def match(header, etag):
+    """
+    True si `If-Match` acepta `etag`.
+
+    RFC 9110 pide comparación fuerte para If-Match, pero estos ETags son débiles
+    por diseño: lo que se protege es la versión del registro (id, modifiedAt), que
+    es justo lo que identifican, así que se comparan en forma débil.
+    """
+    return _weak_match(header, etag)
@@ -0,0 +1,91 @@
+import os
+import time
+import uuid
+import weakref
+import threading
+
+# Generador por defecto: 'uuid7' (ordenado por tiempo) o 'uuid4' (aleatorio)
+DEFAULT_KIND = os.environ.get('ID_GENERATOR', 'uuid7')
+
+# Bits del contador de UUIDv7: los 12 de rand_a más los 30 superiores de rand_b
+# (RFC 9562, sección 6.2, método 1). Los 32 bits restantes son aleatorios en cada ID.
+_COUNTER_BITS = 42
+_RANDOM_BITS = 32
+_COUNTER_MAX = (1 << _COUNTER_BITS) - 1
+
+
+class IdGenerator:
+    def __init__(self, kind=DEFAULT_KIND):
+        """
+        Inicializa el generador de IDs.
+
+        Con 'uuid7' los IDs empiezan con el instante de creación en milisegundos, así
+        que los INSERT caen siempre en el borde derecho del índice de la llave primaria
+        en lugar de en una página al azar, y ordenar por ID es ordenar por creación.
+        Dentro de un proceso los IDs son estrictamente crecientes, aun entre hilos.
+
+        Args:
+            kind (str): 'uuid7' (default) o 'uuid4'
+        """
+        if kind not in ('uuid7', 'uuid4'):
+            raise ValueError(f"Tipo de ID no soportado: {kind} (usar uuid7 o uuid4)")
+        self.kind = kind
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._counter = 0
+        if hasattr(os, 'register_at_fork'):
+            generator = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: generator() and generator()._after_fork())
+
+    def make_id(self):
+        """Devuelve un ID nuevo como string (formato UUID canónico)"""
+        if self.kind == 'uuid4':
+            return str(uuid.uuid4())
+        return str(uuid.UUID(int=self._next_uuid7()))
+
+    def _next_uuid7(self):
+        now_ms = time.time_ns() // 1_000_000
+        tail = int.from_bytes(os.urandom(4), 'big')
+        with self._lock:
+            if now_ms > self._last_ms:
+                # Milisegundo nuevo: el contador arranca en un valor aleatorio con el bit
+                # más alto en 0, para dejar lugar a muchos incrementos
+                self._last_ms = now_ms
+                self._counter = int.from_bytes(os.urandom(6), 'big') >> (48 - _COUNTER_BITS + 1)
+            else:
+                # Mismo milisegundo o reloj atrasado: se sigue desde el último ID
+                self._counter += 1
+                if self._counter > _COUNTER_MAX:
+                    # Contador agotado: se toma prestado el milisegundo siguiente
+                    self._last_ms += 1
+                    self._counter = 0
+            timestamp_ms = self._last_ms
+            counter = self._counter
+
+        rand_a = counter >> (_COUNTER_BITS - 12)
+        rand_b = ((counter & ((1 << (_COUNTER_BITS - 12)) - 1)) << _RANDOM_BITS) | tail
+        return (timestamp_ms << 80) | (0x7 << 76) | (rand_a << 64) | (0b10 << 62) | rand_b
+
+    def _after_fork(self):
+        # El hijo no hereda al hilo que pudiera tener el lock, y no debe seguir la
+        # secuencia del padre: en el mismo milisegundo generaría los mismos contadores
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._counter = 0
+
+
+def id_timestamp(entity_id):
+    """Devuelve el instante de creación (segundos Unix) de un ID UUIDv7, o None si no es v7"""
+    value = uuid.UUID(str(entity_id))
+    if value.version != 7:
+        return None
+    return (value.int >> 80) / 1000
+
+
+# Instancia global por defecto
+id_generator = IdGenerator()
+
+# Funciones compatibles para mantener retrocompatibilidad
+def make_id():
+    """Devuelve un ID nuevo (usando la instancia global)"""
+    return id_generator.make_id()
@@ -1,10 +1,72 @@
 import os
+import sys
+import json
+import time as _time
+import atexit
+import threading
+import contextvars
 from src.utils.time_helper import TimeHelper
 
 time = TimeHelper("America/Mexico_City")
 
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+LEVELS_BY_NAME = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR, 'OFF': OFF}
+
+# Umbral por defecto de cada entorno (variable LOGS)
+ENVIRONMENT_LEVELS = {'local': DEBUG, 'dev': DEBUG, 'cloud': DEBUG, 'prod': ERROR}
+
+# True mientras el contexto (hilo o tarea de asyncio) atiende un request
+_in_request = contextvars.ContextVar('log_in_request', default=False)
+
+
+class LogBuffer:
+    """
+    Acumula las líneas de log y las escribe de una sola vez.
+
+    Se vacía al final de cada request (AppLogger.flush), al llegar a `max_lines`,
+    ante cualquier ERROR y al salir del proceso, así que escribir un log dentro
+    de un request ya no hace una llamada a stdout por mensaje. Solo se acumula lo
+    que se escribe dentro de un request: los hilos de fondo (escrituras agrupadas,
+    listener de caché) y los trabajos sin request (archiver, CLI) escriben cada
+    línea en el momento, porque nadie vaciaría el buffer por ellos y en Lambda el
+    contenedor puede congelarse antes.
+    """
+
+    def __init__(self, stream=None, max_lines=256):
+        self.stream = stream
+        self.max_lines = max_lines
+        self._lines = []
+        self._lock = threading.Lock()
+
+    def write(self, line, flush=False):
+        with self._lock:
+            self._lines.append(line)
+            if not flush and len(self._lines) < self.max_lines:
+                return
+            lines, self._lines = self._lines, []
+        self._emit(lines)
+
+    def flush(self):
+        with self._lock:
+            if not self._lines:
+                return
+            lines, self._lines = self._lines, []
+        self._emit(lines)
+
+    def _emit(self, lines):
+        stream = self.stream or sys.stdout
+        stream.write('\n'.join(lines) + '\n')
+        stream.flush()
+
+
 class AppLogger:
-    # Variable de clase para determinar el entorno. Se configurará al inicio de la app.
+    # Variable de clase para determinar el entorno. Se configura al inicio de la app con configure().
     environment: str = os.environ.get('LOGS', 'local')
 
     # Códigos de color para la terminal
@@ -17,39 +79,142 @@ class AppLogger:
     RESET = '\033[0m'
     BOLD = '\033[1m'
 
+    # (dentro de la clase WARNING es el color; el nivel se toma de LEVELS_BY_NAME)
+    LEVEL_COLORS = {DEBUG: OKCYAN, INFO: WARNING, LEVELS_BY_NAME['WARNING']: WARNING, ERROR: FAIL}
+
+    # Estado compartido por todos los loggers (se recalcula en configure)
+    threshold = DEBUG
+    json_format = False
+    colors = True
+    buffered = False
+    buffer = LogBuffer()
+
+    # Caché del timestamp legible: se formatea como mucho una vez por segundo
+    _timestamp_second = None
+    _timestamp_text = ''
+
     def __init__(self, name: str):
         self.name = name
 
-    def _format_message(self, level: str, message: str):
-        """Formatea el mensaje con timestamp y nombre del logger"""
-        timestamp = time.format_timestamp()
-        return f"[{timestamp}] [{self.name}] {level}: {message}"
-
-    def debug(self, message: str, variable=''):
-        if self.environment == 'local':
-            # Imprime con colores y formato para desarrollo local
-            formatted_msg = self._format_message('DEBUG', message)
-            print(f'{self.BOLD}{self.OKCYAN}{formatted_msg}{self.RESET}', variable)
-        elif self.environment == 'cloud':
-            # Imprime sin colores para entornos de desarrollo en la nube (ej. CloudWatch)
-            formatted_msg = self._format_message('DEBUG', message)
-            print(formatted_msg, variable)
-        # En 'prod', no hace nada (return None implícito)
-
-    def info(self, message: str, variable=''):
-        if self.environment == 'local':
-            formatted_msg = self._format_message('INFO', message)
-            print(f'{self.BOLD}{self.WARNING}{formatted_msg}{self.RESET}', variable)
-        elif self.environment == 'cloud':
-            formatted_msg = self._format_message('INFO', message)
-            print(formatted_msg, variable)
-        # En 'prod', no hace nada
-
-    def error(self, message: str, variable=''):
-        if self.environment in ['local', 'cloud']:
-            formatted_msg = self._format_message('ERROR', message)
-            if self.environment == 'local':
-                print(f'{self.BOLD}{self.FAIL}{formatted_msg}{self.RESET}', variable)
-            else:
-                print(formatted_msg, variable)
-        # En 'prod', no hace nada
\ No newline at end of file
+    @classmethod
+    def configure(cls, environment=None, level=None, fmt=None, buffered=None):
+        """
+        Configura el logging de todo el proceso.
+
+        Args:
+            environment (str): 'local', 'dev'/'cloud' o 'prod' (default: variable LOGS)
+            level (str): Umbral mínimo ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'OFF');
+                default: variable LOG_LEVEL o el del entorno
+            fmt (str): 'text' o 'json' (default: variable LOG_FORMAT; 'json' fuera de local)
+            buffered (bool): Acumular las líneas de cada request y escribirlas al final
+                (default: variable LOG_BUFFERED; activado fuera de local)
+        """
+        cls.environment = environment or os.environ.get('LOGS', 'local')
+        is_local = cls.environment == 'local'
+
+        level = level or os.environ.get('LOG_LEVEL')
+        if level:
+            cls.threshold = LEVELS_BY_NAME.get(level.upper(), INFO)
+        else:
+            cls.threshold = ENVIRONMENT_LEVELS.get(cls.environment, INFO)
+
+        fmt = fmt or os.environ.get('LOG_FORMAT') or ('text' if is_local else 'json')
+        cls.json_format = fmt == 'json'
+        cls.colors = is_local and not cls.json_format
+
+        if buffered is None:
+            buffered = os.environ.get('LOG_BUFFERED', '0' if is_local else '1') == '1'
+        cls.buffered = buffered
+
+    @classmethod
+    def start_request(cls):
+        """Desde acá las líneas de este contexto se acumulan hasta flush(); se llama al empezar cada request."""
+        _in_request.set(True)
+
+    @classmethod
+    def flush(cls):
+        """Escribe lo acumulado y cierra el request en curso; se llama al final de cada request."""
+        _in_request.set(False)
+        cls.buffer.flush()
+
+    @classmethod
+    def is_enabled_for(cls, level):
+        return level >= cls.threshold
+
+    # Cada método sale antes de formatear nada si el nivel está por debajo del umbral
+
+    def debug(self, message, *args, **fields):
+        if AppLogger.threshold > DEBUG:
+            return
+        self._log(DEBUG, message, args, fields)
+
+    def info(self, message, *args, **fields):
+        if AppLogger.threshold > INFO:
+            return
+        self._log(INFO, message, args, fields)
+
+    def warning(self, message, *args, **fields):
+        if AppLogger.threshold > WARNING:
+            return
+        self._log(WARNING, message, args, fields)
+
+    def error(self, message, *args, **fields):
+        if AppLogger.threshold > ERROR:
+            return
+        self._log(ERROR, message, args, fields)
+
+    def _render(self, message, args):
+        # El mensaje puede ser un callable para diferir un cálculo caro hasta saber que se imprime
+        if callable(message):
+            message = message()
+        message = str(message)
+        if not args:
+            return message
+        if '%' in message:
+            try:
+                return message % args
+            except (TypeError, ValueError):
+                pass
+        # Compatibilidad con log.error("mensaje: ", variable)
+        return ' '.join([message] + [str(arg) for arg in args])
+
+    def _log(self, level, message, args, fields):
+        message = self._render(message, args)
+        if AppLogger.json_format:
+            record = {
+                "timestamp": self._iso_timestamp(),
+                "level": LEVEL_NAMES[level],
+                "logger": self.name,
+                "message": message,
+            }
+            if fields:
+                record.update(fields)
+            line = json.dumps(record, ensure_ascii=False, default=str)
+        else:
+            line = f"[{self._timestamp()}] [{self.name}] {LEVEL_NAMES[level]}: {message}"
+            if fields:
+                line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+            if AppLogger.colors:
+                line = f"{self.BOLD}{self.LEVEL_COLORS[level]}{line}{self.RESET}"
+
+        if AppLogger.buffered and _in_request.get():
+            AppLogger.buffer.write(line, flush=level >= ERROR)
+        else:
+            print(line)
+
+    @classmethod
+    def _timestamp(cls):
+        second = int(_time.time())
+        if second != cls._timestamp_second:
+            cls._timestamp_text = time.format_timestamp()
+            cls._timestamp_second = second
+        return cls._timestamp_text
+
+    @staticmethod
+    def _iso_timestamp():
+        now = _time.time()
+        return _time.strftime('%Y-%m-%dT%H:%M:%S', _time.gmtime(now)) + f".{int(now % 1 * 1000):03d}Z"
+
+
+AppLogger.configure()
+atexit.register(AppLogger.flush)
@@ -0,0 +1,200 @@
+import os
+import re
+import time
+import threading
+import contextlib
+import contextvars
+from collections import deque
+from functools import lru_cache
+from src.utils.logger import AppLogger
+
+log = AppLogger('Metrics')
+
+# Umbrales para registrar en el log consultas y requests lentos (milisegundos)
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 1000))
+# Muestras que se conservan por llave para calcular percentiles
+RESERVOIR_SIZE = int(os.environ.get('METRICS_RESERVOIR_SIZE', 1024))
+
+_current_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Tiempos acumulados de un request por categoría (db, connect, hydrate, serialize...)."""
+
+    __slots__ = ('started_at', 'spans', 'queries', 'rows')
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.spans = {}
+        self.queries = 0
+        self.rows = 0
+
+    def add(self, name, duration_ms):
+        self.spans[name] = self.spans.get(name, 0.0) + duration_ms
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def server_timing(self):
+        """Valor del header Server-Timing (https://www.w3.org/TR/server-timing/)."""
+        parts = []
+        for name, duration in self.spans.items():
+            if name == 'db':
+                parts.append(f'db;dur={duration:.2f};desc="{self.queries} queries, {self.rows} rows"')
+            else:
+                parts.append(f'{name};dur={duration:.2f}')
+        parts.append(f'total;dur={self.elapsed_ms():.2f}')
+        return ', '.join(parts)
+
+
+def start_request():
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def end_request():
+    timings = _current_timings.get()
+    _current_timings.set(None)
+    return timings
+
+
+def current_request():
+    return _current_timings.get()
+
+
+def record(name, duration_ms):
+    """Suma `duration_ms` a la categoría `name` del request en curso (si hay uno)."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(name, duration_ms)
+
+
+@contextlib.contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000)
+
+
+class LatencyStats:
+    """Conteo total y las últimas RESERVOIR_SIZE muestras de una llave."""
+
+    __slots__ = ('count', 'total_ms', 'max_ms', 'rows', 'samples')
+
+    def __init__(self, size):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=size)
+
+    def add(self, duration_ms, rows=None):
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+        if rows is not None and rows > 0:
+            self.rows += rows
+        self.samples.append(duration_ms)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+
+        def percentile(p):
+            if not ordered:
+                return 0.0
+            index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+            return round(ordered[index], 3)
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+        }
+
+
+class MetricsRegistry:
+    """Agregados por proceso de latencia por endpoint y por consulta."""
+
+    def __init__(self, reservoir_size=RESERVOIR_SIZE):
+        self.reservoir_size = reservoir_size
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, kind, key, duration_ms, rows=None):
+        with self._lock:
+            stats = self._series.get((kind, key))
+            if stats is None:
+                stats = self._series[(kind, key)] = LatencyStats(self.reservoir_size)
+            stats.add(duration_ms, rows)
+
+    def snapshot(self):
+        with self._lock:
+            series = list(self._series.items())
+        result = {}
+        for (kind, key), stats in series:
+            result.setdefault(kind, {})[key] = stats.summary()
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+registry = MetricsRegistry()
+
+
+_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'%\(\w+\)s|%s')
+_LISTS = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_VALUE_ROWS = re.compile(r'(VALUES\s*\(\?\))(?:\s*,\s*\(\?\))+', re.I)
+_SPACES = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=512)
+def _fingerprint(text):
+    text = _COMMENTS.sub(' ', text)
+    text = _STRINGS.sub('?', text)
+    text = _PLACEHOLDERS.sub('?', text)
+    text = _NUMBERS.sub('?', text)
+    text = _LISTS.sub('(?)', text)
+    text = _VALUE_ROWS.sub(r'\1, ...', text)
+    return _SPACES.sub(' ', text).strip()
+
+
+def fingerprint(query):
+    """
+    Normaliza una sentencia para agrupar métricas: sin literales, parámetros ni espacios extra.
+
+    Las sentencias de execute_values llegan como bytes con los valores ya incrustados;
+    solo se mira el inicio para no recorrer megabytes por cada lote.
+    """
+    if isinstance(query, bytes):
+        query = query[:1024].decode('utf-8', 'replace')
+    elif len(query) > 1024:
+        query = query[:1024]
+    return _fingerprint(query)
+
+
+def record_query(query, duration_ms, rows):
+    """Hook por defecto de los conectores: agrega la consulta a las métricas y avisa si fue lenta."""
+    key = fingerprint(query)
+    record('db', duration_ms)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.queries += 1
+        if rows and rows > 0:
+            timings.rows += rows
+    registry.observe('query', key, duration_ms, rows)
+    if duration_ms >= SLOW_QUERY_MS:
+        log.warning("🐢 Consulta lenta", duration_ms=round(duration_ms, 2), rows=rows, statement=key)
@@ -0,0 +1,74 @@
+"""
+Serialización JSON directa a bytes.
+
+El serializador se elige con JSON_SERIALIZER: 'orjson' (si está instalado), 'json'
+(biblioteca estándar) o 'auto' (default: orjson si existe, si no json). Se pueden
+registrar otros con register().
+
+También arma respuestas a partir del JSONB en texto que entrega PostgreSQL
+(`data::text`), sin decodificarlo a dict ni volver a codificarlo.
+"""
+import os
+import json
+
+_SERIALIZERS = {}
+
+
+def _default(value):
+    # Tipos que no son JSON nativo (fechas, UUID, Decimal...)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def _load_orjson():
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj, default=_default)
+    return dumps
+
+
+def register(name, dumps):
+    """Registra un serializador: una función obj -> bytes."""
+    _SERIALIZERS[name] = dumps
+
+
+def get_serializer(name=None):
+    name = name or os.environ.get('JSON_SERIALIZER', 'auto')
+    if name in _SERIALIZERS:
+        return _SERIALIZERS[name]
+    if name in ('auto', 'orjson'):
+        try:
+            return _SERIALIZERS.setdefault('orjson', _load_orjson())
+        except ImportError:
+            if name == 'orjson':
+                raise
+    return _stdlib_dumps
+
+
+register('json', _stdlib_dumps)
+dumps = get_serializer()
+
+
+def raw_entity(entity_id, document):
+    """
+    JSON de una entidad a partir de su documento JSONB en texto.
+
+    Equivale a serialize() de la app ({"id": ..., **data}), pero el documento se
+    copia tal cual: solo se le antepone la llave "id".
+    """
+    head = b'{"id":' + dumps(entity_id)
+    body = document.encode('utf-8')
+    if body == b'{}':
+        return head + b'}'
+    return head + b',' + body[1:]
+
+
+def raw_page(rows):
+    """Cuerpo de una página (lista JSON de entidades) a partir de filas (id, documento)."""
+    return b'[' + b','.join(raw_entity(entity_id, document) for entity_id, document in rows) + b']'
@@ -1,31 +1,46 @@
 import datetime
-import pytz
+
+# UTC de la biblioteca estándar: no requiere cargar la base de zonas horarias de pytz
+UTC = datetime.timezone.utc
 
 class TimeHelper:
     def __init__(self, timezone='UTC'):
         """
         Inicializa el TimeHelper con una zona horaria específica.
+
+        La zona se resuelve con pytz hasta el primer uso, así que crear instancias
+        (p. ej. a nivel de módulo) no importa pytz durante el arranque en frío.
         
         Args:
             timezone (str): Zona horaria en formato string (ej: 'UTC', 'America/Mexico_City', 'Europe/Madrid')
         """
-        try:
-            self.timezone = pytz.timezone(timezone)
-        except pytz.UnknownTimeZoneError:
-            # Si la zona horaria no es válida, usar UTC por defecto
-            self.timezone = pytz.UTC
-            print(f"⚠️ Zona horaria '{timezone}' no válida. Se usará UTC por defecto.")
+        self.timezone_name = timezone
+        self._timezone = UTC if timezone == 'UTC' else None
+
+    @property
+    def timezone(self):
+        if self._timezone is None:
+            import pytz
+            try:
+                self._timezone = pytz.timezone(self.timezone_name)
+            except pytz.UnknownTimeZoneError:
+                # Si la zona horaria no es válida, usar UTC por defecto
+                self._timezone = UTC
+                print(f"⚠️ Zona horaria '{self.timezone_name}' no válida. Se usará UTC por defecto.")
+        return self._timezone
 
     def now(self):
         """Devuelve la fecha y hora actual en formato ISO 8601 con la zona horaria configurada"""
-        now_utc = datetime.datetime.now(pytz.UTC)
+        now_utc = datetime.datetime.now(UTC)
+        if self._timezone is UTC:
+            return now_utc.isoformat()
         now_local = now_utc.astimezone(self.timezone)
         return now_local.isoformat()
 
     def format_timestamp(self, timestamp=None):
         """Formatea un timestamp en formato legible con la zona horaria configurada"""
         if timestamp is None:
-            timestamp = datetime.datetime.now(pytz.UTC)
+            timestamp = datetime.datetime.now(UTC)
         elif isinstance(timestamp, str):
             try:
                 # Intentar parsear como ISO format
@@ -36,7 +51,7 @@ class TimeHelper:
         
         # Asegurarse de que el timestamp tenga información de zona horaria
         if timestamp.tzinfo is None:
-            timestamp = pytz.UTC.localize(timestamp)
+            timestamp = timestamp.replace(tzinfo=UTC)
         
         # Convertir a la zona horaria local
         timestamp_local = timestamp.astimezone(self.timezone)
@@ -44,12 +59,12 @@ class TimeHelper:
 
     def now_utc(self):
         """Devuelve la fecha y hora actual en UTC en formato ISO 8601"""
-        return datetime.datetime.now(pytz.UTC).isoformat()
+        return datetime.datetime.now(UTC).isoformat()
 
     def format_timestamp_utc(self, timestamp=None):
         """Formatea un timestamp en formato UTC"""
         if timestamp is None:
-            timestamp = datetime.datetime.now(pytz.UTC)
+            timestamp = datetime.datetime.now(UTC)
         elif isinstance(timestamp, str):
             try:
                 timestamp = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
@@ -57,7 +72,7 @@ class TimeHelper:
                 timestamp = datetime.datetime.fromisoformat(timestamp)
         
         if timestamp.tzinfo is None:
-            timestamp = pytz.UTC.localize(timestamp)
+            timestamp = timestamp.replace(tzinfo=UTC)
         
         return timestamp.strftime("%Y-%m-%d %H:%M:%S UTC")
 
@@ -0,0 +1,101 @@
+import os
+import sys
+import pytest
+
+# Las pruebas importan `src` y `benchmarks` desde la raíz del repositorio
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def read_sql(path):
+    with open(os.path.join(ROOT, path), encoding="utf-8") as sql_file:
+        return sql_file.read()
+
+
+@pytest.fixture(scope="session")
+def postgres():
+    """
+    Servidor PostgreSQL de las pruebas: BENCH_DSN si está definido o un cluster temporal
+    con initdb, como los benchmarks. Sin ninguno de los dos, las pruebas que lo usan se omiten.
+    """
+    pytest.importorskip("psycopg2")
+    os.environ.setdefault("LOGS", "prod")
+    from benchmarks.pg_server import ThrowawayPostgres
+
+    server = ThrowawayPostgres()
+    try:
+        settings = server.__enter__()
+    except Exception as e:
+        pytest.skip(f"No hay PostgreSQL para la prueba: {e}")
+    yield settings
+    server.__exit__(None, None, None)
+
+
+class ScratchDatabase:
+    """Base creada para un módulo de pruebas, con el pool de la app apuntando a ella."""
+
+    def __init__(self, settings, name):
+        import psycopg2
+        self._connect = psycopg2.connect
+        self.settings = settings
+        self.name = name
+        self._opened = []
+
+    def connect(self):
+        """Conexión propia (fuera del pool) que se cierra al terminar el módulo."""
+        connection = self._connect(dbname=self.name, **self._server())
+        self._opened.append(connection)
+        return connection
+
+    def create(self, scripts):
+        self._admin(f"DROP DATABASE IF EXISTS {self.name}")
+        self._admin(f"CREATE DATABASE {self.name}")
+        connection = self.connect()
+        with connection.cursor() as cursor:
+            for script in scripts:
+                cursor.execute(read_sql(script))
+        connection.commit()
+        self._point_pool(self.name)
+
+    def drop(self):
+        for connection in self._opened:
+            connection.close()
+        self._point_pool(self.settings["DB_NAME"])
+        self._admin(f"DROP DATABASE IF EXISTS {self.name}")
+
+    def _server(self):
+        return dict(host=self.settings["DB_HOST"], port=self.settings["DB_PORT"], user=self.settings["DB_USER"],
+                    password=self.settings["DB_PASS"])
+
+    def _admin(self, statement):
+        connection = self._connect(dbname=self.settings["DB_NAME"], **self._server())
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(statement)
+        finally:
+            connection.close()
+
+    def _point_pool(self, name):
+        # El pool lee DB_* una sola vez al crearse, y otra prueba puede haberlo importado antes
+        from src.data_access.db_connector import db_connector
+        db_connector.close_all()
+        db_connector.db_host = self.settings["DB_HOST"]
+        db_connector.db_port = self.settings["DB_PORT"]
+        db_connector.db_user = self.settings["DB_USER"]
+        db_connector.db_pass = self.settings["DB_PASS"]
+        db_connector.db_name = name
+        os.environ["DB_NAME"] = name
+
+
+@pytest.fixture(scope="module")
+def scratch_database(postgres, request):
+    """
+    Base `<módulo>_db` creada con los scripts de SCHEMA_SCRIPTS del módulo de pruebas
+    (rutas relativas a la raíz del repositorio) y borrada al terminarlo.
+    """
+    database = ScratchDatabase(postgres, f"{request.module.__name__.rsplit('.', 1)[-1]}_db")
+    database.create(request.module.SCHEMA_SCRIPTS)
+    yield database
+    database.drop()
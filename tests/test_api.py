@@ -1,7 +1,13 @@
-import requests
 import json
 import time
 
+try:
+    import requests
+except ImportError:
+    # Sin requests no hay cliente HTTP: pytest omite el módulo en lugar de fallar al recolectarlo
+    import pytest
+    pytest.skip("requests no está instalado", allow_module_level=True)
+
 # Configuración de la API
 BASE_URL = "http://127.0.0.1:5000"
 
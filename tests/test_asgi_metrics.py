@@ -0,0 +1,24 @@
+"""GET /metrics del modo ASGI (Quart) después de cargar la capa de datos asíncrona."""
+import asyncio
+import pytest
+
+pytest.importorskip("quart")
+pytest.importorskip("asyncpg")
+
+from src import asgi  # noqa: E402
+
+
+def test_metrics_after_async_data_access_is_loaded(monkeypatch):
+    monkeypatch.setattr(asgi, "METRICS_ENDPOINT", True)
+    # Cargar AsyncEquipmentDB importa el submódulo async_db_connector
+    from src.data_access import AsyncEquipmentDB  # noqa: F401
+
+    async def get_metrics():
+        # Sin test_client como context manager no corren before_serving/after_serving (no abre el pool)
+        response = await asgi.create_app().test_client().get("/metrics")
+        return response.status_code, await response.get_json()
+
+    status, body = asyncio.run(get_metrics())
+
+    assert status == 200
+    assert "pool" in body and len(body["cache"]) == 2
@@ -0,0 +1,99 @@
+"""
+Prueba del backfill de las columnas tipadas (src/data_access/backfill.py) contra filas reales.
+
+Necesita PostgreSQL: con BENCH_DSN usa ese servidor y crea (y al final borra) su propia
+base; si no, levanta un cluster temporal con initdb, como los benchmarks. Sin ninguno de
+los dos la prueba se omite.
+
+Uso:
+    BENCH_DSN=postgresql://bench@localhost/postgres python -m pytest tests/test_backfill.py
+"""
+import json
+import uuid
+import pytest
+
+pytest.importorskip("psycopg2")
+
+# Crea la base `test_backfill_db` con el fixture scratch_database de conftest.py
+SCHEMA_SCRIPTS = ["create_tables.sql", "src/data_access/migrations/0008_typed_columns.sql"]
+
+# Filas anteriores a la migración 0008 (columnas tipadas en NULL) y posteriores (las completa el trigger)
+LEGACY_ROWS = 23
+NEW_ROWS = 2
+TRIGGERS = {"Equipment": "equipment_typed_columns", "Product": "product_typed_columns"}
+
+
+def document(table, index):
+    data = {
+        "name": f"Registro {index}",
+        "location": "Planta 1",
+        "deleted": index % 4 == 0,
+        "createdAt": f"2024-03-{index % 28 + 1:02d}T10:00:00-06:00",
+        "modifiedAt": f"2024-04-{index % 28 + 1:02d}T10:00:00-06:00",
+    }
+    if table == "Product":
+        data.update({"price": f"{index}.50", "category": f"categoria-{index % 3}"})
+    return json.dumps(data)
+
+
+@pytest.fixture(scope="module")
+def database(scratch_database):
+    return scratch_database.connect()
+
+
+@pytest.fixture
+def rows(database):
+    """Tablas con LEGACY_ROWS filas sin columnas tipadas y NEW_ROWS filas que ya pasaron por el trigger."""
+    with database.cursor() as cursor:
+        for table, trigger in TRIGGERS.items():
+            cursor.execute(f'TRUNCATE public."{table}"')
+            # Con el trigger deshabilitado las filas quedan como antes de la migración
+            cursor.execute(f'ALTER TABLE public."{table}" DISABLE TRIGGER {trigger}')
+            for index in range(LEGACY_ROWS):
+                cursor.execute(f'INSERT INTO public."{table}" (id, data) VALUES (%s, %s)',
+                               (str(uuid.uuid4()), document(table, index)))
+            cursor.execute(f'ALTER TABLE public."{table}" ENABLE TRIGGER {trigger}')
+            for index in range(LEGACY_ROWS, LEGACY_ROWS + NEW_ROWS):
+                cursor.execute(f'INSERT INTO public."{table}" (id, data) VALUES (%s, %s)',
+                               (str(uuid.uuid4()), document(table, index)))
+    database.commit()
+    return database
+
+
+def count(connection, query):
+    with connection.cursor() as cursor:
+        cursor.execute(query)
+        result = cursor.fetchone()[0]
+    connection.rollback()
+    return result
+
+
+@pytest.mark.parametrize("batch_size", [1, 5, LEGACY_ROWS + NEW_ROWS, 1000])
+@pytest.mark.parametrize("table", ["Equipment", "Product"])
+def test_run_fills_every_legacy_row(rows, table, batch_size):
+    from src.data_access.backfill import Backfill
+
+    backfill = Backfill(batch_size=batch_size, pause_ms=0)
+    assert backfill.check(table) == LEGACY_ROWS
+
+    assert backfill.run(table) == LEGACY_ROWS
+    assert backfill.check(table) == 0
+    assert count(rows, f'SELECT count(*) FROM public."{table}" WHERE deleted IS NULL OR created_at IS NULL') == 0
+    assert count(rows, f'SELECT count(*) FROM public."{table}" WHERE deleted') == (LEGACY_ROWS + NEW_ROWS + 3) // 4
+
+    # Una segunda corrida no encuentra nada pendiente
+    assert backfill.run(table) == 0
+
+
+def test_run_resumes_after_start_after(rows):
+    from src.data_access.backfill import Backfill
+
+    with rows.cursor() as cursor:
+        cursor.execute('SELECT id FROM public."Equipment" WHERE deleted IS NULL ORDER BY id')
+        legacy_ids = [str(row[0]) for row in cursor.fetchall()]
+    rows.rollback()
+
+    backfill = Backfill(batch_size=4, pause_ms=0)
+    assert backfill.run("Equipment", start_after=legacy_ids[9]) == LEGACY_ROWS - 10
+    # Las filas hasta start_after (inclusive) quedan para otra corrida
+    assert backfill.check("Equipment") == 10
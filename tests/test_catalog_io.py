@@ -0,0 +1,106 @@
+"""
+Lectura de NDJSON/CSV, formato de COPY e importación/exportación del catálogo
+(src/data_access/catalog_io.py).
+
+Las pruebas de import/export necesitan PostgreSQL (BENCH_DSN o un cluster temporal);
+las de lectura y formato no.
+"""
+import io
+import csv
+import json
+import uuid
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from src.data_access import catalog_io  # noqa: E402
+from src.data_access.catalog_io import CatalogIO, copy_line, read_csv, read_ndjson  # noqa: E402
+
+SCHEMA_SCRIPTS = ["create_tables.sql"]
+
+
+def test_read_ndjson_numbers_lines_and_skips_blanks():
+    lines = [b'{"name": "Prensa"}\n', b'\n', '{"name": "Torno"}\n', b'{roto\n']
+
+    records = list(read_ndjson(lines))
+
+    assert [line for line, _ in records] == [1, 3, 4]
+    assert records[0][1] == {"name": "Prensa"} and records[1][1] == {"name": "Torno"}
+    assert isinstance(records[2][1], ValueError) and "JSON inválido" in str(records[2][1])
+
+
+def test_read_csv_uses_header_and_counts_from_line_two():
+    lines = ["name,location\n", "Prensa,Planta 1\n", b'"Torno, grande",Planta 2\n']
+
+    assert list(read_csv(lines)) == [
+        (2, {"name": "Prensa", "location": "Planta 1"}),
+        (3, {"name": "Torno, grande", "location": "Planta 2"}),
+    ]
+
+
+def test_copy_line_escapes_backslashes_for_copy_text_format():
+    entity_id = uuid.uuid4()
+
+    line = copy_line(entity_id, {"name": 'Prensa "A"\\B', "notes": "línea 1\nlínea 2\tfin"})
+
+    row_id, document = line[:-1].split(b'\t')
+    assert line.endswith(b'\n') and line.count(b'\n') == 1 and line.count(b'\t') == 1
+    assert row_id == str(entity_id).encode('ascii')
+    # COPY deshace el escape de `\`: lo que queda es el JSON original
+    unescaped = document.replace(b'\\\\', b'\\')
+    assert json.loads(unescaped) == {"name": 'Prensa "A"\\B', "notes": "línea 1\nlínea 2\tfin"}
+
+
+@pytest.mark.parametrize("path, fmt, expected", [
+    ("equipos.CSV", None, "csv"),
+    ("equipos.ndjson", None, "ndjson"),
+    ("-", None, "ndjson"),
+    ("equipos.txt", "csv", "csv"),
+])
+def test_detect_format(path, fmt, expected):
+    assert catalog_io.detect_format(path, fmt) == expected
+
+
+def test_detect_format_rejects_unknown():
+    with pytest.raises(ValueError):
+        catalog_io.detect_format("x", "xml")
+
+
+@pytest.fixture
+def catalog(scratch_database):
+    connection = scratch_database.connect()
+    with connection.cursor() as cursor:
+        cursor.execute('TRUNCATE public."Equipment"')
+    connection.commit()
+    return CatalogIO("equipment")
+
+
+def test_import_reports_bad_lines_and_loads_the_rest(catalog):
+    lines = [
+        json.dumps({"name": "Prensa", "location": "Planta 1"}),
+        json.dumps({"name": "Sin ubicación"}),
+        "{roto",
+        json.dumps({"name": "Torno", "location": "Planta 2", "deleted": "true"}),
+    ]
+
+    result = catalog.import_records(read_ndjson(lines), chunk_size=2)
+
+    assert result["imported"] == 2 and result["failed_count"] == 2
+    assert [failure["line"] for failure in result["failed"]] == [2, 3]
+
+
+def test_export_round_trip_in_csv_and_ndjson(catalog):
+    entity_id = str(uuid.uuid4())
+    source = [{"id": entity_id, "name": "Prensa \\ 1", "location": "Planta, 1"}]
+    assert catalog.import_records(enumerate(source, start=1))["imported"] == 1
+
+    exported = [json.loads(line) for line in b''.join(catalog.export_rows('ndjson')).splitlines()]
+    assert [(row["id"], row["name"], row["location"]) for row in exported] == [(entity_id, "Prensa \\ 1", "Planta, 1")]
+
+    text = b''.join(catalog.export_rows('csv')).decode('utf-8')
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert [(row["id"], row["name"], row["location"]) for row in rows] == [(entity_id, "Prensa \\ 1", "Planta, 1")]
+
+    # Reimportar la exportación con skip no duplica nada
+    result = catalog.import_records(read_csv(text.splitlines(keepends=True)), on_conflict='skip')
+    assert (result["imported"], result["skipped"]) == (0, 1)
@@ -0,0 +1,105 @@
+"""
+Feed de cambios (EquipmentDB.changes_since) con escrituras concurrentes reales.
+
+Necesita PostgreSQL, igual que test_backfill.py: BENCH_DSN o un cluster temporal.
+
+Uso:
+    BENCH_DSN=postgresql://bench@localhost/postgres python -m pytest tests/test_change_feed.py
+"""
+import json
+import threading
+import pytest
+
+pytest.importorskip("psycopg2")
+
+# Crea la base `test_change_feed_db` con el fixture scratch_database de conftest.py
+SCHEMA_SCRIPTS = ["create_tables.sql", "src/data_access/migrations/0005_change_feed.sql"]
+
+
+@pytest.fixture(scope="module")
+def connect(scratch_database):
+    return scratch_database.connect
+
+
+@pytest.fixture
+def feed(connect, monkeypatch):
+    from src.data_access import equipment_db
+
+    monkeypatch.setattr(equipment_db, "CHANGES_WAIT_MS", 300)
+    db = equipment_db.EquipmentDB()
+    _, cursor, _ = db.changes_since(None)
+    return db, cursor
+
+
+def open_write(connection, name):
+    """Inserta un equipo sin confirmar: la transacción queda con el lock compartido y su change_seq."""
+    from src.entities import Equipment
+
+    equipment = Equipment(name=name, location="Planta 1")
+    with connection.cursor() as cursor:
+        cursor.execute('INSERT INTO public."Equipment" (id, data) VALUES (%s, %s)',
+                       (equipment.get_id(), json.dumps(equipment.get_data(), default=str)))
+    return equipment.get_id()
+
+
+def test_open_writer_is_reported_as_retry(connect, feed):
+    db, cursor = feed
+    writer = connect()
+    open_write(writer, "Abierto")
+
+    items, next_cursor, more = db.changes_since(cursor)
+
+    # Escritura en curso con número asignado: no se avanza, pero se pide reintentar
+    assert (items, next_cursor, more) == ([], cursor, True)
+    writer.commit()
+    items, next_cursor, more = db.changes_since(cursor)
+    assert [item.name for item in items] == ["Abierto"]
+    assert next_cursor > cursor and more is False
+
+
+def test_new_writers_do_not_hold_back_the_feed(connect, feed, monkeypatch):
+    from src.data_access import equipment_db
+
+    db, cursor = feed
+    first, second = connect(), connect()
+    open_write(first, "Primero")
+
+    # La lectura empieza mientras `first` está abierto; durante su espera llega `second`
+    # (que toma el lock compartido) y recién después confirma `first`
+    waiting = threading.Event()
+    original_sleep = equipment_db.time.sleep
+
+    def sleep(seconds):
+        waiting.set()
+        original_sleep(seconds)
+
+    monkeypatch.setattr(equipment_db.time, "sleep", sleep)
+    result = {}
+    reader = threading.Thread(target=lambda: result.update(changes=db.changes_since(cursor)))
+    reader.start()
+    assert waiting.wait(5)
+    open_write(second, "Segundo")
+    first.commit()
+    reader.join(5)
+
+    items, next_cursor, more = result["changes"]
+    assert [item.name for item in items] == ["Primero"]
+    assert more is False
+    second.commit()
+    items, _, _ = db.changes_since(next_cursor)
+    assert [item.name for item in items] == ["Segundo"]
+
+
+def test_rolled_back_writer_leaves_a_gap(connect, feed):
+    db, cursor = feed
+    writer = connect()
+    open_write(writer, "Descartado")
+    writer.rollback()
+    committed = connect()
+    open_write(committed, "Confirmado")
+    committed.commit()
+
+    items, _, more = db.changes_since(cursor)
+
+    assert [item.name for item in items] == ["Confirmado"]
+    assert more is False
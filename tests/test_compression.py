@@ -0,0 +1,75 @@
+"""Negociación de Accept-Encoding y compresión de respuestas (src/utils/compression.py)."""
+import gzip
+import pytest
+
+from src.utils import compression
+
+
+class FakeBrotli:
+    @staticmethod
+    def compress(body, quality):
+        return b'br:' + body
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "_brotli", lambda: FakeBrotli)
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "_brotli", lambda: None)
+
+
+def test_accepted_encodings_keeps_explicit_q_values():
+    accepted = compression.accepted_encodings("GZIP;q=0, br ; q=0.5, *;q=0.2, deflate;q=x")
+
+    assert accepted == {"gzip": 0.0, "br": 0.5, "*": 0.2, "deflate": 0.0}
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0.3, br;q=0.3", "br"),
+    ("*", "br"),
+    ("gzip;q=0, *", "br"),
+    ("br;q=0, *", "gzip"),
+    ("br;q=0, gzip;q=0, *", None),
+    ("*;q=0", None),
+    ("identity", None),
+    ("", None),
+    (None, None),
+])
+def test_choose_encoding_with_brotli(with_brotli, header, expected):
+    assert compression.choose_encoding(header) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "gzip"),
+    ("br", None),
+    ("*", "gzip"),
+    ("gzip;q=0, *", None),
+])
+def test_choose_encoding_without_brotli(without_brotli, header, expected):
+    assert compression.choose_encoding(header) == expected
+
+
+def test_compress_gzip_round_trip():
+    body = b'{"items": []}' * 100
+
+    assert gzip.decompress(compression.compress(body, "gzip")) == body
+
+
+def test_compress_br(with_brotli):
+    assert compression.compress(b"{}", "br") == b"br:{}"
+
+
+@pytest.mark.parametrize("mimetype, size, expected", [
+    ("application/json", 2048, True),
+    ("text/csv", 2048, True),
+    ("application/json", 10, False),
+    ("image/png", 2048, False),
+    (None, 2048, False),
+])
+def test_should_compress(mimetype, size, expected):
+    assert compression.should_compress(mimetype, size, min_size=1024) is expected
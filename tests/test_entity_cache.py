@@ -0,0 +1,118 @@
+"""EntityCache (src/data_access/entity_cache.py): LRU, TTL y versiones contra lecturas viejas."""
+import pytest
+
+from src.data_access import entity_cache
+from src.data_access.entity_cache import EntityCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(entity_cache, "time", clock)
+    return clock
+
+
+def test_get_returns_the_stored_row():
+    cache = EntityCache("test")
+    cache.set("a", ("a", {"name": "Prensa"}))
+
+    assert cache.get("a") == ("a", {"name": "Prensa"})
+    assert cache.get("b") is None
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = EntityCache("test", max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = EntityCache("test", ttl=60)
+    cache.set("a", 1)
+
+    clock.now += 59
+    assert cache.get("a") == 1
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1 and cache.stats()["size"] == 0
+
+
+def test_zero_size_disables_the_cache():
+    cache = EntityCache("test", max_size=0)
+    cache.set("a", 1)
+
+    assert not cache.enabled
+    assert cache.get("a") is None
+
+
+def test_invalidate_drops_the_entry():
+    cache = EntityCache("test")
+    cache.set("a", 1)
+
+    cache.invalidate("a")
+
+    assert cache.get("a") is None
+
+
+def test_read_that_raced_an_invalidation_is_not_stored():
+    cache = EntityCache("test")
+    version = cache.version
+    # Otro proceso cambió la fila mientras la consulta estaba en curso
+    cache.invalidate("a")
+
+    cache.set("a", "vieja", version=version)
+    assert cache.get("a") is None
+
+    cache.set("a", "nueva", version=cache.version)
+    assert cache.get("a") == "nueva"
+
+
+def test_invalidation_of_another_key_does_not_discard_the_read():
+    cache = EntityCache("test")
+    version = cache.version
+    cache.invalidate("b")
+
+    cache.set("a", 1, version=version)
+
+    assert cache.get("a") == 1
+
+
+def test_forgotten_invalidations_reject_older_reads(monkeypatch):
+    monkeypatch.setattr(entity_cache, "MAX_TRACKED_INVALIDATIONS", 2)
+    cache = EntityCache("test")
+    version = cache.version
+    for key in ("a", "b", "c"):
+        cache.invalidate(key)
+
+    # "a" ya no está en el registro de invalidaciones: no se puede saber si la lectura es vieja
+    cache.set("a", 1, version=version)
+    assert cache.get("a") is None
+    cache.set("d", 1, version=version)
+    assert cache.get("d") is None
+
+
+def test_clear_rejects_reads_started_before_it():
+    cache = EntityCache("test")
+    cache.set("a", 1)
+    version = cache.version
+
+    cache.clear()
+    cache.set("b", 2, version=version)
+
+    assert cache.get("a") is None and cache.get("b") is None
@@ -0,0 +1,73 @@
+"""ETags de registros y páginas (src/utils/etags.py) y su uso en GET /equipment."""
+import gzip
+import pytest
+
+from src.utils import etags
+
+MODIFIED_AT = "2024-04-01T10:00:00-06:00"
+
+
+def test_entity_etag_is_weak_and_tracks_modified_at():
+    etag = etags.entity_etag("a1", MODIFIED_AT)
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == etags.entity_etag("a1", MODIFIED_AT)
+    assert etag != etags.entity_etag("a1", "2024-04-01T10:00:01-06:00")
+    assert etag != etags.entity_etag("a2", MODIFIED_AT)
+
+
+def test_collection_etag_depends_on_order_and_next_page():
+    versions = [("a1", MODIFIED_AT), ("a2", MODIFIED_AT)]
+
+    assert etags.collection_etag(versions).startswith('W/"')
+    assert etags.collection_etag(versions) != etags.collection_etag(versions[::-1])
+    assert etags.collection_etag(versions, has_more=True) != etags.collection_etag(versions)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('"x", W/"abc"', True),
+    ('"abcd"', False),
+])
+def test_none_match_and_match_compare_weakly(header, expected):
+    assert etags.none_match(header, 'W/"abc"') is expected
+    assert etags.match(header, 'W/"abc"') is expected
+
+
+def test_not_modified_for_every_content_coding(monkeypatch):
+    pytest.importorskip("flask")
+    from src import app as app_module
+    from src.entities import Equipment
+
+    page = [Equipment(name=f"Prensa {index}", location="Planta 1") for index in range(30)]
+
+    class FakeEquipmentDB:
+        FILTERABLE_FIELDS = ()
+
+        def get_equipment_page(self, **page_args):
+            return page, None
+
+        def get_equipment_page_versions(self, **page_args):
+            return [(str(item.get_id()), item.modifiedAt) for item in page], False
+
+    monkeypatch.setattr(app_module, "get_equipment_db", lambda: FakeEquipmentDB())
+    monkeypatch.setattr(app_module, "JSON_PASSTHROUGH", False)
+    monkeypatch.setattr(app_module, "COMPRESS_RESPONSES", True)
+    client = app_module.create_app().test_client()
+
+    plain = client.get("/equipment", headers={"Accept-Encoding": "identity"})
+    zipped = client.get("/equipment", headers={"Accept-Encoding": "gzip"})
+
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped.data) == plain.data
+    # Mismo ETag débil para las dos codificaciones; cualquiera de los dos revalida
+    assert plain.headers["ETag"] == zipped.headers["ETag"]
+    assert plain.headers["ETag"].startswith('W/"')
+    for accept_encoding in ("identity", "gzip"):
+        response = client.get("/equipment", headers={"If-None-Match": zipped.headers["ETag"],
+                                                     "Accept-Encoding": accept_encoding})
+        assert response.status_code == 304
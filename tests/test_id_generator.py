@@ -0,0 +1,89 @@
+"""IDs UUIDv7 ordenados por tiempo (src/utils/id_generator.py)."""
+import time
+import uuid
+import threading
+import pytest
+
+from src.utils import id_generator as id_module
+from src.utils.id_generator import IdGenerator, id_timestamp
+
+
+def test_uuid7_has_version_variant_and_timestamp():
+    before = time.time()
+    value = uuid.UUID(IdGenerator('uuid7').make_id())
+    after = time.time()
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before - 0.001 <= id_timestamp(value) <= after + 0.001
+
+
+def test_uuid7_ids_are_strictly_increasing_within_a_millisecond(monkeypatch):
+    monkeypatch.setattr(id_module.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+    generator = IdGenerator('uuid7')
+
+    ids = [generator.make_id() for _ in range(1000)]
+
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert {id_timestamp(entity_id) for entity_id in ids} == {1_700_000_000.0}
+
+
+def test_clock_going_back_does_not_break_the_order(monkeypatch):
+    now = [1_700_000_000_005_000_000]
+    monkeypatch.setattr(id_module.time, "time_ns", lambda: now[0])
+    generator = IdGenerator('uuid7')
+    first = generator.make_id()
+
+    now[0] -= 3_000_000
+    second = generator.make_id()
+
+    assert second > first
+    assert id_timestamp(second) == id_timestamp(first)
+
+
+def test_exhausted_counter_borrows_the_next_millisecond(monkeypatch):
+    monkeypatch.setattr(id_module.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+    generator = IdGenerator('uuid7')
+    first = generator.make_id()
+    generator._counter = id_module._COUNTER_MAX
+
+    second = generator.make_id()
+
+    assert second > first
+    assert id_timestamp(second) == id_timestamp(first) + 0.001
+
+
+def test_uuid7_is_strictly_increasing_across_threads():
+    generator = IdGenerator('uuid7')
+    results = [[] for _ in range(8)]
+
+    def work(out):
+        for _ in range(2000):
+            out.append(generator.make_id())
+
+    threads = [threading.Thread(target=work, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [entity_id for out in results for entity_id in out]
+    assert len(set(ids)) == len(ids)
+    # Cada hilo ve sus propios IDs en orden creciente
+    assert all(out == sorted(out) for out in results)
+
+
+def test_uuid4_kind_and_invalid_kind():
+    assert uuid.UUID(IdGenerator('uuid4').make_id()).version == 4
+    assert id_timestamp(IdGenerator('uuid4').make_id()) is None
+    with pytest.raises(ValueError):
+        IdGenerator('uuid1')
+
+
+def test_after_fork_restarts_the_sequence():
+    generator = IdGenerator('uuid7')
+    generator.make_id()
+
+    generator._after_fork()
+
+    assert (generator._last_ms, generator._counter) == (0, 0)
@@ -0,0 +1,69 @@
+"""GET /equipment (Flask) con una base falsa: cuerpo en lista y token de la siguiente página en headers."""
+import json
+import pytest
+
+pytest.importorskip("flask")
+
+from src import app as app_module  # noqa: E402
+from src.entities import Equipment  # noqa: E402
+
+PAGE = [Equipment(name="Prensa 1", location="Planta 1"), Equipment(name="Prensa 2", location="Planta 1")]
+
+
+class FakeEquipmentDB:
+    FILTERABLE_FIELDS = ('location', 'serial_number', 'createdBy')
+
+    def __init__(self, next_token):
+        self.next_token = next_token
+        self.calls = []
+
+    def get_equipment_page(self, **page_args):
+        self.calls.append(page_args)
+        return PAGE, self.next_token
+
+    def get_equipment_page_raw(self, **page_args):
+        self.calls.append(page_args)
+        rows = [(str(item.get_id()), item.modifiedAt, json.dumps(item.get_data(), default=str)) for item in PAGE]
+        return rows, self.next_token
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    def client(next_token, passthrough=False):
+        db = FakeEquipmentDB(next_token)
+        monkeypatch.setattr(app_module, "get_equipment_db", lambda: db)
+        monkeypatch.setattr(app_module, "JSON_PASSTHROUGH", passthrough)
+        return app_module.create_app().test_client(), db
+    return client
+
+
+@pytest.mark.parametrize("passthrough", [False, True])
+def test_page_body_is_a_list_with_next_token_in_headers(listing, passthrough):
+    client, db = listing("tok-2", passthrough)
+
+    response = client.get("/equipment?limit=2&location=Planta%201")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [item["name"] for item in body] == ["Prensa 1", "Prensa 2"]
+    assert response.headers["X-Next-Page"] == "tok-2"
+    assert response.headers["Link"] == '</equipment?limit=2&location=Planta+1&after=tok-2>; rel="next"'
+    assert db.calls[0]["filters"] == {"location": "Planta 1"}
+
+
+def test_last_page_has_no_next_headers(listing):
+    client, _ = listing(None)
+
+    response = client.get("/equipment?after=tok-2")
+
+    assert isinstance(response.get_json(), list)
+    assert "X-Next-Page" not in response.headers
+    assert "Link" not in response.headers
+
+
+def test_link_replaces_the_previous_after(listing):
+    client, _ = listing("tok-3")
+
+    response = client.get("/equipment?after=tok-2&limit=2")
+
+    assert response.headers["Link"] == '</equipment?after=tok-3&limit=2>; rel="next"'
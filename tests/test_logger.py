@@ -0,0 +1,125 @@
+"""Niveles, formato y buffer por request de AppLogger (src/utils/logger.py)."""
+import io
+import json
+import pytest
+
+from src.utils.logger import AppLogger, LogBuffer, DEBUG, ERROR, INFO, OFF, WARNING
+
+STATE = ('environment', 'threshold', 'json_format', 'colors', 'buffered', 'buffer')
+
+
+@pytest.fixture
+def log(monkeypatch):
+    # configure() cambia atributos de clase: se guardan para restaurarlos al terminar
+    for name in STATE:
+        monkeypatch.setattr(AppLogger, name, getattr(AppLogger, name))
+    monkeypatch.delenv('LOG_LEVEL', raising=False)
+    monkeypatch.delenv('LOG_FORMAT', raising=False)
+    monkeypatch.delenv('LOG_BUFFERED', raising=False)
+    yield AppLogger('Prueba')
+    AppLogger.flush()
+
+
+@pytest.mark.parametrize("environment, level, expected", [
+    ('local', None, DEBUG),
+    ('prod', None, ERROR),
+    ('otro', None, INFO),
+    ('prod', 'warning', WARNING),
+    ('local', 'OFF', OFF),
+    ('local', 'desconocido', INFO),
+])
+def test_configure_threshold(log, environment, level, expected):
+    AppLogger.configure(environment=environment, level=level)
+
+    assert AppLogger.threshold == expected
+
+
+def test_configure_defaults_by_environment(log):
+    AppLogger.configure(environment='local')
+    assert (AppLogger.json_format, AppLogger.colors, AppLogger.buffered) == (False, True, False)
+
+    AppLogger.configure(environment='prod')
+    assert (AppLogger.json_format, AppLogger.colors, AppLogger.buffered) == (True, False, True)
+
+
+def test_messages_below_threshold_are_not_rendered(log, capsys):
+    AppLogger.configure(environment='local', level='WARNING', fmt='text')
+    calls = []
+
+    log.info(lambda: calls.append('info') or 'caro')
+    log.warning(lambda: calls.append('warning') or 'caro')
+
+    assert calls == ['warning']
+    assert capsys.readouterr().out.count('\n') == 1
+
+
+def test_text_format_with_args_and_fields(log, capsys):
+    AppLogger.configure(environment='dev', level='DEBUG', fmt='text', buffered=False)
+
+    log.info("Se encontraron %s equipos", 3, table="Equipment")
+    log.error("Error al crear equipo:", ValueError("sin nombre"))
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].endswith("[Prueba] INFO: Se encontraron 3 equipos table=Equipment")
+    assert lines[1].endswith("[Prueba] ERROR: Error al crear equipo: sin nombre")
+
+
+def test_json_format(log, capsys):
+    AppLogger.configure(environment='prod', level='INFO', fmt='json', buffered=False)
+
+    log.warning("⚠️ Lento", duration_ms=12.5)
+
+    record = json.loads(capsys.readouterr().out)
+    assert record["level"] == "WARNING" and record["logger"] == "Prueba"
+    assert record["message"] == "⚠️ Lento" and record["duration_ms"] == 12.5
+    assert record["timestamp"].endswith("Z")
+
+
+@pytest.fixture
+def buffered(log, monkeypatch):
+    AppLogger.configure(environment='prod', level='DEBUG', fmt='text', buffered=True)
+    stream = io.StringIO()
+    monkeypatch.setattr(AppLogger, 'buffer', LogBuffer(stream=stream, max_lines=3))
+    return log, stream
+
+
+def test_request_lines_are_written_at_flush(buffered, capsys):
+    log, stream = buffered
+    AppLogger.start_request()
+
+    log.info("uno")
+    log.info("dos")
+    assert stream.getvalue() == ""
+
+    AppLogger.flush()
+    assert [line.split(': ', 1)[1] for line in stream.getvalue().splitlines()] == ["uno", "dos"]
+    assert capsys.readouterr().out == ""
+
+
+def test_error_flushes_the_buffer_immediately(buffered):
+    log, stream = buffered
+    AppLogger.start_request()
+
+    log.info("antes")
+    log.error("falló")
+
+    assert stream.getvalue().count('\n') == 2
+
+
+def test_buffer_is_written_when_full(buffered):
+    log, stream = buffered
+    AppLogger.start_request()
+
+    for index in range(4):
+        log.info(f"línea {index}")
+
+    assert stream.getvalue().count('\n') == 3
+
+
+def test_lines_outside_a_request_are_not_buffered(buffered, capsys):
+    log, stream = buffered
+
+    log.info("hilo de fondo")
+
+    assert "hilo de fondo" in capsys.readouterr().out
+    assert stream.getvalue() == ""
@@ -0,0 +1,79 @@
+"""Huella de consultas, agregados de latencia y Server-Timing (src/utils/metrics.py)."""
+import pytest
+
+from src.utils import metrics
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("SELECT data FROM public.\"Equipment\" WHERE id = %s",
+     'SELECT data FROM public."Equipment" WHERE id = ?'),
+    ("SELECT * FROM t WHERE name = 'Prensa' AND n > 10 -- comentario\n",
+     "SELECT * FROM t WHERE name = ? AND n > ?"),
+    ("SELECT * FROM t /* hint */ WHERE id IN (%s, %s, %s)",
+     "SELECT * FROM t WHERE id IN (?)"),
+    ("SELECT * FROM t WHERE a = %(a)s\n\n   LIMIT 50",
+     "SELECT * FROM t WHERE a = ? LIMIT ?"),
+    ("SELECT 'it''s' FROM t1",
+     "SELECT ? FROM t1"),
+])
+def test_fingerprint_strips_literals_and_spacing(query, expected):
+    assert metrics.fingerprint(query) == expected
+
+
+def test_fingerprint_groups_multi_row_inserts():
+    two = metrics.fingerprint(b"INSERT INTO t (id, data) VALUES ('a', '{}'), ('b', '{}')")
+    three = metrics.fingerprint(b"INSERT INTO t (id, data) VALUES ('a', '{}'), ('b', '{}'), ('c', '{}')")
+
+    # La cantidad de filas del lote no cambia la llave
+    assert two == three == "INSERT INTO t (id, data) VALUES (?), ..."
+
+
+def test_fingerprint_reads_only_the_start_of_huge_statements():
+    query = "INSERT INTO t VALUES " + ", ".join(["(%s)"] * 100_000)
+
+    assert metrics.fingerprint(query).startswith("INSERT INTO t VALUES (?), ...")
+
+
+def test_registry_summary_percentiles():
+    registry = metrics.MetricsRegistry(reservoir_size=100)
+    for duration in range(1, 101):
+        registry.observe('query', 'SELECT ?', float(duration), rows=2)
+
+    summary = registry.snapshot()['query']['SELECT ?']
+
+    assert summary["count"] == 100 and summary["rows"] == 200
+    assert summary["p50_ms"] == 51.0 and summary["p99_ms"] == 99.0
+    assert summary["max_ms"] == 100.0 and summary["avg_ms"] == 50.5
+
+
+def test_reservoir_keeps_only_recent_samples():
+    registry = metrics.MetricsRegistry(reservoir_size=10)
+    for duration in range(100):
+        registry.observe('endpoint', 'GET /equipment', float(duration))
+
+    summary = registry.snapshot()['endpoint']['GET /equipment']
+
+    assert summary["count"] == 100
+    assert summary["p50_ms"] >= 90.0
+
+
+def test_record_query_counts_into_the_current_request():
+    timings = metrics.start_request()
+    try:
+        metrics.record_query("SELECT 1", 2.5, 3)
+        metrics.record_query("SELECT 2", 1.5, -1)
+        with metrics.span('serialize'):
+            pass
+    finally:
+        metrics.end_request()
+
+    assert timings.queries == 2 and timings.rows == 3
+    assert timings.spans['db'] == pytest.approx(4.0)
+    header = timings.server_timing()
+    assert header.startswith('db;dur=4.00;desc="2 queries, 3 rows", serialize;dur=')
+    assert ", total;dur=" in header
+
+
+def test_record_outside_a_request_is_ignored():
+    assert metrics.current_request() is None
+    metrics.record('db', 1.0)
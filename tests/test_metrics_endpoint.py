@@ -0,0 +1,40 @@
+"""GET /metrics de la app Flask: no necesita base de datos (solo lee contadores del pool y las cachés)."""
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("psycopg2")
+
+from src import app as app_module  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_module, "METRICS_ENDPOINT", True)
+    return app_module.create_app().test_client()
+
+
+def test_metrics_reports_pool_and_caches(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert {"in_use", "idle"} <= set(body["pool"])
+    assert [cache["name"] for cache in body["cache"]] == ["equipment", "product"]
+
+
+def test_metrics_is_hidden_unless_enabled(client, monkeypatch):
+    monkeypatch.setattr(app_module, "METRICS_ENDPOINT", False)
+
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_after_data_access_is_loaded(client):
+    # Cargar EquipmentDB importa el submódulo db_connector; /metrics tiene que seguir
+    # encontrando la instancia del pool y no el módulo
+    from src.data_access import EquipmentDB  # noqa: F401
+    import src.data_access.cache_listener  # noqa: F401
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "in_use" in response.get_json()["pool"]
@@ -0,0 +1,52 @@
+"""
+Migrator con índices CONCURRENTLY: un intento fallido deja el índice INVALID y el
+siguiente tiene que reconstruirlo en vez de saltarlo por el IF NOT EXISTS.
+
+Necesita PostgreSQL (BENCH_DSN o un cluster temporal), igual que test_backfill.py.
+"""
+import json
+import uuid
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+SCHEMA_SCRIPTS = ["create_tables.sql"]
+
+UNIQUE_NAME_MIGRATION = """-- migrate:no-transaction
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS equipment_name_key
+    ON public."Equipment" ((data->>'name'));
+"""
+
+
+def index_is_valid(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (name,))
+        row = cursor.fetchone()
+    connection.rollback()
+    return None if row is None else row[0]
+
+
+def test_retry_rebuilds_an_index_left_invalid(scratch_database, tmp_path):
+    from src.data_access.migrator import Migrator
+
+    (tmp_path / "0001_unique_equipment_name.sql").write_text(UNIQUE_NAME_MIGRATION, encoding="utf-8")
+    connection = scratch_database.connect()
+    duplicate = str(uuid.uuid4())
+    with connection.cursor() as cursor:
+        for entity_id in (str(uuid.uuid4()), duplicate):
+            cursor.execute('INSERT INTO public."Equipment" (id, data) VALUES (%s, %s)',
+                           (entity_id, json.dumps({"name": "Prensa", "location": "Planta 1"})))
+    connection.commit()
+    migrator = Migrator(migrations_dir=str(tmp_path))
+
+    # El nombre repetido hace fallar la construcción: el índice queda creado pero INVALID
+    with pytest.raises(psycopg2.errors.UniqueViolation):
+        migrator.migrate()
+    assert index_is_valid(connection, "equipment_name_key") is False
+
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM public."Equipment" WHERE id = %s', (duplicate,))
+    connection.commit()
+
+    assert migrator.migrate() == [1]
+    assert index_is_valid(connection, "equipment_name_key") is True
@@ -0,0 +1,60 @@
+"""Tokens de paginación por (createdAt, id) y tamaño de página (src/data_access/pagination.py)."""
+import uuid
+import base64
+import pytest
+
+from src.data_access import pagination
+
+CREATED_AT = "2024-03-01T10:00:00.123456-06:00"
+ENTITY_ID = "0190f5a2-7c1e-7b8a-9d3e-4f5a6b7c8d9e"
+
+
+def test_token_round_trip():
+    token = pagination.encode_token(CREATED_AT, ENTITY_ID)
+
+    assert pagination.decode_token(token) == (CREATED_AT, ENTITY_ID)
+
+
+def test_token_is_url_safe_without_padding():
+    token = pagination.encode_token(CREATED_AT, ENTITY_ID)
+
+    assert "=" not in token and "+" not in token and "/" not in token
+
+
+def test_token_accepts_uuid_objects():
+    entity_id = uuid.UUID(ENTITY_ID)
+
+    assert pagination.decode_token(pagination.encode_token(CREATED_AT, entity_id)) == (CREATED_AT, ENTITY_ID)
+
+
+def _raw_token(text):
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "no es base64!",
+    _raw_token("{}"),
+    _raw_token('["2024-03-01"]'),
+    _raw_token('[1, "abc"]'),
+    _raw_token('["2024-03-01", 5]'),
+])
+def test_invalid_token_raises_value_error(token):
+    with pytest.raises(ValueError, match="Token de paginación inválido"):
+        pagination.decode_token(token)
+
+
+@pytest.mark.parametrize("limit, expected", [
+    (None, pagination.DEFAULT_PAGE_SIZE),
+    ("10", 10),
+    (0, 1),
+    (-5, 1),
+    (10_000, pagination.MAX_PAGE_SIZE),
+])
+def test_normalize_limit(limit, expected):
+    assert pagination.normalize_limit(limit) == expected
+
+
+def test_normalize_limit_rejects_non_integers():
+    with pytest.raises(ValueError, match="limit"):
+        pagination.normalize_limit("diez")
@@ -0,0 +1,164 @@
+"""WriteBatcher (src/data_access/write_batcher.py) contra una conexión falsa: sin PostgreSQL."""
+import threading
+import time
+from contextlib import contextmanager
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from src.data_access import write_batcher  # noqa: E402
+from src.data_access.errors import QueueFullError  # noqa: E402
+
+BAD_ROW = '{"name": null}'
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        if query == "SAVEPOINT batch_row":
+            self.connection.savepoint = list(self.connection.pending)
+        elif query == "ROLLBACK TO SAVEPOINT batch_row":
+            self.connection.pending = self.connection.savepoint
+        elif query != "RELEASE SAVEPOINT batch_row":
+            self.connection.insert([params])
+
+
+class FakeConnection:
+    """Transacción en memoria: los INSERT quedan pendientes hasta commit y rollback los descarta."""
+
+    def __init__(self, db):
+        self.db = db
+        self.pending = []
+        self.savepoint = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def insert(self, rows):
+        # Como en PostgreSQL, una sentencia con una fila inválida no escribe ninguna
+        if any(data == BAD_ROW for _, data in rows):
+            raise ValueError("fila inválida")
+        self.pending.extend(rows)
+
+    def commit(self):
+        if self.db.fail_commit:
+            raise RuntimeError("se perdió la conexión durante el commit")
+        self.db.committed.extend(row_id for row_id, _ in self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+
+class FakeDB:
+    def __init__(self):
+        self.committed = []
+        self.fail_commit = False
+        # Mientras está cerrado, el hilo del batcher queda esperando una conexión
+        self.gate = threading.Event()
+        self.gate.set()
+
+    @contextmanager
+    def connection(self):
+        assert self.gate.wait(5)
+        yield FakeConnection(self)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(write_batcher.psycopg2.extras, "execute_values",
+                        lambda cursor, query, rows, page_size: cursor.connection.insert(rows))
+    return FakeDB()
+
+
+@pytest.fixture
+def make_batcher(db):
+    created = []
+
+    def make(**options):
+        batcher = write_batcher.WriteBatcher("Equipment", **options)
+        batcher.db = db
+        created.append(batcher)
+        return batcher
+
+    yield make
+    db.gate.set()
+    for batcher in created:
+        batcher.close()
+
+
+def test_batch_is_written_with_one_commit(db, make_batcher):
+    batcher = make_batcher(max_delay_ms=200)
+
+    futures = [batcher.submit(row_id, "{}") for row_id in ("a", "b", "c")]
+
+    assert [future.result(5) for future in futures] == ["a", "b", "c"]
+    assert db.committed == ["a", "b", "c"]
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["rows"] == 3
+
+
+def test_bad_row_fails_alone_and_the_rest_commit(db, make_batcher):
+    batcher = make_batcher(max_delay_ms=200)
+
+    futures = {row_id: batcher.submit(row_id, BAD_ROW if row_id == "b" else "{}") for row_id in ("a", "b", "c")}
+
+    assert futures["a"].result(5) == "a"
+    assert futures["c"].result(5) == "c"
+    with pytest.raises(ValueError):
+        futures["b"].result(5)
+    assert db.committed == ["a", "c"]
+    assert batcher.stats()["rows"] == 2
+
+
+def test_commit_failure_reaches_every_row(db, make_batcher):
+    batcher = make_batcher(max_delay_ms=200)
+    db.fail_commit = True
+
+    futures = [batcher.submit(row_id, "{}") for row_id in ("a", "b", "c")]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="commit"):
+            future.result(5)
+    assert db.committed == []
+
+
+def test_timeout_while_queued_cancels_the_row(db, make_batcher):
+    batcher = make_batcher(max_batch=1, max_delay_ms=1)
+    db.gate.clear()
+    first = batcher.submit("a", "{}")
+    # El hilo ya tomó "a" y espera la conexión; "b" sigue en la cola
+    time.sleep(0.05)
+
+    with pytest.raises(QueueFullError):
+        batcher.insert("b", "{}", timeout=0.1)
+
+    db.gate.set()
+    assert first.result(5) == "a"
+    batcher.close()
+    assert db.committed == ["a"]
+    assert batcher.stats()["rejected"] == 1
+
+
+def test_timeout_after_the_batch_started_waits_for_its_result(db, make_batcher):
+    batcher = make_batcher(max_batch=1, max_delay_ms=1)
+    db.gate.clear()
+    result = {}
+    caller = threading.Thread(target=lambda: result.update(row_id=batcher.insert("a", "{}", timeout=0.05)))
+    caller.start()
+
+    # Pasado el timeout la fila ya está en un lote en curso: insert() no se rinde
+    time.sleep(0.2)
+    assert caller.is_alive()
+    db.gate.set()
+    caller.join(5)
+
+    assert result == {"row_id": "a"}
+    assert db.committed == ["a"]